@@ -5,15 +5,27 @@ import os
 from datetime import datetime
 
 from flask import Flask, render_template
+from sqlalchemy.exc import OperationalError, ProgrammingError
 
+from .compression import init_compression, parse_mimetypes
 from .extensions import db, login_manager, migrate
+from .fragment_cache import init_fragment_cache
+from .json_provider import install_json_provider
+from .metrics import init_metrics
+from .query_tracking import init_query_tracking
 from .models import User
 from .routes.auth import auth_bp
 from .routes.crypto import crypto_bp
 from .routes.main import main_bp
 from .routes.news import news_bp
+from .routes.stream import stream_bp
 from .routes.weather import weather_bp
 from .scheduler import start_scheduler
+from .services.cache_service import env_float, env_int
+from .services.history_service import backfill_anomalies, load_timeseries
+from .services.retention_service import RetentionPolicy, policies_from_env
+from .services.rollup_service import backfill_rollups
+from .services.settings_service import load_user_with_settings
 from config import APP_VERSION
 
 
@@ -42,11 +54,82 @@ def create_app() -> Flask:
     app.config.setdefault(
         "SCHEDULER_TIMEZONE", os.environ.get("SCHEDULER_TIMEZONE", "UTC")
     )
+    app.config.setdefault(
+        "ENABLE_INGESTION", _env_flag("ENABLE_INGESTION", default=True)
+    )
+    app.config.setdefault("CRYPTO_POLL_SECONDS", env_int("CRYPTO_POLL_SECONDS", 60))
+    app.config.setdefault("WEATHER_POLL_SECONDS", env_int("WEATHER_POLL_SECONDS", 300))
+    app.config.setdefault("NEWS_POLL_SECONDS", env_int("NEWS_POLL_SECONDS", 600))
+    app.config.setdefault(
+        "WEATHER_INGEST_CITY", os.environ.get("WEATHER_INGEST_CITY", "Chicago")
+    )
+    app.config.setdefault(
+        "WEATHER_INGEST_WORKERS", max(env_int("WEATHER_INGEST_WORKERS", 4), 1)
+    )
+    app.config.setdefault(
+        "WEATHER_INGEST_DEADLINE", env_float("WEATHER_INGEST_DEADLINE", 30.0)
+    )
+    app.config.setdefault(
+        "RETENTION_PRUNE_SECONDS", env_int("RETENTION_PRUNE_SECONDS", 300)
+    )
+    app.config.setdefault("RETENTION_POLICIES", policies_from_env())
+    app.config.setdefault(
+        "DASHBOARD_MAX_WORKERS", max(env_int("DASHBOARD_MAX_WORKERS", 8), 1)
+    )
+    app.config.setdefault(
+        "DASHBOARD_FETCH_DEADLINE", env_float("DASHBOARD_FETCH_DEADLINE", 3.0)
+    )
+    app.config.setdefault(
+        "ENABLE_EVENT_STREAM", _env_flag("ENABLE_EVENT_STREAM", default=True)
+    )
+    app.config.setdefault(
+        "EVENT_STREAM_HEARTBEAT", max(env_float("EVENT_STREAM_HEARTBEAT", 15.0), 1.0)
+    )
+    app.config.setdefault(
+        "EVENT_STREAM_MAX_AGE", env_float("EVENT_STREAM_MAX_AGE", 300.0)
+    )
+    app.config.setdefault(
+        "EVENT_STREAM_RETRY_SECONDS", env_float("EVENT_STREAM_RETRY_SECONDS", 5.0)
+    )
+    app.config.setdefault(
+        "ENABLE_COMPRESSION", _env_flag("ENABLE_COMPRESSION", default=True)
+    )
+    app.config.setdefault("COMPRESS_MIN_SIZE", env_int("COMPRESS_MIN_SIZE", 500))
+    app.config.setdefault(
+        "COMPRESS_LEVEL", min(max(env_int("COMPRESS_LEVEL", 6), 1), 9)
+    )
+    app.config.setdefault(
+        "COMPRESS_BROTLI_QUALITY", min(env_int("COMPRESS_BROTLI_QUALITY", 4), 11)
+    )
+    app.config.setdefault(
+        "COMPRESS_MIMETYPES", parse_mimetypes(os.environ.get("COMPRESS_MIMETYPES"))
+    )
+    app.config.setdefault(
+        "ENABLE_FRAGMENT_CACHE", _env_flag("ENABLE_FRAGMENT_CACHE", default=True)
+    )
+
+    app.config.setdefault(
+        "ENABLE_QUERY_TRACKING", _env_flag("ENABLE_QUERY_TRACKING", default=True)
+    )
+    app.config.setdefault("SQL_WARN_QUERIES", env_int("SQL_WARN_QUERIES", 20))
+    app.config.setdefault("SQL_WARN_MS", env_float("SQL_WARN_MS", 250.0))
+    app.config.setdefault("SQL_REPEAT_WARN", env_int("SQL_REPEAT_WARN", 3))
+    app.config.setdefault("SQL_SLOWEST", max(env_int("SQL_SLOWEST", 3), 1))
+    app.config.setdefault("ENABLE_METRICS", _env_flag("ENABLE_METRICS", default=True))
+    app.config.setdefault("METRICS_TOKEN", os.environ.get("METRICS_TOKEN"))
 
     webhook_url = os.environ.get("DAILY_SUMMARY_WEBHOOK_URL")
     if webhook_url:
         app.config.setdefault("DAILY_SUMMARY_WEBHOOK_URL", webhook_url)
 
+    install_json_provider(app)
+    # Registered first so their after_request hooks run last and their
+    # before_request hooks run before anything that queries or renders.
+    init_metrics(app)
+    init_query_tracking(app)
+    init_compression(app)
+    init_fragment_cache(app)
+
     db.init_app(app)
     login_manager.init_app(app)
     login_manager.login_view = "auth.login"
@@ -56,16 +139,30 @@ def create_app() -> Flask:
     def load_user(user_id: str) -> User | None:
         if not user_id:
             return None
-        return db.session.get(User, int(user_id))
+        return load_user_with_settings(int(user_id))
 
     app.register_blueprint(auth_bp)
     app.register_blueprint(main_bp)
     app.register_blueprint(crypto_bp)
     app.register_blueprint(weather_bp)
     app.register_blueprint(news_bp)
+    app.register_blueprint(stream_bp)
 
     with app.app_context():
         db.create_all()
+        try:
+            backfill_rollups()
+            load_timeseries()
+            anomaly_policy = (
+                app.config["RETENTION_POLICIES"].get("anomaly_log") or RetentionPolicy()
+            )
+            backfill_anomalies(anomaly_policy.max_rows, anomaly_policy.max_age)
+        except (OperationalError, ProgrammingError):
+            # An older schema must still boot so ``flask db upgrade`` can run.
+            db.session.rollback()
+            app.logger.warning(
+                "History tables are out of date; run `flask db upgrade`."
+            )
 
     @app.context_processor
     def inject_version() -> dict[str, object]:
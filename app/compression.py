@@ -0,0 +1,194 @@
+"""Gzip/Brotli compression for responses.
+
+An ``after_request`` hook compresses text-like bodies (HTML, CSS, JS, JSON,
+SVG) above a size threshold for clients that accept it, preferring Brotli
+when the ``brotli`` package is installed. Static files are compressed once
+at the highest level and reused until they change on disk. Streamed
+responses such as the event stream are left untouched.
+"""
+
+from __future__ import annotations
+
+import gzip
+import mimetypes
+import os
+import threading
+from typing import Dict, Iterable, Optional, Tuple
+
+from flask import Flask, Response, current_app, request
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+DEFAULT_MIMETYPES = (
+    "text/html",
+    "text/css",
+    "text/plain",
+    "text/javascript",
+    "application/javascript",
+    "application/json",
+    "image/svg+xml",
+)
+
+# Static assets are compressed once per file, so spend the extra CPU.
+_STATIC_GZIP_LEVEL = 9
+_STATIC_BROTLI_QUALITY = 11
+
+
+def parse_mimetypes(raw: Optional[str]) -> Tuple[str, ...]:
+    """Split a comma separated ``COMPRESS_MIMETYPES`` value."""
+    if not raw:
+        return DEFAULT_MIMETYPES
+    parsed = tuple(part.strip().lower() for part in raw.split(",") if part.strip())
+    return parsed or DEFAULT_MIMETYPES
+
+
+def available_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def compress(data: bytes, encoding: str, level: int) -> bytes:
+    if encoding == "br":
+        return brotli.compress(data, quality=level)
+    # A fixed mtime keeps the output (and so any cache of it) deterministic.
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+
+def _negotiate() -> Optional[str]:
+    """Pick the encoding the client rates highest, preferring Brotli on ties."""
+    accepted = request.accept_encodings
+    best, best_quality = None, 0.0
+    for encoding in available_encodings():
+        quality = accepted.quality(encoding)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+
+class StaticCompressionCache:
+    """Compressed copies of static files, refreshed when a file changes."""
+
+    def __init__(self) -> None:
+        self._entries: Dict[Tuple[str, str], Tuple[Tuple[int, int], bytes]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, path: str, encoding: str) -> bytes:
+        stat = os.stat(path)
+        stamp = (stat.st_mtime_ns, stat.st_size)
+        key = (path, encoding)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] == stamp:
+            return entry[1]
+        with open(path, "rb") as handle:
+            level = _STATIC_BROTLI_QUALITY if encoding == "br" else _STATIC_GZIP_LEVEL
+            body = compress(handle.read(), encoding, level)
+        with self._lock:
+            self._entries[key] = (stamp, body)
+        return body
+
+    def warm(self, paths: Iterable[str]) -> int:
+        count = 0
+        for path in paths:
+            for encoding in available_encodings():
+                self.get(path, encoding)
+                count += 1
+        return count
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": sum(len(body) for _, body in self._entries.values()),
+            }
+
+
+static_cache = StaticCompressionCache()
+
+
+def _static_path(app: Flask) -> Optional[str]:
+    filename = (request.view_args or {}).get("filename")
+    if not filename or not app.static_folder:
+        return None
+    path = safe_join(app.static_folder, filename)
+    return path if path and os.path.isfile(path) else None
+
+
+def _compress_response(response: Response) -> Response:
+    app = current_app
+    config = app.config
+    if (
+        not config["ENABLE_COMPRESSION"]
+        or request.method == "HEAD"
+        or response.status_code != 200
+        or "Content-Encoding" in response.headers
+        or "no-transform" in (response.headers.get("Cache-Control") or "")
+        or response.mimetype not in config["COMPRESS_MIMETYPES"]
+    ):
+        return response
+
+    static_path = None
+    if response.direct_passthrough:
+        if request.endpoint != "static":
+            return response
+        static_path = _static_path(app)
+        if static_path is None:
+            return response
+        size = os.path.getsize(static_path)
+    elif response.is_streamed:
+        return response
+    else:
+        size = response.content_length or len(response.get_data())
+
+    response.vary.add("Accept-Encoding")
+    if size < config["COMPRESS_MIN_SIZE"]:
+        return response
+    encoding = _negotiate()
+    if encoding is None:
+        return response
+
+    if static_path is not None:
+        body = static_cache.get(static_path, encoding)
+        # Release the file the static view opened; its bytes are not sent.
+        if hasattr(response.response, "close"):
+            response.response.close()
+        response.direct_passthrough = False
+        response.headers.pop("Accept-Ranges", None)
+    else:
+        if encoding == "br":
+            level = config["COMPRESS_BROTLI_QUALITY"]
+        else:
+            level = config["COMPRESS_LEVEL"]
+        body = compress(response.get_data(), encoding, level)
+    response.set_data(body)
+    response.headers["Content-Encoding"] = encoding
+
+    # The encoded bytes differ from the identity representation, so a
+    # strong validator would be wrong; a weak one still matches If-None-Match.
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+
+def _static_files(app: Flask) -> Iterable[str]:
+    folder = app.static_folder
+    if not folder or not os.path.isdir(folder):
+        return
+    allowed = app.config["COMPRESS_MIMETYPES"]
+    min_size = app.config["COMPRESS_MIN_SIZE"]
+    for root, _, files in os.walk(folder):
+        for name in files:
+            path = os.path.join(root, name)
+            if mimetypes.guess_type(name)[0] in allowed and os.path.getsize(path) >= min_size:
+                yield path
+
+
+def init_compression(app: Flask) -> None:
+    """Register the compression hook and precompress eligible static files."""
+    app.after_request(_compress_response)
+    if app.config["ENABLE_COMPRESSION"]:
+        static_cache.warm(_static_files(app))
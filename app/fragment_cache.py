@@ -0,0 +1,70 @@
+"""``{% cache %}`` Jinja tag for reusing rendered template fragments.
+
+Wrapping a block as ``{% cache "name", key, ... %}...{% endcache %}`` renders
+it once per distinct set of keys and serves the stored markup afterwards.
+Keys are combined with the fragment's template and position and with a
+compile-time template version, so editing (and reloading) a template never
+serves stale markup. A ``None`` key means "not identifiable" and renders the
+block uncached. Only values listed as keys may vary inside a cached block.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import itertools
+import json
+from typing import Any, List, Optional
+
+from flask import Flask
+from jinja2 import nodes
+from jinja2.ext import Extension
+from jinja2.parser import Parser
+
+from app.services.cache_service import TTLCache, env_float, env_int
+
+fragment_cache = TTLCache(
+    "fragments",
+    ttl=env_float("FRAGMENT_CACHE_TTL", 300.0),
+    max_entries=env_int("FRAGMENT_CACHE_SIZE", 512),
+)
+
+# Bumped on every template compilation; Jinja recompiles a template when its
+# source changes, so this doubles as the template version.
+_COMPILATIONS = itertools.count(1)
+
+
+def fragment_key(value: Any) -> str:
+    """Hash a JSON-serializable value (e.g. ``UserSettings.to_dict()``) into a key."""
+    encoded = json.dumps(value, sort_keys=True, default=str, separators=(",", ":"))
+    return hashlib.sha1(encoded.encode("utf-8")).hexdigest()
+
+
+class FragmentCacheExtension(Extension):
+    tags = {"cache"}
+
+    def __init__(self, environment) -> None:
+        super().__init__(environment)
+        environment.extend(fragment_cache=None)
+
+    def parse(self, parser: Parser) -> nodes.Node:
+        lineno = next(parser.stream).lineno
+        keys: List[nodes.Expr] = [parser.parse_expression()]
+        while parser.stream.skip_if("comma"):
+            keys.append(parser.parse_expression())
+        body = parser.parse_statements(("name:endcache",), drop_needle=True)
+        fragment = f"{parser.name}:{lineno}:{next(_COMPILATIONS)}"
+        call = self.call_method("_cached", [nodes.Const(fragment), nodes.List(keys)])
+        return nodes.CallBlock(call, [], [], body).set_lineno(lineno)
+
+    def _cached(self, fragment: str, keys: List[Any], caller) -> str:
+        cache: Optional[TTLCache] = self.environment.fragment_cache
+        if cache is None or any(key is None for key in keys):
+            return caller()
+        return cache.get_or_load((fragment, fragment_key(keys)), caller)
+
+
+def init_fragment_cache(app: Flask) -> None:
+    """Enable ``{% cache %}`` in ``app``'s templates."""
+    app.jinja_env.add_extension(FragmentCacheExtension)
+    if app.config["ENABLE_FRAGMENT_CACHE"]:
+        app.jinja_env.fragment_cache = fragment_cache
@@ -0,0 +1,67 @@
+"""Request instrumentation and the Prometheus ``/metrics`` endpoint.
+
+A ``before_request``/``after_request`` pair times every request and records
+it under the matched endpoint (not the raw path, which would let arbitrary
+URLs create label values). The hook is registered before the other response
+hooks so the measured time includes compression.
+"""
+
+from __future__ import annotations
+
+import hmac
+import time
+
+from flask import Blueprint, Flask, Response, abort, current_app, g, request
+
+from app.services.metrics_service import (
+    CONTENT_TYPE,
+    HTTP_LATENCY,
+    HTTP_REQUESTS,
+    render_metrics,
+)
+
+metrics_bp = Blueprint("metrics", __name__)
+
+
+@metrics_bp.route("/metrics")
+def metrics() -> Response:
+    """Expose counters and histograms in the Prometheus text format.
+
+    Scrapers cannot log in, so access requires ``Authorization: Bearer
+    <token>`` matching ``METRICS_TOKEN``. Without a configured token the
+    endpoint answers 404, so metrics are never exposed anonymously.
+    """
+    token = current_app.config.get("METRICS_TOKEN")
+    if not token:
+        abort(404)
+    supplied = request.headers.get("Authorization", "")
+    if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+        return Response("Unauthorized\n", status=401, mimetype="text/plain")
+    response = Response(render_metrics(), content_type=CONTENT_TYPE)
+    response.headers["Cache-Control"] = "no-store"
+    return response
+
+
+def _start_timer() -> None:
+    g._metrics_started = time.perf_counter()
+
+
+def _record_request(response: Response) -> Response:
+    started = g.pop("_metrics_started", None)
+    if started is None:
+        return response
+    endpoint = request.endpoint or "unmatched"
+    HTTP_LATENCY.observe(
+        time.perf_counter() - started, endpoint=endpoint, method=request.method
+    )
+    HTTP_REQUESTS.inc(endpoint=endpoint, method=request.method, status=response.status_code)
+    return response
+
+
+def init_metrics(app: Flask) -> None:
+    """Time requests and serve ``/metrics`` when ``ENABLE_METRICS`` is on."""
+    if not app.config["ENABLE_METRICS"]:
+        return
+    app.before_request(_start_timer)
+    app.after_request(_record_request)
+    app.register_blueprint(metrics_bp)
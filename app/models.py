@@ -65,34 +65,44 @@ class UserSettings(db.Model):
         }
 
 
-class CryptoHistory(db.Model):
-    """Persist a point-in-time snapshot of crypto prices for trend tracking."""
+class CryptoPrice(db.Model):
+    """Long-format price history: one row per asset per ingested snapshot."""
 
-    __tablename__ = "crypto_history"
+    __tablename__ = "crypto_price"
+    __table_args__ = (
+        db.Index("ix_crypto_price_asset_timestamp", "asset", "timestamp"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    asset = db.Column(db.String(64), nullable=False)
     timestamp = db.Column(
         db.DateTime(timezone=True),
         nullable=False,
         default=lambda: datetime.now(timezone.utc),
         index=True,
     )
-    bitcoin_price = db.Column(db.Float, nullable=False)
-    ethereum_price = db.Column(db.Float, nullable=False)
+    price = db.Column(db.Float, nullable=False)
 
     def __repr__(self) -> str:
         return (
-            f"<CryptoHistory id={self.id} timestamp={self.timestamp.isoformat()} "
-            f"btc={self.bitcoin_price} eth={self.ethereum_price}>"
+            f"<CryptoPrice id={self.id} asset={self.asset!r} "
+            f"timestamp={self.timestamp.isoformat()} price={self.price}>"
         )
 
 
 class WeatherHistory(db.Model):
-    """Capture weather readings so the dashboard can display recent history."""
+    """Capture weather readings so the dashboard can display recent history.
+
+    ``city`` holds the normalized city key, so every city is its own series.
+    """
 
     __tablename__ = "weather_history"
+    __table_args__ = (
+        db.Index("ix_weather_history_city_timestamp", "city", "timestamp"),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
+    city = db.Column(db.String(128), nullable=False, index=True)
     timestamp = db.Column(
         db.DateTime(timezone=True),
         nullable=False,
@@ -104,15 +114,74 @@ class WeatherHistory(db.Model):
 
     def __repr__(self) -> str:
         return (
-            f"<WeatherHistory id={self.id} timestamp={self.timestamp.isoformat()} "
+            f"<WeatherHistory id={self.id} city={self.city!r} "
+            f"timestamp={self.timestamp.isoformat()} "
             f"temp={self.temperature} condition={self.condition!r}>"
         )
 
 
+class _RollupMixin:
+    """Per-series aggregate of one hour or one day of readings."""
+
+    id = db.Column(db.Integer, primary_key=True)
+    series = db.Column(db.String(128), nullable=False)
+    granularity = db.Column(db.String(8), nullable=False)
+    bucket_start = db.Column(db.DateTime(timezone=True), nullable=False)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total = db.Column(db.Float, nullable=False, default=0.0)
+    total_sq = db.Column(db.Float, nullable=False, default=0.0)
+    min_value = db.Column(db.Float, nullable=False)
+    max_value = db.Column(db.Float, nullable=False)
+    first_value = db.Column(db.Float, nullable=False)
+    last_value = db.Column(db.Float, nullable=False)
+    first_timestamp = db.Column(db.DateTime(timezone=True), nullable=False)
+    last_timestamp = db.Column(db.DateTime(timezone=True), nullable=False)
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    def __repr__(self) -> str:
+        return (
+            f"<{type(self).__name__} series={self.series!r} "
+            f"{self.granularity}={self.bucket_start.isoformat()} count={self.count}>"
+        )
+
+
+class CryptoRollup(_RollupMixin, db.Model):
+    """Hourly and daily aggregates of crypto prices, one series per coin."""
+
+    __tablename__ = "crypto_rollup"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "series", "granularity", "bucket_start", name="uq_crypto_rollup_bucket"
+        ),
+    )
+
+
+class WeatherRollup(_RollupMixin, db.Model):
+    """Hourly and daily aggregates of temperature readings, one series per city."""
+
+    __tablename__ = "weather_rollup"
+    __table_args__ = (
+        db.UniqueConstraint(
+            "series", "granularity", "bucket_start", name="uq_weather_rollup_bucket"
+        ),
+    )
+
+
 class AnomalyLog(db.Model):
     """Record detected anomalies for audit and UI notifications."""
 
     __tablename__ = "anomaly_log"
+    __table_args__ = (
+        db.Index(
+            "ix_anomaly_log_series_detector_observed",
+            "series",
+            "detector",
+            "observed_at",
+        ),
+    )
 
     id = db.Column(db.Integer, primary_key=True)
     timestamp = db.Column(
@@ -123,9 +192,31 @@ class AnomalyLog(db.Model):
     )
     event_type = db.Column(db.String(64), nullable=False)
     message = db.Column(db.String(255), nullable=False)
+    # Set for rows written by the detector engine; older rows leave them empty.
+    detector = db.Column(db.String(32), nullable=True)
+    series = db.Column(db.String(128), nullable=True)
+    score = db.Column(db.Float, nullable=True)
+    observed_at = db.Column(db.DateTime(timezone=True), nullable=True)
 
     def __repr__(self) -> str:
         return (
             f"<AnomalyLog id={self.id} type={self.event_type!r} "
             f"timestamp={self.timestamp.isoformat()}>"
         )
+
+
+class AppMetadata(db.Model):
+    """Key/value facts about the database, such as completed one-off backfills."""
+
+    __tablename__ = "app_metadata"
+
+    key = db.Column(db.String(64), primary_key=True)
+    value = db.Column(db.String(255), nullable=False)
+    updated_at = db.Column(
+        db.DateTime(timezone=True),
+        nullable=False,
+        default=lambda: datetime.now(timezone.utc),
+    )
+
+    def __repr__(self) -> str:
+        return f"<AppMetadata {self.key}={self.value!r}>"
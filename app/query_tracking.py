@@ -0,0 +1,207 @@
+"""Per-request and per-job SQL accounting.
+
+SQLAlchemy cursor events time every statement. While a request or scheduler
+job is being tracked, each statement is added to a :class:`QueryStats` kept
+on ``g``. A tracked request gets a ``Server-Timing: db;dur=...`` header. A
+warning is logged when the request or job runs more than ``SQL_WARN_QUERIES``
+statements, spends more than ``SQL_WARN_MS`` in the database, or runs the
+same statement ``SQL_REPEAT_WARN`` times or more. Repeated statements
+usually mean a query inside a loop (N+1) or a helper whose result should be
+reused.
+"""
+
+from __future__ import annotations
+
+import heapq
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from flask import Flask, Response, current_app, g, has_app_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+_STATEMENT_PREVIEW = 160
+
+
+def _preview(statement: str) -> str:
+    compact = " ".join(statement.split())
+    if len(compact) <= _STATEMENT_PREVIEW:
+        return compact
+    return compact[: _STATEMENT_PREVIEW - 3] + "..."
+
+
+@dataclass
+class _StatementStats:
+    count: int = 0
+    seconds: float = 0.0
+    # Executions per parameter set; the most common one shows exact repeats.
+    parameters: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def identical(self) -> int:
+        return max(self.parameters.values(), default=0)
+
+
+@dataclass
+class QueryStats:
+    """Statements run by one request or job: count, time and the slowest."""
+
+    label: str
+    slowest_kept: int = 3
+    count: int = 0
+    seconds: float = 0.0
+    statements: Dict[str, _StatementStats] = field(default_factory=dict)
+    slowest: List[Tuple[float, int, str]] = field(default_factory=list)
+
+    def record(
+        self, statement: str, parameters: Any, seconds: float, executemany: bool
+    ) -> None:
+        self.count += 1
+        self.seconds += seconds
+        stats = self.statements.get(statement)
+        if stats is None:
+            stats = self.statements[statement] = _StatementStats()
+        stats.count += 1
+        stats.seconds += seconds
+        if not executemany:
+            key = repr(parameters)
+            stats.parameters[key] = stats.parameters.get(key, 0) + 1
+
+        entry = (seconds, self.count, statement)
+        if len(self.slowest) < self.slowest_kept:
+            heapq.heappush(self.slowest, entry)
+        elif self.slowest and seconds > self.slowest[0][0]:
+            heapq.heapreplace(self.slowest, entry)
+
+    @property
+    def milliseconds(self) -> float:
+        return self.seconds * 1000.0
+
+    def repeated(self, threshold: int) -> List[Tuple[str, _StatementStats]]:
+        """Statements run at least ``threshold`` times, most frequent first."""
+        if threshold < 2:
+            return []
+        found = [
+            (sql, stats) for sql, stats in self.statements.items() if stats.count >= threshold
+        ]
+        return sorted(found, key=lambda item: item[1].count, reverse=True)
+
+    def server_timing(self, threshold: int) -> str:
+        description = f"{self.count} quer{'y' if self.count == 1 else 'ies'}"
+        repeated = len(self.repeated(threshold))
+        if repeated:
+            description += f", {repeated} repeated"
+        return f'db;dur={self.milliseconds:.1f};desc="{description}"'
+
+    def problems(self, max_queries: int, max_ms: float, threshold: int) -> List[str]:
+        """Describe every exceeded threshold; empty when the unit was cheap."""
+        found: List[str] = []
+        if max_queries and self.count > max_queries:
+            found.append(f"{self.count} queries (limit {max_queries})")
+        if max_ms and self.milliseconds > max_ms:
+            found.append(f"{self.milliseconds:.1f} ms in the database (limit {max_ms:g} ms)")
+        for sql, stats in self.repeated(threshold):
+            detail = f"{stats.count}x"
+            if stats.identical > 1:
+                detail += f" ({stats.identical} with identical parameters)"
+            found.append(f"repeated {detail}: {_preview(sql)}")
+        return found
+
+    def describe_slowest(self) -> str:
+        parts = [
+            f"{seconds * 1000.0:.1f} ms {_preview(sql)}"
+            for seconds, _, sql in sorted(self.slowest, reverse=True)
+        ]
+        return "; ".join(parts)
+
+
+def _before_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    stats = g.get("_query_stats") if has_app_context() else None
+    if stats is not None and context is not None:
+        context._query_tracking = (stats, time.perf_counter())
+
+
+def _after_cursor_execute(
+    conn: Any, cursor: Any, statement: str, parameters: Any, context: Any, executemany: bool
+) -> None:
+    tracking = getattr(context, "_query_tracking", None)
+    if tracking is not None:
+        stats, started = tracking
+        stats.record(statement, parameters, time.perf_counter() - started, executemany)
+
+
+def install_query_hooks() -> None:
+    """Listen to cursor events on every engine (idempotent)."""
+    if event.contains(Engine, "before_cursor_execute", _before_cursor_execute):
+        return
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+
+
+def _limits(app: Flask) -> Tuple[int, float, int]:
+    config = app.config
+    return config["SQL_WARN_QUERIES"], config["SQL_WARN_MS"], config["SQL_REPEAT_WARN"]
+
+
+def _report(app: Flask, stats: QueryStats) -> None:
+    problems = stats.problems(*_limits(app))
+    if problems:
+        app.logger.warning(
+            "%s ran %d queries in %.1f ms: %s. Slowest: %s",
+            stats.label,
+            stats.count,
+            stats.milliseconds,
+            "; ".join(problems),
+            stats.describe_slowest(),
+        )
+
+
+@contextmanager
+def track_queries(label: str) -> Iterator[Optional[QueryStats]]:
+    """Account the statements run inside the block (within an app context).
+
+    Yields ``None`` when tracking is disabled. Nested blocks are counted by
+    the outermost one only.
+    """
+    app = current_app._get_current_object()
+    if not app.config.get("ENABLE_QUERY_TRACKING") or g.get("_query_stats") is not None:
+        yield None
+        return
+    stats = QueryStats(label, slowest_kept=app.config["SQL_SLOWEST"])
+    g._query_stats = stats
+    try:
+        yield stats
+    finally:
+        g.pop("_query_stats", None)
+        _report(app, stats)
+
+
+def _start_request() -> None:
+    if request.endpoint != "static":
+        g._query_stats = QueryStats(
+            f"{request.method} {request.path}",
+            slowest_kept=current_app.config["SQL_SLOWEST"],
+        )
+
+
+def _finish_request(response: Response) -> Response:
+    stats: Optional[QueryStats] = g.pop("_query_stats", None)
+    if stats is None:
+        return response
+    app = current_app._get_current_object()
+    response.headers.add("Server-Timing", stats.server_timing(app.config["SQL_REPEAT_WARN"]))
+    _report(app, stats)
+    return response
+
+
+def init_query_tracking(app: Flask) -> None:
+    """Account SQL per request when ``ENABLE_QUERY_TRACKING`` is on."""
+    if not app.config["ENABLE_QUERY_TRACKING"]:
+        return
+    install_query_hooks()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
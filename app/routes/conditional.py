@@ -0,0 +1,62 @@
+"""Conditional GET helpers for the polled JSON endpoints.
+
+Routes derive an ETag from a cheap validator (the newest history row or a
+cache generation) and check ``If-None-Match`` before building the body, so an
+unchanged poll costs a header comparison and an empty ``304`` response.
+"""
+
+from __future__ import annotations
+
+import hashlib
+from typing import Any, Optional, Tuple
+
+from flask import Response, current_app, jsonify, request
+
+from app.services.cache_service import version_timestamp
+from config import APP_VERSION
+
+
+def make_etag(*parts: Any) -> str:
+    """Hash ``parts`` (and the app version) into an opaque ETag value."""
+    digest = hashlib.sha1(repr((APP_VERSION, parts)).encode("utf-8"))
+    return digest.hexdigest()
+
+
+def cache_validator(
+    name: str, version: Optional[Tuple[int, float]], value: Any
+) -> Tuple[str, bool, str]:
+    """Return ``(etag, weak, last_updated)`` for a value served from a TTLCache.
+
+    Cached values are identified by their generation and store time. Without
+    a cache entry the value is placeholder data, which gets a weak ETag over
+    its content because ``last_updated`` still changes on every response.
+    """
+    last_updated = version_timestamp(version)
+    if version is not None:
+        return make_etag(name, *version), False, last_updated
+    return make_etag(name, "fallback", value), True, last_updated
+
+
+def _finalize(response: Response, etag: str, weak: bool) -> Response:
+    if current_app.config.get("ENABLE_COMPRESSION"):
+        # The body may be sent encoded, which only a weak validator covers.
+        # A 304 skips the compression hook, so it must carry the same
+        # validator and Vary as the 200 it revalidates.
+        weak = True
+        response.vary.add("Accept-Encoding")
+    response.set_etag(etag, weak=weak)
+    # Bodies are per user; clients must revalidate rather than reuse blindly.
+    response.headers["Cache-Control"] = "private, no-cache"
+    return response
+
+
+def not_modified(etag: str, weak: bool = False) -> Optional[Response]:
+    """Return a ``304`` response when the client already holds ``etag``."""
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return _finalize(Response(status=304), etag, weak)
+
+
+def json_with_etag(payload: Any, etag: str, weak: bool = False) -> Response:
+    """Serialize ``payload`` with ``etag`` attached."""
+    return _finalize(jsonify(payload), etag, weak)
@@ -5,8 +5,12 @@ from datetime import datetime, timezone
 from flask import Blueprint, current_app, jsonify
 from flask_login import login_required
 
-from app.services.crypto_service import get_crypto_prices
-from app.services.history_service import save_crypto_data
+from app.routes.conditional import cache_validator, json_with_etag, not_modified
+from app.services.crypto_service import (
+    crypto_payload,
+    crypto_prices_version,
+    get_crypto_prices,
+)
 
 crypto_bp = Blueprint("crypto", __name__)
 
@@ -23,6 +27,7 @@ def crypto():
                 {
                     "bitcoin": {},
                     "ethereum": {},
+                    "assets": {},
                     "error": "Crypto data unavailable",
                     "details": str(exc),
                     "last_updated": datetime.now(timezone.utc).isoformat(),
@@ -34,18 +39,9 @@ def crypto():
     if not isinstance(data, dict):
         data = {}
 
-    bitcoin_price = data.get("bitcoin", {}).get("usd")
-    ethereum_price = data.get("ethereum", {}).get("usd")
-
-    # Persist a snapshot any time the upstream call returns both price points.
-    if isinstance(bitcoin_price, (int, float)) and isinstance(
-        ethereum_price, (int, float)
-    ):
-        save_crypto_data(bitcoin_price, ethereum_price)
-
-    payload = {
-        "bitcoin": data.get("bitcoin", {}) if isinstance(data, dict) else {},
-        "ethereum": data.get("ethereum", {}) if isinstance(data, dict) else {},
-        "last_updated": datetime.now(timezone.utc).isoformat(),
-    }
-    return jsonify(payload)
+    etag, weak, last_updated = cache_validator("crypto", crypto_prices_version(), data)
+    cached = not_modified(etag, weak)
+    if cached is not None:
+        return cached
+
+    return json_with_etag(crypto_payload(data, last_updated), etag, weak)
@@ -2,11 +2,11 @@
 
 from __future__ import annotations
 
-from datetime import datetime, timezone
 from typing import Any, Dict, List
 
 from flask import (
     Blueprint,
+    current_app,
     flash,
     g,
     jsonify,
@@ -18,16 +18,23 @@ from flask import (
 from flask_login import current_user, login_required
 
 from app.extensions import db
-from app.services.crypto_service import get_crypto_prices
-from app.services.news_service import get_headlines
-from app.services.settings_service import get_user_settings
-from app.services.weather_service import get_weather_forecast
+from app.fragment_cache import fragment_key
+from app.routes.conditional import json_with_etag, make_etag, not_modified
+from app.services.cache_service import cache_stats, single_flight_stats
+from app.services.dashboard_service import load_widgets
+from app.services.event_service import event_stats
+from app.services.settings_service import get_user_settings, invalidate_user
+from app.services.upstream_client import upstream_stats
 from app.services.history_service import (
     calculate_crypto_change,
     calculate_weather_average,
+    HistoryPage,
+    crypto_history_page,
+    crypto_history_version,
     has_recent_anomalies,
-    get_crypto_history,
-    get_weather_history,
+    timeseries_stats,
+    weather_history_page,
+    weather_history_version,
 )
 
 main_bp = Blueprint("main", __name__)
@@ -37,29 +44,37 @@ main_bp = Blueprint("main", __name__)
 @login_required
 def index():
     settings = get_user_settings()
+    settings_payload = settings.to_dict()
+    widgets = load_widgets(settings)
 
     crypto_prices: Dict[str, Any] | None = None
     crypto_timestamp = None
-    if settings.show_crypto:
-        crypto_prices = get_crypto_prices()
-        crypto_timestamp = datetime.now(timezone.utc)
+    if "crypto" in widgets:
+        crypto_prices, crypto_timestamp, _ = widgets["crypto"]
 
     weather_data: Dict[str, Any] | None = None
     weather_timestamp = None
-    if settings.show_weather:
-        weather_data = get_weather_forecast(settings.default_city)
-        weather_timestamp = datetime.now(timezone.utc)
+    if "weather" in widgets:
+        weather_data, weather_timestamp, _ = widgets["weather"]
 
     news_headlines: List[Dict[str, Any]] | None = None
     news_timestamp = None
-    if settings.show_news:
-        news_headlines = get_headlines()
-        news_timestamp = datetime.now(timezone.utc)
+    if "news" in widgets:
+        news_headlines, news_timestamp, _ = widgets["news"]
+
+    # Card fragments are cached per settings and per data generation; a
+    # hidden card renders no data, so it gets a constant key.
+    widget_versions = {
+        name: widgets[name][2] if name in widgets else "hidden"
+        for name in ("crypto", "weather", "news")
+    }
 
     return render_template(
         "index.html",
         settings=settings,
-        settings_payload=settings.to_dict(),
+        settings_payload=settings_payload,
+        settings_key=fragment_key(settings_payload),
+        widget_versions=widget_versions,
         current_user=current_user,
         show_crypto=settings.show_crypto,
         show_weather=settings.show_weather,
@@ -72,9 +87,19 @@ def index():
         weather_last_updated=weather_timestamp,
         news_headlines=news_headlines,
         news_last_updated=news_timestamp,
+        event_stream_url=_event_stream_url(),
     )
 
 
+def _event_stream_url() -> str | None:
+    # Events are only produced by background ingestion; without it the
+    # dashboard keeps polling.
+    config = current_app.config
+    if config.get("ENABLE_EVENT_STREAM") and config.get("ENABLE_INGESTION"):
+        return url_for("stream.event_stream")
+    return None
+
+
 @main_bp.route("/settings", methods=["GET", "POST"])
 @login_required
 def settings():
@@ -102,6 +127,7 @@ def settings():
         settings.refresh_interval = refresh_interval
 
         db.session.commit()
+        invalidate_user(current_user.id)
         g._user_settings = settings
 
         flash("Settings saved successfully.", "success")
@@ -116,33 +142,115 @@ def settings():
 @login_required
 def insights():
     """Render the insights dashboard with trend placeholders."""
+    city = get_user_settings().default_city
+    # Read before computing so a cached fragment is never older than its key.
+    metrics_versions = {
+        "crypto": crypto_history_version(),
+        "weather": weather_history_version(city),
+    }
     metrics = {
         "crypto": calculate_crypto_change(),
-        "weather": calculate_weather_average(),
+        "weather": calculate_weather_average(city=city),
     }
     return render_template(
         "insights.html",
         insights_metrics=metrics,
+        metrics_versions=metrics_versions,
         anomaly_alert=has_recent_anomalies(),
     )
 
 
+HISTORY_FORMATS = ("rows", "columnar")
+MAX_HISTORY_LIMIT = 1000
+
+
+def _history_args() -> tuple[str | None, int, str] | None:
+    """Read ``since``, ``limit`` and ``format``; ``None`` for an unknown format."""
+    since = request.args.get("since") or None
+    limit = request.args.get("limit", default=50, type=int) or 50
+    fmt = request.args.get("format") or "rows"
+    if fmt not in HISTORY_FORMATS:
+        return None
+    return since, min(max(limit, 1), MAX_HISTORY_LIMIT), fmt
+
+
+def _bad_history_format():
+    return jsonify({"error": "format must be one of: " + ", ".join(HISTORY_FORMATS)}), 400
+
+
+def _history_payload(
+    page: HistoryPage, since: str | None, fmt: str, metrics: Dict[str, Any]
+) -> Dict[str, Any]:
+    # ``since`` is echoed so clients can tell which cursor a body answers.
+    return {
+        "data": page.data,
+        "format": fmt,
+        "count": page.count,
+        "metrics": metrics,
+        "cursor": page.cursor,
+        "since": since,
+        "reset": page.reset,
+    }
+
+
 @main_bp.route("/api/crypto_history")
 @login_required
 def api_crypto_history():
-    """Expose the recent crypto history entries for chart rendering."""
-    payload = get_crypto_history()
+    """Expose recent crypto history (``?since=``, ``?limit=``, ``?format=columnar``)."""
+    args = _history_args()
+    if args is None:
+        return _bad_history_format()
+    since, limit, fmt = args
+    etag = make_etag(crypto_history_version(), *args)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
+    page = crypto_history_page(limit, since=since, columnar=fmt == "columnar")
     metrics = calculate_crypto_change()
-    return jsonify({"data": payload, "count": len(payload), "metrics": metrics})
+    return json_with_etag(_history_payload(page, since, fmt, metrics), etag)
 
 
 @main_bp.route("/api/weather_history")
 @login_required
 def api_weather_history():
-    """Expose the recent weather history entries for chart rendering."""
-    payload = get_weather_history()
-    metrics = calculate_weather_average()
-    return jsonify({"data": payload, "count": len(payload), "metrics": metrics})
+    """Expose recent weather history (``?since=``, ``?limit=``, ``?format=columnar``)."""
+    city = (request.args.get("city") or "").strip() or get_user_settings().default_city
+    args = _history_args()
+    if args is None:
+        return _bad_history_format()
+    since, limit, fmt = args
+    etag = make_etag(weather_history_version(city), *args)
+    cached = not_modified(etag)
+    if cached is not None:
+        return cached
+
+    page = weather_history_page(
+        limit, since=since, city=city, columnar=fmt == "columnar"
+    )
+    metrics = calculate_weather_average(city=city)
+    return json_with_etag(_history_payload(page, since, fmt, metrics), etag)
+
+
+@main_bp.route("/api/cache_stats")
+@login_required
+def api_cache_stats():
+    """Expose hit, miss and staleness counters for the in-process caches."""
+    return jsonify(
+        {
+            "caches": cache_stats(),
+            "events": event_stats(),
+            "single_flight": single_flight_stats(),
+            "timeseries": timeseries_stats(),
+        }
+    )
+
+
+@main_bp.route("/api/upstream_stats")
+@login_required
+def api_upstream_stats():
+    """Expose per-host request, retry and connection reuse counters."""
+    return jsonify({"hosts": upstream_stats()})
 
 
 def _coerce_bool(value: Any) -> bool:
@@ -198,6 +306,7 @@ def update_settings_api():
         return jsonify({"settings": settings.to_dict(), "updated": {}}), 200
 
     db.session.commit()
+    invalidate_user(current_user.id)
     g._user_settings = settings
 
     return jsonify({"settings": settings.to_dict(), "updated": updated_fields}), 200
@@ -5,7 +5,8 @@ from datetime import datetime, timezone
 from flask import Blueprint, current_app, jsonify
 from flask_login import login_required
 
-from app.services.news_service import get_headlines
+from app.routes.conditional import cache_validator, json_with_etag, not_modified
+from app.services.news_service import get_headlines, headlines_version, news_payload
 
 news_bp = Blueprint("news", __name__)
 
@@ -32,8 +33,9 @@ def news():
     if not isinstance(headlines, list):
         headlines = []
 
-    payload = {
-        "headlines": headlines[:5],
-        "last_updated": datetime.now(timezone.utc).isoformat(),
-    }
-    return jsonify(payload)
+    etag, weak, last_updated = cache_validator("news", headlines_version(), headlines)
+    cached = not_modified(etag, weak)
+    if cached is not None:
+        return cached
+
+    return json_with_etag(news_payload(headlines, last_updated), etag, weak)
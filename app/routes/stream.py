@@ -0,0 +1,60 @@
+"""Server-Sent Events stream that pushes live dashboard updates."""
+
+from __future__ import annotations
+
+import time
+
+from flask import Blueprint, Response, current_app, request
+from flask_login import login_required
+
+from app.services.event_service import hub
+from app.services.settings_service import get_user_settings
+from app.services.weather_service import normalize_city
+
+stream_bp = Blueprint("stream", __name__)
+
+
+def _last_event_id() -> int | None:
+    raw = request.headers.get("Last-Event-ID") or request.args.get("last_event_id")
+    try:
+        return int(raw) if raw else None
+    except ValueError:
+        return None
+
+
+@stream_bp.route("/api/stream")
+@login_required
+def event_stream():
+    """Stream crypto, weather (for one city), news and anomaly events."""
+    city = normalize_city(request.args.get("city") or get_user_settings().default_city)
+    heartbeat = current_app.config["EVENT_STREAM_HEARTBEAT"]
+    max_age = current_app.config["EVENT_STREAM_MAX_AGE"]
+    retry_ms = int(current_app.config["EVENT_STREAM_RETRY_SECONDS"] * 1000)
+
+    subscription, backlog, resync = hub.subscribe(
+        topics=frozenset({city}), last_event_id=_last_event_id()
+    )
+
+    # The generator deliberately holds no request or app context, so the
+    # database session is released as soon as the headers are sent.
+    def generate():
+        try:
+            yield f"retry: {retry_ms}\n\n"
+            if resync:
+                yield "event: resync\ndata: {}\n\n"
+            for event in backlog:
+                yield event.encode()
+            # Streams are recycled periodically; EventSource reconnects with
+            # Last-Event-ID and picks up from the replay buffer.
+            deadline = time.monotonic() + max_age
+            while time.monotonic() < deadline:
+                event = subscription.get(timeout=heartbeat)
+                yield event.encode() if event is not None else ": keepalive\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return Response(
+        generate(),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
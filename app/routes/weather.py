@@ -5,9 +5,13 @@ from datetime import datetime, timezone
 from flask import Blueprint, current_app, jsonify, request
 from flask_login import login_required
 
+from app.routes.conditional import cache_validator, json_with_etag, not_modified
 from app.services.settings_service import get_user_settings
-from app.services.weather_service import get_weather_forecast
-from app.services.history_service import save_weather_data
+from app.services.weather_service import (
+    get_weather_forecast,
+    weather_forecast_version,
+    weather_payload,
+)
 
 weather_bp = Blueprint("weather", __name__)
 
@@ -41,25 +45,11 @@ def weather():
     if not isinstance(data, dict):
         data = {}
 
-    main = data.get("main", {}) if isinstance(data, dict) else {}
-    wind = data.get("wind", {}) if isinstance(data, dict) else {}
-    weather_list = data.get("weather") if isinstance(data, dict) else []
-    primary = weather_list[0] if weather_list else {}
+    etag, weak, last_updated = cache_validator(
+        "weather", weather_forecast_version(target_city), data
+    )
+    cached = not_modified(etag, weak)
+    if cached is not None:
+        return cached
 
-    temperature = main.get("temp")
-    condition = primary.get("description") or primary.get("main", "")
-
-    payload = {
-        "city": data.get("name") if isinstance(data, dict) else None,
-        "temperature": temperature,
-        "condition": condition,
-        "humidity": main.get("humidity"),
-        "wind_speed": wind.get("speed"),
-        "last_updated": datetime.now(timezone.utc).isoformat(),
-    }
-
-    # Record the weather snapshot when the API (or fallback) returns the essentials.
-    if isinstance(temperature, (int, float)) and condition:
-        save_weather_data(temperature, condition)
-
-    return jsonify(payload)
+    return json_with_etag(weather_payload(data, last_updated), etag, weak)
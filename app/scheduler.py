@@ -2,16 +2,52 @@ from __future__ import annotations
 
 import atexit
 import os
-from typing import Callable
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
 
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
-from flask import Flask
+from apscheduler.triggers.interval import IntervalTrigger
+from flask import Flask, current_app
 
+from app.query_tracking import track_queries
+from app.services.cache_service import version_timestamp
+from app.services.crypto_service import (
+    crypto_payload,
+    crypto_prices_version,
+    peek_crypto_prices,
+    refresh_crypto_prices,
+)
+from app.services.event_service import hub
+from app.services.history_service import save_crypto_data, save_weather_data
+from app.services.metrics_service import JOB_LATENCY, JOB_RUNS
+from app.services.news_service import (
+    headlines_version,
+    news_payload,
+    peek_headlines,
+    refresh_headlines,
+)
 from app.services.notification_service import send_daily_summary
+from app.services.retention_service import prune_all
+from app.services.settings_service import weather_cities
+from app.services.weather_service import (
+    normalize_city,
+    peek_weather_forecast,
+    refresh_weather_forecast,
+    weather_forecast_version,
+    weather_payload,
+)
 
 _scheduler: BackgroundScheduler | None = None
 
+_DEFAULT_INGEST_WORKERS = 4
+_DEFAULT_INGEST_DEADLINE = 30.0
+
+_ingest_executor: ThreadPoolExecutor | None = None
+_ingest_executor_lock = threading.Lock()
+
 
 def _safe_int(value: str | None, default: int) -> int:
     if not value:
@@ -22,27 +58,171 @@ def _safe_int(value: str | None, default: int) -> int:
         return default
 
 
-def _build_job(app: Flask) -> Callable[[], None]:
+def _build_job(
+    app: Flask, func: Callable[[], None], label: str, job_id: str | None = None
+) -> Callable[[], None]:
+    job_id = job_id or label
+
     def _job() -> None:
         with app.app_context():
-            try:
-                send_daily_summary()
-            except Exception:
-                app.logger.exception("Daily summary job failed.")
+            outcome = "success"
+            with JOB_LATENCY.time(job=job_id), track_queries(f"Job {job_id}"):
+                try:
+                    func()
+                except Exception:
+                    outcome = "failure"
+                    app.logger.exception("%s job failed.", label)
+            JOB_RUNS.inc(job=job_id, outcome=outcome)
 
     return _job
 
 
+def ingest_crypto() -> None:
+    """Poll CoinGecko, persist the snapshot (plus anomaly checks) and push it live.
+
+    A failed poll records nothing; canned fallback prices never enter history.
+    """
+    prices = refresh_crypto_prices()
+    if prices:
+        save_crypto_data({asset: quote.get("usd") for asset, quote in prices.items()})
+
+    # Push what ``/crypto`` now serves (the last good prices if this poll failed).
+    version = crypto_prices_version()
+    hub.publish(
+        "crypto",
+        crypto_payload(peek_crypto_prices(), version_timestamp(version)),
+        dedupe=True,
+    )
+
+
+def get_ingest_executor() -> ThreadPoolExecutor:
+    """Return the executor used for per-city weather polls, creating it once."""
+    global _ingest_executor
+    if _ingest_executor is None:
+        with _ingest_executor_lock:
+            if _ingest_executor is None:
+                max_workers = current_app.config.get(
+                    "WEATHER_INGEST_WORKERS", _DEFAULT_INGEST_WORKERS
+                )
+                _ingest_executor = ThreadPoolExecutor(
+                    max_workers=max(int(max_workers), 1),
+                    thread_name_prefix="weather-ingest",
+                )
+    return _ingest_executor
+
+
+def ingest_weather() -> None:
+    """Poll OpenWeatherMap once per distinct city and persist each real reading.
+
+    Cities come from every user's settings plus ``WEATHER_INGEST_CITY``, so
+    the upstream cost scales with the number of cities, not users. Polls run
+    on a bounded pool (``WEATHER_INGEST_WORKERS``); cities that miss
+    ``WEATHER_INGEST_DEADLINE`` record nothing this run, while their
+    in-flight fetch keeps running and warms the cache. Saving and publishing
+    stay on the job thread, which holds the app context.
+    """
+    cities = weather_cities(current_app.config.get("WEATHER_INGEST_CITY"))
+    if not cities:
+        return
+    deadline = float(
+        current_app.config.get("WEATHER_INGEST_DEADLINE", _DEFAULT_INGEST_DEADLINE)
+    )
+    executor = get_ingest_executor()
+    futures: Dict[str, Future] = {
+        city: executor.submit(refresh_weather_forecast, city) for city in cities
+    }
+    done, _ = wait(futures.values(), timeout=deadline)
+
+    for city, future in futures.items():
+        data: Optional[Dict[str, Any]] = None
+        if future not in done:
+            current_app.logger.warning(
+                "Weather poll for %s missed the %.1fs deadline; skipped this run.",
+                city,
+                deadline,
+            )
+        elif future.exception() is not None:
+            current_app.logger.warning(
+                "Weather poll for %s failed: %s", city, future.exception()
+            )
+        else:
+            data = future.result()
+
+        # Record only real readings; a failed poll leaves history untouched.
+        if data:
+            main = data.get("main", {})
+            weather_list = data.get("weather") or []
+            primary = weather_list[0] if weather_list else {}
+            temperature = main.get("temp")
+            condition = primary.get("description") or primary.get("main", "")
+            if isinstance(temperature, (int, float)) and condition:
+                save_weather_data(temperature, condition, city)
+
+        version = weather_forecast_version(city)
+        hub.publish(
+            "weather",
+            weather_payload(peek_weather_forecast(city), version_timestamp(version)),
+            topic=normalize_city(city),
+            dedupe=True,
+        )
+
+
+def ingest_news() -> None:
+    """Refresh the cached headlines and push them to live dashboards."""
+    refresh_headlines()
+    version = headlines_version()
+    hub.publish(
+        "news",
+        news_payload(peek_headlines(), version_timestamp(version)),
+        dedupe=True,
+    )
+
+
+def prune_history() -> None:
+    """Apply the configured retention policies in bulk."""
+    deleted = prune_all()
+    if any(deleted.values()):
+        current_app.logger.info("Retention pruned rows: %s", deleted)
+
+
+def _add_ingestion_jobs(app: Flask, scheduler: BackgroundScheduler) -> None:
+    jobs = (
+        ("ingest-crypto", ingest_crypto, "CRYPTO_POLL_SECONDS"),
+        ("ingest-weather", ingest_weather, "WEATHER_POLL_SECONDS"),
+        ("ingest-news", ingest_news, "NEWS_POLL_SECONDS"),
+        ("prune-history", prune_history, "RETENTION_PRUNE_SECONDS"),
+    )
+    now = datetime.now(timezone.utc)
+    for job_id, func, interval_key in jobs:
+        interval = max(int(app.config.get(interval_key, 0) or 0), 0)
+        if not interval:
+            app.logger.info("Ingestion job %s disabled (%s=0).", job_id, interval_key)
+            continue
+        scheduler.add_job(
+            func=_build_job(app, func, job_id),
+            trigger=IntervalTrigger(seconds=interval),
+            id=job_id,
+            name=job_id,
+            replace_existing=True,
+            next_run_time=now,
+            max_instances=1,
+            coalesce=True,
+        )
+        app.logger.info("Ingestion job %s scheduled every %ss.", job_id, interval)
+
+
 def start_scheduler(app: Flask) -> None:
-    """Start the APScheduler background scheduler if enabled."""
+    """Start the APScheduler background scheduler if any job is enabled."""
     global _scheduler
 
-    if not app.config.get("ENABLE_DAILY_SUMMARY", True):
-        app.logger.info("Daily summary scheduler disabled via configuration.")
+    summary_enabled = app.config.get("ENABLE_DAILY_SUMMARY", True)
+    ingestion_enabled = app.config.get("ENABLE_INGESTION", True)
+    if not summary_enabled and not ingestion_enabled:
+        app.logger.info("Background scheduler disabled via configuration.")
         return
 
     if _scheduler and _scheduler.running:
-        app.logger.debug("Daily summary scheduler already running; skipping init.")
+        app.logger.debug("Background scheduler already running; skipping init.")
         return
 
     # Avoid spawning duplicate schedulers when the reloader boots the stub process.
@@ -50,30 +230,48 @@ def start_scheduler(app: Flask) -> None:
         app.logger.debug("Deferring scheduler start until reloader child process.")
         return
 
-    hour = _safe_int(os.environ.get("DAILY_SUMMARY_HOUR"), default=8)
-    minute = _safe_int(os.environ.get("DAILY_SUMMARY_MINUTE"), default=0)
-    timezone = app.config.get("SCHEDULER_TIMEZONE", "UTC")
+    timezone_name = app.config.get("SCHEDULER_TIMEZONE", "UTC")
+    scheduler = BackgroundScheduler(timezone=timezone_name)
 
-    scheduler = BackgroundScheduler(timezone=timezone)
-    scheduler.add_job(
-        func=_build_job(app),
-        trigger=CronTrigger(hour=hour, minute=minute),
-        id="daily-summary",
-        replace_existing=True,
-    )
-    scheduler.start()
+    if summary_enabled:
+        hour = _safe_int(os.environ.get("DAILY_SUMMARY_HOUR"), default=8)
+        minute = _safe_int(os.environ.get("DAILY_SUMMARY_MINUTE"), default=0)
+        scheduler.add_job(
+            func=_build_job(
+                app, send_daily_summary, "Daily summary", "daily-summary"
+            ),
+            trigger=CronTrigger(hour=hour, minute=minute),
+            id="daily-summary",
+            name="daily-summary",
+            replace_existing=True,
+        )
+        app.logger.info(
+            "Daily summary scheduled (cron=%02d:%02d %s).",
+            hour,
+            minute,
+            timezone_name,
+        )
+    else:
+        app.logger.info("Daily summary scheduler disabled via configuration.")
 
+    if ingestion_enabled:
+        _add_ingestion_jobs(app, scheduler)
+    else:
+        app.logger.info("Background ingestion disabled via configuration.")
+
+    scheduler.start()
     _scheduler = scheduler
-    app.logger.info(
-        "Daily summary scheduler started (cron=%02d:%02d %s).", hour, minute, timezone
-    )
+    app.logger.info("Background scheduler started.")
 
 
 def _shutdown_scheduler() -> None:
-    global _scheduler
+    global _scheduler, _ingest_executor
     if _scheduler and _scheduler.running:
         _scheduler.shutdown(wait=False)
         _scheduler = None
+    if _ingest_executor is not None:
+        _ingest_executor.shutdown(wait=False, cancel_futures=True)
+        _ingest_executor = None
 
 
 atexit.register(_shutdown_scheduler)
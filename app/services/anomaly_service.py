@@ -0,0 +1,463 @@
+"""Pluggable anomaly detectors that score whole series with NumPy.
+
+Each detector scores every point of a series against the points before it
+in one vectorized pass, so the same code backfills a full history and, run
+over a short tail, scores a newly ingested point. A point is anomalous when
+``|score|`` exceeds the detector's threshold, and only the first point of a
+run of consecutive anomalous points is reported: a sustained excursion yields
+one finding instead of one per poll.
+
+Detectors are chosen per metric from the environment::
+
+    ANOMALY_DETECTORS_<METRIC>    e.g. ANOMALY_DETECTORS_BITCOIN, ANOMALY_DETECTORS_NEW_YORK
+    ANOMALY_DETECTORS_<CATEGORY>  ANOMALY_DETECTORS_CRYPTO / ANOMALY_DETECTORS_WEATHER
+
+Each value is a comma separated list of detector names, optionally with
+``:key=value`` parameters, e.g. ``zscore:threshold=2.5:window=100,roc:threshold=8``.
+"""
+
+from __future__ import annotations
+
+import logging
+import math
+import os
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, ClassVar, Dict, List, Optional, Sequence, Tuple, Type
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DETECTORS: Dict[str, str] = {
+    "crypto": "zscore,roc",
+    "weather": "zscore",
+}
+
+# Seconds between ingested points per category, used when a detector needs
+# to turn a time span into a number of points.
+_POLL_SECONDS: Dict[str, Tuple[str, float]] = {
+    "crypto": ("CRYPTO_POLL_SECONDS", 60.0),
+    "weather": ("WEATHER_POLL_SECONDS", 300.0),
+}
+
+_US_PER_SECOND = 1_000_000
+
+
+@dataclass(frozen=True)
+class Finding:
+    """An anomalous point: its position in the scored arrays and its score."""
+
+    detector: str
+    index: int
+    value: float
+    score: float
+    message: str
+
+
+class Detector:
+    """Base class: subclasses implement :meth:`score` over whole arrays."""
+
+    name: ClassVar[str]
+    default_threshold: ClassVar[float]
+    # Whether the constructor takes ``interval``, the seconds between points.
+    uses_interval: ClassVar[bool] = False
+
+    def __init__(self, threshold: float | None = None) -> None:
+        self.threshold = float(self.default_threshold if threshold is None else threshold)
+
+    @property
+    def lookback(self) -> Optional[int]:
+        """Prior points needed to score the newest one (``None``: all available)."""
+        return None
+
+    def score(self, values: np.ndarray, timestamps_us: np.ndarray) -> np.ndarray:
+        """Return one score per point (NaN where there is too little history)."""
+        raise NotImplementedError
+
+    def describe(self, metric: str, value: float, score: float) -> str:
+        raise NotImplementedError
+
+
+DETECTORS: Dict[str, Type[Detector]] = {}
+
+
+def register_detector(cls: Type[Detector]) -> Type[Detector]:
+    DETECTORS[cls.name] = cls
+    return cls
+
+
+def _safe_ratio(numerator: np.ndarray, denominator: np.ndarray) -> np.ndarray:
+    out = np.full(numerator.shape, np.nan)
+    np.divide(numerator, denominator, out=out, where=denominator > 0)
+    return out
+
+
+def _trailing_mean_std(
+    values: np.ndarray, window: int, group_start: Optional[np.ndarray] = None
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Mean, population std and count of the ``window`` points before each point.
+
+    ``group_start`` (the index each point's group begins at) keeps windows
+    from reaching into a previous group.
+    """
+    n = values.size
+    positions = np.arange(n)
+    first = np.maximum(positions - window, 0)
+    if group_start is not None:
+        first = np.maximum(first, group_start)
+    count = positions - first
+    # Centring first keeps the sum of squares well conditioned for prices.
+    centred = values - (values.mean() if n else 0.0)
+    sums = np.concatenate(([0.0], np.cumsum(centred)))
+    squares = np.concatenate(([0.0], np.cumsum(centred * centred)))
+    total = sums[positions] - sums[first]
+    total_sq = squares[positions] - squares[first]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        mean = total / count
+        variance = np.maximum(total_sq / count - mean * mean, 0.0)
+    return mean + (values.mean() if n else 0.0), np.sqrt(variance), count
+
+
+def _linear_recurrence(inputs: np.ndarray, decay: float, initial: float) -> np.ndarray:
+    """Evaluate ``y[t] = decay * y[t-1] + inputs[t]`` with ``y[-1] = initial``.
+
+    Vectorized in blocks short enough that ``decay ** -block`` stays finite.
+    """
+    out = np.empty(inputs.size)
+    if not inputs.size:
+        return out
+    if decay <= 0.0:
+        out[:] = inputs
+        return out
+    block = max(1, int(150 / max(-math.log10(decay), 1e-12)))
+    carry = initial
+    for start in range(0, inputs.size, block):
+        chunk = inputs[start : start + block]
+        steps = np.arange(chunk.size)
+        scaled = np.cumsum(chunk * decay ** (-steps))
+        out[start : start + chunk.size] = decay ** (steps + 1) * carry + decay**steps * scaled
+        carry = out[start + chunk.size - 1]
+    return out
+
+
+@register_detector
+class ZScoreDetector(Detector):
+    """Distance from the trailing window's mean in standard deviations."""
+
+    name = "zscore"
+    default_threshold = 2.0
+
+    def __init__(
+        self, threshold: float | None = None, window: int = 50, min_periods: int = 3
+    ) -> None:
+        super().__init__(threshold)
+        self.window = max(int(window), 2)
+        self.min_periods = max(int(min_periods), 2)
+
+    @property
+    def lookback(self) -> Optional[int]:
+        return self.window + 1
+
+    def score(self, values: np.ndarray, timestamps_us: np.ndarray) -> np.ndarray:
+        mean, std, count = _trailing_mean_std(values, self.window)
+        scores = _safe_ratio(values - mean, std)
+        scores[count < self.min_periods] = np.nan
+        return scores
+
+    def describe(self, metric: str, value: float, score: float) -> str:
+        return (
+            f"{metric} value {value:.2f} deviated {score:+.1f}σ from its "
+            f"{self.window}-point mean (threshold {self.threshold:g}σ)."
+        )
+
+
+@register_detector
+class EWMADetector(Detector):
+    """Deviation from an exponentially weighted mean, scaled by its EW std."""
+
+    name = "ewma"
+    default_threshold = 3.0
+
+    def __init__(
+        self, threshold: float | None = None, span: float = 20.0, min_periods: int = 5
+    ) -> None:
+        super().__init__(threshold)
+        self.span = max(float(span), 1.0)
+        self.alpha = 2.0 / (self.span + 1.0)
+        self.min_periods = max(int(min_periods), 2)
+
+    @property
+    def lookback(self) -> Optional[int]:
+        # Older points carry less than 1e-6 of the weight.
+        decay = 1.0 - self.alpha
+        return int(math.ceil(math.log(1e-6) / math.log(decay))) + 1 if decay > 0 else 2
+
+    def score(self, values: np.ndarray, timestamps_us: np.ndarray) -> np.ndarray:
+        if not values.size:
+            return np.empty(0)
+        decay = 1.0 - self.alpha
+        mean = _linear_recurrence(self.alpha * values, decay, float(values[0]))
+        prior_mean = np.concatenate(([values[0]], mean[:-1]))
+        deviation = values - prior_mean
+        variance = _linear_recurrence(decay * self.alpha * deviation * deviation, decay, 0.0)
+        prior_std = np.sqrt(np.concatenate(([0.0], variance[:-1])))
+        scores = _safe_ratio(deviation, prior_std)
+        scores[: self.min_periods] = np.nan
+        return scores
+
+    def describe(self, metric: str, value: float, score: float) -> str:
+        return (
+            f"{metric} value {value:.2f} deviated {score:+.1f}σ from its "
+            f"exponentially weighted mean (threshold {self.threshold:g}σ)."
+        )
+
+
+@register_detector
+class MADDetector(Detector):
+    """Robust z-score from the trailing window's median and median absolute deviation."""
+
+    name = "mad"
+    default_threshold = 3.5
+
+    def __init__(
+        self, threshold: float | None = None, window: int = 50, min_periods: int = 5
+    ) -> None:
+        super().__init__(threshold)
+        self.window = max(int(window), 3)
+        self.min_periods = max(int(min_periods), 3)
+
+    @property
+    def lookback(self) -> Optional[int]:
+        return self.window + 1
+
+    def score(self, values: np.ndarray, timestamps_us: np.ndarray) -> np.ndarray:
+        scores = np.full(values.size, np.nan)
+        if values.size <= self.min_periods:
+            return scores
+        padded = np.concatenate((np.full(self.window, np.nan), values[:-1]))
+        windows = np.lib.stride_tricks.sliding_window_view(padded, self.window)
+        windows = windows[self.min_periods :]
+        median = np.nanmedian(windows, axis=1)
+        mad = np.nanmedian(np.abs(windows - median[:, None]), axis=1)
+        # 0.6745 scales the MAD to a standard deviation for normal data.
+        scores[self.min_periods :] = _safe_ratio(
+            0.6745 * (values[self.min_periods :] - median), mad
+        )
+        return scores
+
+    def describe(self, metric: str, value: float, score: float) -> str:
+        return (
+            f"{metric} value {value:.2f} has a robust z-score of {score:+.1f} against "
+            f"its {self.window}-point median (threshold {self.threshold:g})."
+        )
+
+
+@register_detector
+class RateOfChangeDetector(Detector):
+    """Percentage change from the previous point."""
+
+    name = "roc"
+    default_threshold = 5.0
+
+    @property
+    def lookback(self) -> Optional[int]:
+        return 2
+
+    def score(self, values: np.ndarray, timestamps_us: np.ndarray) -> np.ndarray:
+        scores = np.full(values.size, np.nan)
+        if values.size > 1:
+            previous = values[:-1]
+            scores[1:] = _safe_ratio(100.0 * (values[1:] - previous), np.abs(previous))
+        return scores
+
+    def describe(self, metric: str, value: float, score: float) -> str:
+        return (
+            f"{metric} moved {score:+.1f}% in one step to {value:.2f} "
+            f"(threshold {self.threshold:g}%)."
+        )
+
+
+@register_detector
+class SeasonalResidualDetector(Detector):
+    """Deviation from earlier points in the same phase of a cycle (hour of day by default).
+
+    Scoring a new point needs the last ``cycles`` periods of history, so the
+    series must retain at least ``min_periods`` periods before any point is
+    scored.
+    """
+
+    name = "seasonal"
+    default_threshold = 3.0
+    uses_interval = True
+
+    def __init__(
+        self,
+        threshold: float | None = None,
+        period: float = 86400.0,
+        buckets: int = 24,
+        cycles: int = 14,
+        min_periods: int = 3,
+        interval: float = 300.0,
+    ) -> None:
+        super().__init__(threshold)
+        self.period_us = max(int(float(period) * _US_PER_SECOND), 1)
+        self.buckets = max(int(buckets), 1)
+        self.cycles = max(int(cycles), 2)
+        self.min_periods = max(int(min_periods), 2)
+        self.interval_us = max(int(float(interval) * _US_PER_SECOND), 1)
+
+    @property
+    def lookback(self) -> Optional[int]:
+        # ``cycles`` whole periods at one point per ``interval``.
+        return int(math.ceil(self.cycles * self.period_us / self.interval_us)) + 1
+
+    def score(self, values: np.ndarray, timestamps_us: np.ndarray) -> np.ndarray:
+        scores = np.full(values.size, np.nan)
+        if not values.size:
+            return scores
+        phase = (timestamps_us % self.period_us) * self.buckets // self.period_us
+        # Group by phase bucket while keeping time order inside each bucket.
+        order = np.lexsort((np.arange(values.size), phase))
+        grouped = values[order]
+        sorted_phase = phase[order]
+        boundaries = np.flatnonzero(np.diff(sorted_phase)) + 1
+        starts = np.zeros(values.size, dtype=np.int64)
+        starts[boundaries] = boundaries
+        group_start = np.maximum.accumulate(starts)
+        mean, std, count = _trailing_mean_std(grouped, self.cycles, group_start)
+        grouped_scores = _safe_ratio(grouped - mean, std)
+        grouped_scores[count < self.min_periods] = np.nan
+        scores[order] = grouped_scores
+        return scores
+
+    def describe(self, metric: str, value: float, score: float) -> str:
+        return (
+            f"{metric} value {value:.2f} deviated {score:+.1f}σ from its usual level "
+            f"at this point of the cycle (threshold {self.threshold:g}σ)."
+        )
+
+
+def episode_starts(scores: np.ndarray, threshold: float) -> np.ndarray:
+    """Indices where ``|scores|`` first exceeds ``threshold`` after a normal point."""
+    flagged = np.abs(np.nan_to_num(scores, nan=0.0)) > threshold
+    previous = np.concatenate(([False], flagged[:-1]))
+    return np.flatnonzero(flagged & ~previous)
+
+
+def scan(
+    detectors: Sequence[Detector],
+    metric: str,
+    values: np.ndarray,
+    timestamps_us: np.ndarray,
+    start: int = 0,
+) -> List[Finding]:
+    """Run ``detectors`` over a series; report episodes starting at ``start`` or later.
+
+    Non-finite values (e.g. an asset missing from a snapshot) are skipped.
+    """
+    values = np.asarray(values, dtype=float)
+    timestamps_us = np.asarray(timestamps_us, dtype=np.int64)
+    positions = np.flatnonzero(np.isfinite(values))
+    finite_values = values[positions]
+    finite_timestamps = timestamps_us[positions]
+    first = int(np.searchsorted(positions, start))
+
+    findings: List[Finding] = []
+    for detector in detectors:
+        scores = detector.score(finite_values, finite_timestamps)
+        for idx in episode_starts(scores, detector.threshold):
+            if idx < first:
+                continue
+            value, score = float(finite_values[idx]), float(scores[idx])
+            findings.append(
+                Finding(
+                    detector=detector.name,
+                    index=int(positions[idx]),
+                    value=value,
+                    score=score,
+                    message=detector.describe(metric, value, score),
+                )
+            )
+    return findings
+
+
+def required_lookback(detectors: Sequence[Detector]) -> Optional[int]:
+    """Points of history needed to score a new point with every detector."""
+    lookbacks = [detector.lookback for detector in detectors]
+    if any(lookback is None for lookback in lookbacks):
+        return None
+    return max(lookbacks, default=1)
+
+
+def _coerce(raw: str) -> Any:
+    try:
+        number = float(raw)
+    except ValueError:
+        return raw
+    return int(number) if number.is_integer() and "." not in raw else number
+
+
+def parse_detectors(spec: str, interval: float | None = None) -> List[Detector]:
+    """Build detectors from a spec such as ``"zscore:threshold=2.5,roc"``.
+
+    ``interval`` is the default spacing in seconds for detectors that size
+    their history by time.
+    """
+    detectors: List[Detector] = []
+    for item in spec.split(","):
+        name, *options = [part.strip() for part in item.split(":")]
+        if not name:
+            continue
+        cls = DETECTORS.get(name.lower())
+        if cls is None:
+            logger.warning("Unknown anomaly detector %r ignored.", name)
+            continue
+        params = {}
+        for option in options:
+            key, _, raw = option.partition("=")
+            if key and raw:
+                params[key.strip()] = _coerce(raw.strip())
+        if cls.uses_interval and interval is not None:
+            params.setdefault("interval", interval)
+        try:
+            detectors.append(cls(**params))
+        except (TypeError, ValueError) as exc:
+            logger.warning("Invalid options for anomaly detector %r: %s", name, exc)
+    return detectors
+
+
+_CONFIGURED: Dict[Tuple[str, str], List[Detector]] = {}
+_CONFIGURED_LOCK = threading.Lock()
+
+
+def _env_name(key: str) -> str:
+    return "ANOMALY_DETECTORS_" + re.sub(r"[^A-Z0-9]+", "_", key.upper()).strip("_")
+
+
+def _poll_interval(category: str) -> float | None:
+    env_name, default = _POLL_SECONDS.get(category, (None, None))
+    if env_name is None:
+        return None
+    try:
+        value = float(os.environ.get(env_name) or default)
+    except ValueError:
+        return default
+    return value if value > 0 else default
+
+
+def detectors_for(category: str, metric: str) -> List[Detector]:
+    """Return the detectors configured for ``metric`` (falling back to its category)."""
+    key = (category, metric)
+    with _CONFIGURED_LOCK:
+        cached = _CONFIGURED.get(key)
+    if cached is not None:
+        return cached
+    spec = os.environ.get(_env_name(metric))
+    if spec is None:
+        spec = os.environ.get(_env_name(category), DEFAULT_DETECTORS.get(category, "zscore"))
+    detectors = parse_detectors(spec, _poll_interval(category))
+    with _CONFIGURED_LOCK:
+        _CONFIGURED[key] = detectors
+    return detectors
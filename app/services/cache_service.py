@@ -0,0 +1,325 @@
+"""In-process TTL cache and request coalescing shared by the upstream fetchers.
+
+Entries are served fresh until their TTL elapses. After that they are served
+stale (for up to ``stale_ttl`` seconds) while a single background thread
+refreshes them, so callers never wait on an upstream round-trip for a key that
+has been seen before. Cold keys go through :class:`SingleFlight` so concurrent
+misses share one upstream call.
+"""
+
+from __future__ import annotations
+
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple, TypeVar
+
+from app.services.metrics_service import MetricFamily, registry
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Optional[Any]]
+T = TypeVar("T")
+
+_REGISTRY: Dict[str, "TTLCache"] = {}
+_REGISTRY_LOCK = threading.Lock()
+
+
+def env_float(name: str, default: float) -> float:
+    """Read a non-negative float from the environment, falling back on errors."""
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        return max(0.0, float(raw))
+    except (TypeError, ValueError):
+        return default
+
+
+def env_int(name: str, default: int) -> int:
+    """Read a non-negative integer from the environment, falling back on errors."""
+    raw = os.environ.get(name)
+    if not raw:
+        return default
+    try:
+        return max(0, int(raw))
+    except (TypeError, ValueError):
+        return default
+
+
+def version_timestamp(version: Optional[Tuple[int, float]]) -> str:
+    """ISO time a cached value was stored, per :meth:`TTLCache.version` (now if unknown)."""
+    if version is None:
+        return datetime.now(timezone.utc).isoformat()
+    return datetime.fromtimestamp(version[1], timezone.utc).isoformat()
+
+
+@dataclass
+class _Entry:
+    value: Any
+    stored_at: float
+    expires_at: float
+    generation: int = 0
+    updated_at: float = 0.0
+
+
+class TTLCache:
+    """Size-bounded LRU cache with per-entry expiry and stale-while-revalidate.
+
+    ``loader`` callables return ``None`` to signal an upstream failure; such
+    results are never cached, so a failing source keeps serving its last good
+    value (while it is within the stale window) instead of a fallback.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttl: float,
+        max_entries: int = 128,
+        stale_ttl: float = 0.0,
+    ) -> None:
+        self.name = name
+        self.ttl = float(ttl)
+        self.stale_ttl = float(stale_ttl)
+        self.max_entries = max(1, int(max_entries))
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._refreshing: set[Hashable] = set()
+        self._generation = 0
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {
+            "hits": 0,
+            "misses": 0,
+            "stale_hits": 0,
+            "refreshes": 0,
+            "refresh_failures": 0,
+            "evictions": 0,
+        }
+        with _REGISTRY_LOCK:
+            _REGISTRY[name] = self
+
+    def get_or_load(self, key: Hashable, loader: Loader) -> Optional[Any]:
+        """Return the cached value for ``key``, loading it on a miss."""
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                if now < entry.expires_at:
+                    self._entries.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return entry.value
+                if now < entry.expires_at + self.stale_ttl:
+                    self._entries.move_to_end(key)
+                    self._stats["stale_hits"] += 1
+                    self._schedule_refresh(key, loader)
+                    return entry.value
+            self._stats["misses"] += 1
+
+        value = loader()
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def refresh(self, key: Hashable, loader: Loader) -> Optional[Any]:
+        """Load ``key`` now, bypassing any cached copy, and store the result."""
+        value = loader()
+        with self._lock:
+            if value is None:
+                self._stats["refresh_failures"] += 1
+            else:
+                self._stats["refreshes"] += 1
+        if value is not None:
+            self.set(key, value)
+        return value
+
+    def peek(self, key: Hashable) -> Optional[Any]:
+        """Return the last stored value for ``key`` regardless of its age."""
+        with self._lock:
+            entry = self._entries.get(key)
+        return entry.value if entry is not None else None
+
+    def version(self, key: Hashable) -> Optional[Tuple[int, float]]:
+        """Return ``(generation, updated_at)`` for ``key``'s stored value.
+
+        The generation changes every time a new value is stored, which makes
+        it a cheap validator for conditional responses; ``updated_at`` is the
+        wall-clock time the value was stored.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None:
+            return None
+        return entry.generation, entry.updated_at
+
+    def set(self, key: Hashable, value: Any) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._generation += 1
+            self._entries[key] = _Entry(
+                value=value,
+                stored_at=now,
+                expires_at=now + self.ttl,
+                generation=self._generation,
+                updated_at=time.time(),
+            )
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._stats["evictions"] += 1
+
+    def invalidate(self, key: Hashable | None = None) -> None:
+        """Drop ``key`` (or every entry when omitted)."""
+        with self._lock:
+            if key is None:
+                self._entries.clear()
+            else:
+                self._entries.pop(key, None)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot: Dict[str, Any] = dict(self._stats)
+            snapshot["size"] = len(self._entries)
+        lookups = snapshot["hits"] + snapshot["stale_hits"] + snapshot["misses"]
+        snapshot["hit_ratio"] = (
+            (snapshot["hits"] + snapshot["stale_hits"]) / lookups if lookups else None
+        )
+        snapshot["ttl"] = self.ttl
+        snapshot["stale_ttl"] = self.stale_ttl
+        snapshot["max_entries"] = self.max_entries
+        return snapshot
+
+    def _schedule_refresh(self, key: Hashable, loader: Loader) -> None:
+        # Caller holds ``self._lock``; only one refresh per key may be in flight.
+        if key in self._refreshing:
+            return
+        self._refreshing.add(key)
+        thread = threading.Thread(
+            target=self._refresh,
+            args=(key, loader),
+            name=f"cache-refresh-{self.name}",
+            daemon=True,
+        )
+        thread.start()
+
+    def _refresh(self, key: Hashable, loader: Loader) -> None:
+        try:
+            value = loader()
+        except Exception:  # pragma: no cover - defensive
+            logger.exception("Background refresh failed for %s cache.", self.name)
+            value = None
+
+        with self._lock:
+            self._refreshing.discard(key)
+            if value is None:
+                self._stats["refresh_failures"] += 1
+            else:
+                self._stats["refreshes"] += 1
+
+        if value is not None:
+            self.set(key, value)
+
+
+class _InFlightCall:
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self) -> None:
+        self.done = threading.Event()
+        self.result: Any = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """Coalesce concurrent calls that share a key into one execution.
+
+    The first caller for a key runs ``fn``; everyone arriving while it is in
+    flight blocks and receives the same return value (or exception).
+    """
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _InFlightCall] = {}
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"executions": 0, "shared": 0}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        with self._lock:
+            call = self._calls.get(key)
+            if call is not None:
+                self._stats["shared"] += 1
+                leader = False
+            else:
+                call = _InFlightCall()
+                self._calls[key] = call
+                self._stats["executions"] += 1
+                leader = True
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+        except BaseException as exc:
+            call.error = exc
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+        return call.result
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            snapshot = dict(self._stats)
+            snapshot["in_flight"] = len(self._calls)
+        return snapshot
+
+
+upstream_flight = SingleFlight()
+
+
+def cache_stats() -> Dict[str, Dict[str, Any]]:
+    """Return counters for every registered cache keyed by cache name."""
+    with _REGISTRY_LOCK:
+        caches = list(_REGISTRY.values())
+    return {cache.name: cache.stats() for cache in caches}
+
+
+def single_flight_stats() -> Dict[str, int]:
+    """Return how many upstream calls ran versus how many were shared."""
+    return upstream_flight.stats()
+
+
+@registry.register_collector
+def _collect_cache_metrics() -> List[MetricFamily]:
+    lookups = MetricFamily(
+        "dashboard_cache_lookups_total", "counter", "Cache lookups by cache and result."
+    )
+    refreshes = MetricFamily(
+        "dashboard_cache_refreshes_total", "counter", "Cache reloads by cache and outcome."
+    )
+    evictions = MetricFamily(
+        "dashboard_cache_evictions_total", "counter", "Entries evicted to respect max size."
+    )
+    entries = MetricFamily("dashboard_cache_entries", "gauge", "Entries currently cached.")
+    for name, stats in cache_stats().items():
+        for result in ("hits", "stale_hits", "misses"):
+            lookups.add(stats[result], cache=name, result=result)
+        refreshes.add(stats["refreshes"], cache=name, outcome="success")
+        refreshes.add(stats["refresh_failures"], cache=name, outcome="failure")
+        evictions.add(stats["evictions"], cache=name)
+        entries.add(stats["size"], cache=name)
+
+    flights = MetricFamily(
+        "dashboard_single_flight_calls_total",
+        "counter",
+        "Coalesced upstream loads: executed versus shared with a call in flight.",
+    )
+    for result, value in single_flight_stats().items():
+        if result != "in_flight":
+            flights.add(value, result=result)
+    return [lookups, refreshes, evictions, entries, flights]
@@ -1,40 +1,148 @@
 from __future__ import annotations
 
-from typing import Dict
+import os
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
 from requests import HTTPError, RequestException
 
-COIN_GECKO_URL = (
-    "https://api.coingecko.com/api/v3/simple/price"
-    "?ids=bitcoin,ethereum&vs_currencies=usd"
-)
+from app.services.cache_service import TTLCache, env_float, env_int, upstream_flight
+from app.services.metrics_service import FALLBACKS
+from app.services.upstream_client import upstream
+
+COIN_GECKO_BASE_URL = os.environ.get(
+    "COINGECKO_BASE_URL", "https://api.coingecko.com/api/v3"
+).rstrip("/")
+COIN_GECKO_URL = f"{COIN_GECKO_BASE_URL}/simple/price"
+DEFAULT_ASSETS = ("bitcoin", "ethereum")
+VS_CURRENCY = "usd"
 
 _CRYPTO_FALLBACK: Dict[str, Dict[str, float]] = {
     "bitcoin": {"usd": 27000.0},
     "ethereum": {"usd": 1800.0},
 }
 
+_BATCH_SIZE = max(env_int("COINGECKO_BATCH_SIZE", 50), 1)
+
+_PRICE_CACHE = TTLCache(
+    "crypto",
+    ttl=env_float("CRYPTO_CACHE_TTL", 60.0),
+    max_entries=8,
+    stale_ttl=env_float("CRYPTO_CACHE_STALE_TTL", 600.0),
+)
+
+
+def _parse_assets(raw: str | None) -> Tuple[str, ...]:
+    assets: List[str] = []
+    for item in (raw or "").split(","):
+        asset = item.strip().lower()
+        if asset and asset not in assets:
+            assets.append(asset)
+    return tuple(assets) or DEFAULT_ASSETS
+
+
+TRACKED_ASSETS: Tuple[str, ...] = _parse_assets(os.environ.get("CRYPTO_ASSETS"))
+
+
+def _fallback_prices() -> Dict[str, Dict[str, float]]:
+    return {
+        asset: dict(_CRYPTO_FALLBACK[asset])
+        for asset in TRACKED_ASSETS
+        if asset in _CRYPTO_FALLBACK
+    }
+
+
+def _serve_fallback() -> Dict[str, Dict[str, float]]:
+    FALLBACKS.inc(source="crypto")
+    return _fallback_prices()
+
+
+def _with_fallbacks(prices: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Fill assets a partial fetch missed with canned prices, for display only."""
+    missing = {
+        asset: fallback
+        for asset, fallback in _fallback_prices().items()
+        if asset not in prices
+    }
+    if not missing:
+        return prices
+    FALLBACKS.inc(source="crypto_partial")
+    return {**prices, **missing}
+
+
+def _fetch_crypto_prices() -> Optional[Dict[str, Dict[str, float]]]:
+    """Fetch every tracked asset in ``COINGECKO_BATCH_SIZE`` batches.
+
+    Returns ``None`` only when no batch produced a price, so a single failing
+    batch does not discard the rest of the watchlist. Assets whose batch
+    failed are left out rather than filled with canned prices, so ingestion
+    never records them.
+    """
+    result: Dict[str, Dict[str, float]] = {}
+    for offset in range(0, len(TRACKED_ASSETS), _BATCH_SIZE):
+        batch = TRACKED_ASSETS[offset : offset + _BATCH_SIZE]
+        params = {"ids": ",".join(batch), "vs_currencies": VS_CURRENCY}
+        try:
+            response = upstream.get(COIN_GECKO_URL, params=params)
+            response.raise_for_status()
+            payload = response.json()
+        except (HTTPError, RequestException, ValueError):
+            # The batch's assets are missing from this snapshot.
+            continue
+        if not isinstance(payload, dict):
+            continue
+        for asset in batch:
+            value = (payload.get(asset) or {}).get(VS_CURRENCY)
+            if isinstance(value, (int, float)):
+                result[asset] = {VS_CURRENCY: float(value)}
+
+    return result or None
+
+
+def _load_crypto_prices() -> Optional[Dict[str, Dict[str, float]]]:
+    return upstream_flight.do(("crypto", TRACKED_ASSETS), _fetch_crypto_prices)
+
 
 def get_crypto_prices() -> Dict[str, Dict[str, float]]:
-    """Fetch crypto prices from CoinGecko with a static fallback."""
-    try:
-        response = requests.get(COIN_GECKO_URL, timeout=10)
-        response.raise_for_status()
-        payload = response.json()
-        if isinstance(payload, dict) and payload:
-            result: Dict[str, Dict[str, float]] = {}
-            for symbol, fallback in _CRYPTO_FALLBACK.items():
-                value = payload.get(symbol, {}).get("usd")
-                if isinstance(value, (int, float)):
-                    result[symbol] = {"usd": float(value)}
-                else:
-                    result[symbol] = {"usd": fallback["usd"]}
-
-            if result:
-                return result
-    except (HTTPError, RequestException, ValueError):
-        # Intentionally fall back to canned data when an API error occurs.
-        pass
-
-    return _CRYPTO_FALLBACK.copy()
+    """Fetch prices for every tracked asset from CoinGecko with a static fallback.
+
+    Results are cached for ``CRYPTO_CACHE_TTL`` seconds and served stale while
+    a background refresh runs once they expire. Concurrent misses share a
+    single set of CoinGecko requests.
+    """
+    prices = _PRICE_CACHE.get_or_load("prices", _load_crypto_prices)
+    if prices:
+        return _with_fallbacks(prices)
+    return _serve_fallback()
+
+
+def refresh_crypto_prices() -> Optional[Dict[str, Dict[str, float]]]:
+    """Fetch fresh prices for ingestion, updating the cache on success.
+
+    Returns ``None`` when CoinGecko produced no prices, so callers never
+    record the canned fallback as history. Assets missing from a partial
+    fetch are left out.
+    """
+    return _PRICE_CACHE.refresh("prices", _load_crypto_prices) or None
+
+
+def crypto_payload(prices: Dict[str, Dict[str, float]], last_updated: str) -> Dict[str, Any]:
+    """Shape prices the way ``/crypto`` and the live event stream send them."""
+    return {
+        "bitcoin": prices.get("bitcoin", {}),
+        "ethereum": prices.get("ethereum", {}),
+        "assets": prices,
+        "last_updated": last_updated,
+    }
+
+
+def crypto_prices_version() -> Optional[Tuple[int, float]]:
+    """Return the cache generation and store time of the current prices."""
+    return _PRICE_CACHE.version("prices")
+
+
+def peek_crypto_prices() -> Dict[str, Dict[str, float]]:
+    """Return the last cached prices (or the fallback) without calling upstream."""
+    prices = _PRICE_CACHE.peek("prices")
+    if prices:
+        return _with_fallbacks(prices)
+    return _serve_fallback()
@@ -0,0 +1,116 @@
+"""Fetch dashboard widgets concurrently under a single page deadline."""
+
+from __future__ import annotations
+
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from flask import current_app
+
+from app.models import UserSettings
+from app.services.crypto_service import (
+    crypto_prices_version,
+    get_crypto_prices,
+    peek_crypto_prices,
+)
+from app.services.news_service import get_headlines, headlines_version, peek_headlines
+from app.services.weather_service import (
+    get_weather_forecast,
+    peek_weather_forecast,
+    weather_forecast_version,
+)
+
+_DEFAULT_MAX_WORKERS = 8
+_DEFAULT_DEADLINE = 3.0
+
+_executor: ThreadPoolExecutor | None = None
+_executor_lock = threading.Lock()
+
+Version = Optional[Tuple[int, float]]
+# (value, last updated, cache version); the version is ``None`` when the
+# value is not a single identifiable cache entry (fallback data, or the cache
+# was refreshed while the widget was being loaded).
+WidgetResult = Tuple[Any, datetime, Version]
+
+
+def get_executor() -> ThreadPoolExecutor:
+    """Return the app-wide executor used for upstream fan-out, creating it once."""
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                max_workers = current_app.config.get(
+                    "DASHBOARD_MAX_WORKERS", _DEFAULT_MAX_WORKERS
+                )
+                _executor = ThreadPoolExecutor(
+                    max_workers=max(int(max_workers), 1),
+                    thread_name_prefix="dashboard-fetch",
+                )
+    return _executor
+
+
+def load_widgets(settings: UserSettings) -> Dict[str, WidgetResult]:
+    """Fetch every enabled widget in parallel, keyed by widget name.
+
+    Widgets that miss ``DASHBOARD_FETCH_DEADLINE`` fall back to their last
+    cached value (or canned data); their in-flight fetch keeps running and
+    warms the cache for the next page load.
+    """
+    city = settings.default_city
+    tasks: Dict[
+        str, Tuple[Callable[[], Any], Callable[[], Any], Callable[[], Version]]
+    ] = {}
+    if settings.show_crypto:
+        tasks["crypto"] = (get_crypto_prices, peek_crypto_prices, crypto_prices_version)
+    if settings.show_weather:
+        tasks["weather"] = (
+            lambda: get_weather_forecast(city),
+            lambda: peek_weather_forecast(city),
+            lambda: weather_forecast_version(city),
+        )
+    if settings.show_news:
+        tasks["news"] = (get_headlines, peek_headlines, headlines_version)
+
+    if not tasks:
+        return {}
+
+    versions = {name: task[2]() for name, task in tasks.items()}
+
+    deadline = float(
+        current_app.config.get("DASHBOARD_FETCH_DEADLINE", _DEFAULT_DEADLINE)
+    )
+    executor = get_executor()
+    futures: Dict[str, Future] = {
+        name: executor.submit(task[0]) for name, task in tasks.items()
+    }
+    done, _ = wait(futures.values(), timeout=deadline)
+
+    results: Dict[str, WidgetResult] = {}
+    for name, future in futures.items():
+        value: Any = None
+        if future in done:
+            if future.exception() is None:
+                value = future.result()
+            else:
+                current_app.logger.warning(
+                    "Dashboard %s fetch failed: %s", name, future.exception()
+                )
+        else:
+            current_app.logger.info(
+                "Dashboard %s fetch missed the %.1fs deadline; serving cached data.",
+                name,
+                deadline,
+            )
+
+        if value is None:
+            value = tasks[name][1]()
+
+        version = tasks[name][2]()
+        if version is None or version != versions[name]:
+            results[name] = (value, datetime.now(timezone.utc), None)
+        else:
+            updated_at = datetime.fromtimestamp(version[1], timezone.utc)
+            results[name] = (value, updated_at, version)
+    return results
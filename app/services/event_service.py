@@ -0,0 +1,159 @@
+"""In-process broadcast hub behind the dashboard's Server-Sent Events stream.
+
+Ingestion publishes each new snapshot once; the hub serializes it once and
+fans it out to every subscriber's bounded queue. Work therefore scales with
+the number of data changes rather than with open tabs times poll intervals.
+A short replay buffer lets reconnecting clients catch up via
+``Last-Event-ID``.
+"""
+
+from __future__ import annotations
+
+import json
+import queue
+import threading
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Deque, Dict, FrozenSet, List, Optional, Tuple
+
+from app.services.cache_service import env_int
+
+
+@dataclass(frozen=True)
+class Event:
+    id: int
+    name: str
+    data: str
+    topic: Optional[str] = None
+
+    def encode(self) -> str:
+        """Render the event in ``text/event-stream`` wire format."""
+        lines = [f"id: {self.id}", f"event: {self.name}"]
+        lines.extend(f"data: {line}" for line in self.data.splitlines() or [""])
+        return "\n".join(lines) + "\n\n"
+
+
+class Subscription:
+    """One stream's queue; the oldest events are dropped if it falls behind."""
+
+    def __init__(self, topics: Optional[FrozenSet[str]], max_queue: int) -> None:
+        self.topics = topics
+        self.dropped = 0
+        self._queue: "queue.Queue[Event]" = queue.Queue(maxsize=max(max_queue, 1))
+
+    def wants(self, event: Event) -> bool:
+        return event.topic is None or self.topics is None or event.topic in self.topics
+
+    def offer(self, event: Event) -> None:
+        while True:
+            try:
+                self._queue.put_nowait(event)
+                return
+            except queue.Full:
+                try:
+                    self._queue.get_nowait()
+                    self.dropped += 1
+                except queue.Empty:
+                    pass
+
+    def get(self, timeout: float) -> Optional[Event]:
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+
+class EventHub:
+    """Fan published events out to every interested :class:`Subscription`."""
+
+    def __init__(self, replay_size: int = 256, max_queue: int = 64) -> None:
+        self.max_queue = max_queue
+        self._replay: Deque[Event] = deque(maxlen=max(replay_size, 1))
+        self._subscribers: set[Subscription] = set()
+        self._fingerprints: Dict[Tuple[str, Optional[str]], str] = {}
+        self._next_id = 1
+        self._lock = threading.Lock()
+        self._stats: Dict[str, int] = {"published": 0, "duplicates": 0, "delivered": 0}
+
+    def subscribe(
+        self,
+        topics: Optional[FrozenSet[str]] = None,
+        last_event_id: Optional[int] = None,
+    ) -> Tuple[Subscription, List[Event], bool]:
+        """Register a subscriber; return it, any missed events and a resync flag.
+
+        ``resync`` is set when ``last_event_id`` is older than the replay
+        buffer (or from a previous process), so the client must refetch.
+        """
+        subscription = Subscription(topics, self.max_queue)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if last_event_id is None:
+                return subscription, [], False
+            newest = self._next_id - 1
+            oldest = self._replay[0].id if self._replay else self._next_id
+            if last_event_id > newest or last_event_id < oldest - 1:
+                return subscription, [], True
+            backlog = [
+                event
+                for event in self._replay
+                if event.id > last_event_id and subscription.wants(event)
+            ]
+        return subscription, backlog, False
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(
+        self,
+        name: str,
+        payload: Any,
+        topic: Optional[str] = None,
+        dedupe: bool = False,
+    ) -> Optional[Event]:
+        """Broadcast ``payload`` as event ``name``; return the event sent.
+
+        With ``dedupe`` a payload identical to the previous one for the same
+        ``(name, topic)`` (ignoring ``last_updated``) is not re-sent.
+        """
+        data = json.dumps(payload, separators=(",", ":"), default=str)
+        with self._lock:
+            if dedupe:
+                fingerprint = data
+                if isinstance(payload, dict) and "last_updated" in payload:
+                    content = {k: v for k, v in payload.items() if k != "last_updated"}
+                    fingerprint = json.dumps(content, sort_keys=True, default=str)
+                if self._fingerprints.get((name, topic)) == fingerprint:
+                    self._stats["duplicates"] += 1
+                    return None
+                self._fingerprints[(name, topic)] = fingerprint
+
+            event = Event(id=self._next_id, name=name, data=data, topic=topic)
+            self._next_id += 1
+            self._replay.append(event)
+            self._stats["published"] += 1
+            subscribers = [sub for sub in self._subscribers if sub.wants(event)]
+            self._stats["delivered"] += len(subscribers)
+
+        for subscription in subscribers:
+            subscription.offer(event)
+        return event
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            snapshot: Dict[str, Any] = dict(self._stats)
+            snapshot["subscribers"] = len(self._subscribers)
+            snapshot["dropped"] = sum(sub.dropped for sub in self._subscribers)
+            snapshot["last_event_id"] = self._next_id - 1
+        return snapshot
+
+
+hub = EventHub(
+    replay_size=env_int("EVENT_STREAM_REPLAY", 256),
+    max_queue=env_int("EVENT_STREAM_QUEUE_SIZE", 64),
+)
+
+
+def event_stats() -> Dict[str, Any]:
+    return hub.stats()
@@ -0,0 +1,204 @@
+"""Incremental multi-model forecasting over batches of series.
+
+A :class:`SeriesForecaster` tracks several series (the columns of a 2-D
+array) at once and fits three model families to each:
+
+``linear``
+    Least-squares line through the trailing ``window`` points.
+``holt``
+    Holt's linear exponential smoothing (level + trend).
+``damped``
+    Holt's method with a damped trend, which flattens long horizons.
+
+The smoothing models run over a small grid of smoothing parameters, every
+candidate for every series updated together with NumPy broadcasting. Each
+new point is first forecast one step ahead by every candidate, giving a
+rolling backtest: the candidate with the lowest exponentially weighted
+squared error over roughly the last ``backtest`` points is used for a
+series. State is updated point by point, so feeding new rows costs the same
+however long the history is; nothing is refit from scratch.
+"""
+
+from __future__ import annotations
+
+import itertools
+from dataclasses import dataclass
+from statistics import NormalDist
+from typing import List, Optional, Sequence, Tuple
+
+import numpy as np
+
+MODELS = ("linear", "holt", "damped")
+
+# (alpha, beta, phi) candidates; phi == 1 is plain Holt, phi < 1 damps the trend.
+DEFAULT_GRID: Tuple[Tuple[float, float, float], ...] = tuple(
+    itertools.product((0.1, 0.3, 0.5, 0.8), (0.05, 0.2), (1.0, 0.9, 0.98))
+)
+
+
+@dataclass(frozen=True)
+class ForecastBatch:
+    """Forecasts for every series: arrays are ``(series, horizon)``, NaN when unfit."""
+
+    models: List[Optional[str]]
+    mean: np.ndarray
+    lower: np.ndarray
+    upper: np.ndarray
+    level: float
+
+
+class SeriesForecaster:
+    """Fit linear, Holt and damped-trend models to ``width`` series incrementally."""
+
+    def __init__(
+        self,
+        width: int,
+        window: int = 20,
+        backtest: int = 20,
+        min_points: int = 10,
+        grid: Sequence[Tuple[float, float, float]] = DEFAULT_GRID,
+    ) -> None:
+        self.width = int(width)
+        self.window = max(int(window), 2)
+        self.min_points = max(int(min_points), 3)
+        self._error_weight = 2.0 / (max(int(backtest), 1) + 1.0)
+
+        params = np.asarray(grid, dtype=float).reshape(-1, 3)
+        self._alpha = params[:, 0:1]
+        self._beta = params[:, 1:2]
+        self._phi = params[:, 2:3]
+        self._damped = params[:, 2] < 1.0
+
+        self.count = np.zeros(self.width, dtype=np.int64)
+        # Linear model: the trailing window, oldest first, NaN-padded.
+        self._recent = np.full((self.window, self.width), np.nan)
+        # Smoothing candidates: one row per grid entry.
+        shape = (params.shape[0], self.width)
+        self._level = np.zeros(shape)
+        self._trend = np.zeros(shape)
+        self._smooth_error = np.full(shape, np.nan)
+        self._linear_error = np.full(self.width, np.nan)
+
+    def update(self, values: np.ndarray) -> None:
+        """Feed rows of shape ``(n, width)``, oldest first; NaN entries are skipped."""
+        for row in np.atleast_2d(np.asarray(values, dtype=float)):
+            self._push(row)
+
+    def _push(self, row: np.ndarray) -> None:
+        seen = np.isfinite(row)
+        if not seen.any():
+            return
+        value = np.where(seen, row, 0.0)
+
+        # Score every candidate's one-step forecast before learning the point.
+        scored = seen & (self.count >= 2)
+        linear_forecast, _ = self._linear_forecast(np.ones(1))
+        self._record(self._linear_error, value - linear_forecast[:, 0], scored)
+        smooth_forecast = self._level + self._phi * self._trend
+        smooth_residual = value - smooth_forecast
+        self._record(self._smooth_error, smooth_residual, scored)
+
+        first = seen & (self.count == 0)
+        later = seen & (self.count > 0)
+        level = np.where(first, value, self._level)
+        trend = self._trend
+        level = np.where(later, smooth_forecast + self._alpha * smooth_residual, level)
+        trend = np.where(
+            later, self._phi * trend + self._alpha * self._beta * smooth_residual, trend
+        )
+        self._level, self._trend = level, trend
+
+        self._recent[:-1, seen] = self._recent[1:, seen]
+        self._recent[-1, seen] = row[seen]
+        self.count += seen
+
+    def _record(self, errors: np.ndarray, residual: np.ndarray, scored: np.ndarray) -> None:
+        squared = residual * residual
+        smoothed = np.where(
+            np.isnan(errors),
+            squared,
+            (1.0 - self._error_weight) * errors + self._error_weight * squared,
+        )
+        errors[...] = np.where(scored, smoothed, errors)
+
+    def _linear_forecast(self, steps: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Mean and standard-error factor of the window line ``steps`` ahead.
+
+        Each column is fitted against the positions of its finite values;
+        returns ``(width, len(steps))`` arrays.
+        """
+        present = np.isfinite(self._recent)
+        counts = present.sum(axis=0)
+        x = np.where(present, np.cumsum(present, axis=0) - 1, 0).astype(float)
+        y = np.where(present, self._recent, 0.0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            x_mean = x.sum(axis=0) / counts
+            y_mean = y.sum(axis=0) / counts
+            dx = np.where(present, x - x_mean, 0.0)
+            sxx = np.square(dx).sum(axis=0)
+            slope = (dx * np.where(present, y - y_mean, 0.0)).sum(axis=0) / sxx
+            slope = np.where(sxx > 0, slope, 0.0)
+            # Position of each future point relative to the window's centre.
+            offset = (counts - 1)[:, None] + steps[None, :] - x_mean[:, None]
+            mean = y_mean[:, None] + slope[:, None] * offset
+            factor = np.sqrt(
+                1.0 + 1.0 / counts[:, None] + np.square(offset) / sxx[:, None]
+            )
+        return mean, factor
+
+    def forecast(self, horizon: int = 1, level: float = 0.95) -> ForecastBatch:
+        """Project ``horizon`` steps with each series' best model and its interval."""
+        horizon = max(int(horizon), 1)
+        steps = np.arange(1, horizon + 1, dtype=float)
+        width = self.width
+
+        holt_rows = np.flatnonzero(~self._damped)
+        damped_rows = np.flatnonzero(self._damped)
+        candidates = [
+            ("linear", self._linear_error, np.zeros(width, dtype=np.int64)),
+        ]
+        for name, rows in (("holt", holt_rows), ("damped", damped_rows)):
+            if rows.size:
+                errors = self._smooth_error[rows]
+                filled = np.where(np.isnan(errors), np.inf, errors)
+                best = rows[np.argmin(filled, axis=0)]
+                candidates.append((name, self._smooth_error[best, np.arange(width)], best))
+
+        errors = np.vstack([np.where(np.isnan(c[1]), np.inf, c[1]) for c in candidates])
+        choice = np.argmin(errors, axis=0)
+        usable = (self.count >= self.min_points) & np.isfinite(errors.min(axis=0))
+
+        linear_mean, linear_factor = self._linear_forecast(steps)
+        mean = np.full((width, horizon), np.nan)
+        spread = np.full((width, horizon), np.nan)
+        models: List[Optional[str]] = [None] * width
+        for column in np.flatnonzero(usable):
+            name, column_errors, best = candidates[choice[column]]
+            sigma = float(np.sqrt(column_errors[column]))
+            models[column] = name
+            if name == "linear":
+                mean[column] = linear_mean[column]
+                spread[column] = sigma * linear_factor[column]
+                continue
+            row = best[column]
+            alpha, beta, phi = (
+                float(self._alpha[row, 0]),
+                float(self._beta[row, 0]),
+                float(self._phi[row, 0]),
+            )
+            damping = np.cumsum(phi**steps)
+            mean[column] = self._level[row, column] + damping * self._trend[row, column]
+            # Variance of the h-step error for additive (damped) trend smoothing.
+            weights = alpha * (1.0 + beta * damping[:-1])
+            spread[column] = sigma * np.sqrt(
+                1.0 + np.concatenate(([0.0], np.cumsum(weights * weights)))
+            )
+
+        z = NormalDist().inv_cdf(0.5 + level / 2.0)
+        return ForecastBatch(
+            models=models,
+            mean=mean,
+            lower=mean - z * spread,
+            upper=mean + z * spread,
+            level=level,
+        )
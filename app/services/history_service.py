@@ -1,388 +1,902 @@
 from __future__ import annotations
 
-from collections.abc import Sequence
+from collections.abc import Callable, Mapping, Sequence
+from dataclasses import dataclass, field
 from datetime import datetime, timezone, timedelta
-from typing import Any, Dict, List, Optional
-import statistics
+from typing import Any, Dict, Iterator, List, Optional, Tuple, TypeVar
+import functools
+import threading
+import time
 
 import numpy as np
 
 from app.extensions import db
-from app.models import AnomalyLog, CryptoHistory, WeatherHistory
+from app.models import (
+    AnomalyLog,
+    AppMetadata,
+    CryptoPrice,
+    CryptoRollup,
+    WeatherHistory,
+    WeatherRollup,
+)
+from app.services.anomaly_service import Finding, detectors_for, required_lookback, scan
+from app.services.cache_service import TTLCache, env_float, env_int
+from app.services.crypto_service import TRACKED_ASSETS
+from app.services.event_service import hub
+from app.services.forecast_service import ForecastBatch, SeriesForecaster
+from app.services.metrics_service import HISTORY_LATENCY, timed
+from app.services.weather_service import normalize_city
+from app.services.rollup_service import WindowSummary, record_rollups, window_summary
+from app.services.timeseries_service import (
+    SeriesBuffer,
+    SeriesFrame,
+    TimeSeriesStore,
+    from_epoch_us,
+    to_epoch_us,
+)
 
-_ROLLING_WINDOW = 50
-_ANOMALY_LIMIT = 200
-_SIGMA_THRESHOLD = 2.0
-_MIN_SAMPLE = 3
 _FORECAST_MIN_POINTS = 10
 _FORECAST_MAX_POINTS = 20
+_FORECAST_INTERVAL = 0.95
+_FORECAST_HORIZON = max(env_int("FORECAST_HORIZON", 6), 1)
+_FORECAST_FIT_POINTS = max(env_int("FORECAST_FIT_POINTS", 500), _FORECAST_MIN_POINTS)
 
+F = TypeVar("F", bound=Callable[..., Any])
 
-def _rolling_stats(values: Sequence[float]) -> Dict[str, Optional[float]]:
-    cleaned = [float(v) for v in values if isinstance(v, (int, float))]
-    if not cleaned:
-        return {"mean": None, "std": None, "count": 0}
+# Results are keyed by the newest history row, so new writes miss naturally;
+# the TTL only bounds how far rolling time windows can drift.
+_ANALYTICS_CACHE = TTLCache(
+    "analytics",
+    ttl=env_float("ANALYTICS_CACHE_TTL", 60.0),
+    max_entries=64,
+)
 
-    mean = statistics.fmean(cleaned)
-    std = statistics.pstdev(cleaned) if len(cleaned) >= 2 else 0.0
-    return {"mean": mean, "std": std, "count": len(cleaned)}
+_STORE = TimeSeriesStore(
+    capacity=env_int("TIMESERIES_CAPACITY", 4096),
+    sync_interval=env_float("TIMESERIES_SYNC_SECONDS", 5.0),
+)
 
 
-def _linear_regression_forecast(values: Sequence[float]) -> Optional[float]:
-    """Project the next value using a simple first-degree polynomial fit."""
-    numeric = [float(v) for v in values if isinstance(v, (int, float))]
-    if len(numeric) < _FORECAST_MIN_POINTS:
-        return None
+def _load_crypto_rows(after_id: int, limit: int) -> List[Any]:
+    """Pivot long-format price rows into one wide row per ingested snapshot.
 
-    window = min(len(numeric), _FORECAST_MAX_POINTS)
-    series = np.array(numeric[-window:], dtype=float)
-    if series.size < 2:
-        return None
+    Every asset in a snapshot shares its timestamp; the snapshot is keyed by
+    its highest row id so later syncs resume after it. Assets missing from a
+    snapshot are ``NaN``.
+    """
+    rows = (
+        db.session.query(
+            CryptoPrice.id,
+            CryptoPrice.timestamp,
+            CryptoPrice.asset,
+            CryptoPrice.price,
+        )
+        .filter(CryptoPrice.id > after_id, CryptoPrice.asset.in_(TRACKED_ASSETS))
+        .order_by(CryptoPrice.timestamp.desc(), CryptoPrice.id.desc())
+        .limit(limit * len(TRACKED_ASSETS))
+        .all()
+    )
+    column = {asset: idx for idx, asset in enumerate(TRACKED_ASSETS)}
+    snapshots: Dict[datetime, List[Any]] = {}
+    for row_id, timestamp, asset, price in reversed(rows):
+        snapshot = snapshots.get(timestamp)
+        if snapshot is None:
+            snapshot = [row_id, timestamp, *([float("nan")] * len(TRACKED_ASSETS))]
+            snapshots[timestamp] = snapshot
+        snapshot[0] = max(snapshot[0], row_id)
+        snapshot[2 + column[asset]] = price
+    return list(snapshots.values())[-limit:]
+
+
+def _weather_loader(city: str) -> Callable[[int, int], List[Any]]:
+    def _load_weather_rows(after_id: int, limit: int) -> List[Any]:
+        rows = (
+            db.session.query(
+                WeatherHistory.id,
+                WeatherHistory.timestamp,
+                WeatherHistory.temperature,
+                WeatherHistory.condition,
+            )
+            .filter(WeatherHistory.city == city, WeatherHistory.id > after_id)
+            .order_by(WeatherHistory.timestamp.desc(), WeatherHistory.id.desc())
+            .limit(limit)
+            .all()
+        )
+        rows.reverse()
+        return rows
 
-    x = np.arange(series.size, dtype=float)
-    # Fit a straight line (degree-1 polynomial) and extrapolate one step ahead.
-    try:
-        slope, intercept = np.polyfit(x, series, 1)
-    except (np.linalg.LinAlgError, ValueError):
-        return None
-    forecast_value = slope * series.size + intercept
-    return float(forecast_value)
+    return _load_weather_rows
+
+
+def _weather_series(city: str) -> str:
+    """Return the store series for a normalized ``city``, registering it on first use."""
+    name = f"weather:{city}"
+    _STORE.ensure(name, ("temperature",), _weather_loader(city), with_labels=True)
+    return name
 
 
-def _estimate_next_timestamp(timestamps: Sequence[datetime]) -> Optional[datetime]:
-    cleaned = [ts for ts in timestamps if isinstance(ts, datetime)]
-    if not cleaned:
+# Cities found to have no history, until when that answer is trusted; checked
+# again after one store sync interval in case another process recorded them.
+_MISSING_CITIES: Dict[str, float] = {}
+_MISSING_CITIES_MAX = 1024
+
+
+def _stored_weather_series(city: str) -> Optional[str]:
+    """Like :func:`_weather_series`, but only for cities that have history.
+
+    Keeps arbitrary ``?city=`` lookups from allocating a buffer each.
+    """
+    name = f"weather:{city}"
+    if name in _STORE.names():
+        return name
+    now = time.monotonic()
+    if _MISSING_CITIES.get(city, 0.0) > now:
         return None
-    if len(cleaned) == 1:
-        return cleaned[0] + timedelta(hours=1)
-
-    deltas = []
-    for idx in range(1, len(cleaned)):
-        current = cleaned[idx]
-        previous = cleaned[idx - 1]
-        delta = (current - previous).total_seconds()
-        if delta > 0:
-            deltas.append(delta)
-
-    if not deltas:
-        deltas = [
-            (cleaned[-1] - cleaned[0]).total_seconds()
-            / max(len(cleaned) - 1, 1)
-        ]
+    if db.session.query(WeatherHistory.id).filter(WeatherHistory.city == city).first():
+        _MISSING_CITIES.pop(city, None)
+        return _weather_series(city)
+    if len(_MISSING_CITIES) >= _MISSING_CITIES_MAX:
+        _MISSING_CITIES.clear()
+    _MISSING_CITIES[city] = now + _STORE.sync_interval
+    return None
 
-    avg_seconds = float(np.mean(deltas)) if deltas else 0.0
-    if avg_seconds <= 0:
-        avg_seconds = 3600.0
-    return cleaned[-1] + timedelta(seconds=avg_seconds)
 
+_STORE.register("crypto", TRACKED_ASSETS, _load_crypto_rows)
 
-def _log_anomaly(event_type: str, message: str) -> None:
-    entry = AnomalyLog(event_type=event_type, message=message[:255])
-    db.session.add(entry)
-    _prune_anomalies(AnomalyLog, limit=_ANOMALY_LIMIT)
 
+@timed(HISTORY_LATENCY)
+def load_timeseries() -> None:
+    """Fill the columnar store from the database."""
+    for (city,) in db.session.query(WeatherHistory.city).distinct():
+        _weather_series(city)
+    _STORE.sync_all()
 
-def _prune_anomalies(model: type[db.Model], limit: int) -> None:
-    stale_rows = (
-        model.query.order_by(model.timestamp.desc(), model.id.desc())
-        .offset(limit)
-        .all()
-    )
-    for row in stale_rows:
-        db.session.delete(row)
 
+def timeseries_stats() -> Dict[str, Dict[str, Any]]:
+    return _STORE.stats()
 
-def _prune_history(model: type[db.Model], limit: int) -> None:
-    """Remove rows older than the newest ``limit`` records to cap table size."""
-    # Order newest first so everything beyond ``limit`` is safe to delete.
-    stale_rows = (
-        model.query.order_by(model.timestamp.desc(), model.id.desc()).offset(limit).all()
-    )
-    if not stale_rows:
-        return
 
-    for row in stale_rows:
-        db.session.delete(row)
+def _freeze(value: Any) -> Any:
+    if isinstance(value, (list, set, frozenset)):
+        return tuple(value)
+    return value
 
 
-def save_crypto_data(bitcoin_price: float | None, ethereum_price: float | None) -> None:
-    """Persist a crypto price snapshot if both values are present."""
-    if bitcoin_price is None or ethereum_price is None:
-        return
+def _memoize_on_latest(series: str | Callable[..., str]) -> Callable[[F], F]:
+    """Cache an analytics function until ``series`` gains a newer row.
+
+    ``series`` may be a callable taking the function's arguments, for
+    functions whose series depends on them (e.g. the weather city).
+    """
+
+    def decorator(func: F) -> F:
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            name = series(*args, **kwargs) if callable(series) else series
+            buffer = _STORE.buffer(name)
+            key = (
+                func.__name__,
+                name,
+                buffer.newest(),
+                buffer.oldest_timestamp(),
+                tuple(_freeze(arg) for arg in args),
+                tuple(sorted((name, _freeze(arg)) for name, arg in kwargs.items())),
+            )
+            return _ANALYTICS_CACHE.get_or_load(key, lambda: func(*args, **kwargs))
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorator
+
 
-    recent_rows: List[CryptoHistory] = (
-        CryptoHistory.query.order_by(
-            CryptoHistory.timestamp.desc(), CryptoHistory.id.desc()
+def _window_frame(series: str, window_start: datetime) -> Optional[SeriesFrame]:
+    """Return the store slice covering ``window_start`` onward, if it is complete."""
+    buffer = _STORE.buffer(series)
+    oldest = buffer.oldest_timestamp()
+    start_us = to_epoch_us(window_start)
+    if oldest is None or oldest > start_us:
+        return None
+    return buffer.since(start_us)
+
+
+def _summarize_frame(frame: SeriesFrame) -> Dict[str, WindowSummary]:
+    """Summarise every column of ``frame`` in one vectorized pass.
+
+    ``NaN`` cells (an asset missing from a snapshot) are skipped per column.
+    """
+    values = frame.values
+    present = np.isfinite(values)
+    counts = present.sum(axis=0)
+    if not counts.any():
+        return {name: WindowSummary() for name in frame.columns}
+
+    filled = np.where(present, values, 0.0)
+    totals = filled.sum(axis=0)
+    totals_sq = np.square(filled).sum(axis=0)
+    lows = np.where(present, values, np.inf).min(axis=0)
+    highs = np.where(present, values, -np.inf).max(axis=0)
+    first_rows = present.argmax(axis=0)
+    last_rows = len(frame) - 1 - present[::-1].argmax(axis=0)
+    columns = np.arange(values.shape[1])
+    firsts = values[first_rows, columns]
+    lasts = values[last_rows, columns]
+
+    summaries: Dict[str, WindowSummary] = {}
+    for idx, name in enumerate(frame.columns):
+        if not counts[idx]:
+            summaries[name] = WindowSummary()
+            continue
+        summaries[name] = WindowSummary(
+            count=int(counts[idx]),
+            total=float(totals[idx]),
+            total_sq=float(totals_sq[idx]),
+            min=float(lows[idx]),
+            max=float(highs[idx]),
+            first=float(firsts[idx]),
+            last=float(lasts[idx]),
+            first_timestamp=from_epoch_us(frame.timestamps[first_rows[idx]]),
+            last_timestamp=from_epoch_us(frame.timestamps[last_rows[idx]]),
         )
-        .limit(_ROLLING_WINDOW)
-        .all()
-    )
-    btc_historical = [float(row.bitcoin_price) for row in recent_rows]
-    eth_historical = [float(row.ethereum_price) for row in recent_rows]
+    return summaries
 
-    entry = CryptoHistory(
-        timestamp=datetime.now(timezone.utc),
-        bitcoin_price=float(bitcoin_price),
-        ethereum_price=float(ethereum_price),
-    )
-    db.session.add(entry)
-    db.session.flush()  # Ensure the new row participates in the pruning query.
 
-    _prune_history(CryptoHistory, limit=50)
+def _isoformat(timestamp_us: int) -> str:
+    # Match the naive UTC strings the ORM returned before the store existed.
+    return from_epoch_us(timestamp_us).replace(tzinfo=None).isoformat()
 
-    _detect_crypto_anomalies(float(bitcoin_price), float(ethereum_price), btc_historical, eth_historical)
 
-    db.session.commit()
+def _analytics_epoch() -> int:
+    # Rolling-window metrics may drift for up to one analytics TTL.
+    return int(time.time() // (_ANALYTICS_CACHE.ttl or 1.0))
 
 
-def save_weather_data(
-    temperature: float | None, condition: str | None
-) -> None:
-    """Persist a weather snapshot when the core fields are available."""
-    if temperature is None or not condition:
-        return
+def crypto_history_version() -> Tuple[Any, ...]:
+    """Cheap validator for crypto history and metrics (no serialization)."""
+    buffer = _STORE.buffer("crypto")
+    # The oldest row moves when retention trims the window, not only on writes.
+    return ("crypto", buffer.newest(), buffer.oldest_timestamp(), _analytics_epoch())
 
-    recent_rows: List[WeatherHistory] = (
-        WeatherHistory.query.order_by(
-            WeatherHistory.timestamp.desc(), WeatherHistory.id.desc()
-        )
-        .limit(_ROLLING_WINDOW)
-        .all()
-    )
-    temp_history = [float(row.temperature) for row in recent_rows]
 
-    entry = WeatherHistory(
-        timestamp=datetime.now(timezone.utc),
-        temperature=float(temperature),
-        condition=condition,
-    )
-    db.session.add(entry)
-    db.session.flush()  # Flush before pruning so the fresh row is considered.
+def weather_history_version(city: str | None = None) -> Tuple[Any, ...]:
+    """Cheap validator for ``city``'s weather history and metrics."""
+    city = normalize_city(city)
+    series = _stored_weather_series(city)
+    if series is None:
+        return ("weather", city, None, None, _analytics_epoch())
+    buffer = _STORE.buffer(series)
+    return ("weather", city, buffer.newest(), buffer.oldest_timestamp(), _analytics_epoch())
 
-    _prune_history(WeatherHistory, limit=50)
 
-    _detect_weather_anomaly(float(temperature), values=temp_history)
+def invalidate_analytics() -> None:
+    """Drop memoized metrics and forecasts after history is written or pruned."""
+    _ANALYTICS_CACHE.invalidate()
 
-    db.session.commit()
 
+def trim_timeseries(
+    category: str, max_rows: Optional[int] = None, cutoff: Optional[datetime] = None
+) -> int:
+    """Apply a retention policy to the buffered ``crypto`` or ``weather`` series.
 
-def get_crypto_history(limit: int = 50) -> List[Dict[str, Any]]:
-    """Return the newest crypto history entries ordered oldest to newest."""
-    rows = (
-        CryptoHistory.query.order_by(
-            CryptoHistory.timestamp.desc(), CryptoHistory.id.desc()
-        )
-        .limit(limit)
-        .all()
+    Called after the matching table is pruned, so the store and the
+    forecasters fitted on it stop serving deleted rows. ``max_rows`` applies
+    per asset and per city, as in the database. Returns how many buffered
+    rows changed.
+    """
+    if category == "crypto":
+        names = ["crypto"]
+    else:
+        names = [name for name in _STORE.names() if name.startswith("weather:")]
+    cutoff_us = to_epoch_us(cutoff) if cutoff is not None else None
+    changed = 0
+    for name in names:
+        trimmed = _STORE.buffer(name).trim(max_rows, cutoff_us)
+        if trimmed:
+            # Refit from what is left rather than from deleted rows.
+            with _FORECASTERS_LOCK:
+                _FORECASTERS.pop(name, None)
+            changed += trimmed
+    return changed
+
+
+@dataclass
+class _FittedForecaster:
+    """A series' forecaster and the newest store row it has been fed."""
+
+    forecaster: SeriesForecaster
+    cursor: Optional[Tuple[int, int]] = None
+    lock: threading.Lock = field(default_factory=threading.Lock)
+
+
+_FORECASTERS: Dict[str, _FittedForecaster] = {}
+_FORECASTERS_LOCK = threading.Lock()
+
+
+def _new_forecaster(width: int) -> SeriesForecaster:
+    return SeriesForecaster(
+        width, window=_FORECAST_MAX_POINTS, min_points=_FORECAST_MIN_POINTS
     )
-    ordered = list(reversed(rows))
-    return [
-        {
-            "timestamp": row.timestamp.isoformat(),
-            "bitcoin_price": float(row.bitcoin_price),
-            "ethereum_price": float(row.ethereum_price),
-        }
-        for row in ordered
-    ]
 
 
-def get_weather_history(limit: int = 50) -> List[Dict[str, Any]]:
-    """Return the newest weather history entries ordered oldest to newest."""
-    rows = (
-        WeatherHistory.query.order_by(
-            WeatherHistory.timestamp.desc(), WeatherHistory.id.desc()
+def _forecast_series(series: str, horizon: int) -> ForecastBatch:
+    """Forecast every column of ``series``, feeding its forecaster only new rows.
+
+    The fitted state is kept between calls; it is rebuilt from the newest
+    ``FORECAST_FIT_POINTS`` rows only when the buffer has dropped rows the
+    forecaster has not seen.
+    """
+    buffer = _STORE.buffer(series)
+    with _FORECASTERS_LOCK:
+        fitted = _FORECASTERS.get(series)
+        if fitted is None:
+            fitted = _FittedForecaster(_new_forecaster(len(buffer.columns)))
+            _FORECASTERS[series] = fitted
+
+    with fitted.lock:
+        oldest = buffer.oldest_timestamp()
+        if fitted.cursor is not None and oldest is not None and oldest <= fitted.cursor[0]:
+            frame = buffer.after(*fitted.cursor)
+        else:
+            fitted.forecaster = _new_forecaster(len(buffer.columns))
+            frame = buffer.tail(_FORECAST_FIT_POINTS)
+        fitted.forecaster.update(frame.values)
+        if len(frame):
+            fitted.cursor = (int(frame.timestamps[-1]), int(frame.ids[-1]))
+        return fitted.forecaster.forecast(horizon)
+
+
+def _estimate_step(timestamps_us: np.ndarray) -> timedelta:
+    """Average spacing between readings, defaulting to an hour."""
+    if timestamps_us.size < 2:
+        return timedelta(hours=1)
+    deltas = np.diff(timestamps_us)
+    positive = deltas[deltas > 0]
+    if positive.size:
+        avg_seconds = float(positive.mean()) / 1e6
+    else:
+        avg_seconds = float(timestamps_us[-1] - timestamps_us[0]) / 1e6 / (
+            timestamps_us.size - 1
         )
-        .limit(limit)
-        .all()
-    )
-    ordered = list(reversed(rows))
-    return [
-        {
-            "timestamp": row.timestamp.isoformat(),
-            "temperature": float(row.temperature),
-            "condition": row.condition,
-        }
-        for row in ordered
-    ]
+    if avg_seconds <= 0:
+        avg_seconds = 3600.0
+    return timedelta(seconds=avg_seconds)
 
 
-def calculate_crypto_change(hours: int = 24) -> Dict[str, Any]:
-    """Compute percent change for crypto prices within a rolling window."""
-    window_start = datetime.now(timezone.utc) - timedelta(hours=hours)
-    rows: List[CryptoHistory] = (
-        CryptoHistory.query.filter(CryptoHistory.timestamp >= window_start)
-        .order_by(CryptoHistory.timestamp.asc(), CryptoHistory.id.asc())
-        .all()
+def _horizon_timestamps(timestamps_us: np.ndarray, horizon: int) -> List[str]:
+    if not timestamps_us.size:
+        return []
+    last = from_epoch_us(timestamps_us[-1]).replace(tzinfo=None)
+    step = _estimate_step(timestamps_us)
+    return [(last + step * (index + 1)).isoformat() for index in range(horizon)]
+
+
+def _optional(value: float) -> Optional[float]:
+    return float(value) if np.isfinite(value) else None
+
+
+def _crypto_metric(asset: str) -> str:
+    return asset.replace("-", " ").title()
+
+
+def _weather_metric(city: str) -> str:
+    return f"Temperature in {city.title()}"
+
+
+def _score_latest(
+    category: str,
+    key: str,
+    metric: str,
+    series: str,
+    history: SeriesFrame,
+    column: str,
+    timestamp: datetime,
+    value: float,
+) -> None:
+    """Score a new reading against the buffered ``history`` and log any new episode."""
+    timestamp_us = to_epoch_us(timestamp)
+    values = np.append(history.column(column), value)
+    timestamps = np.append(history.timestamps, timestamp_us)
+    for finding in scan(
+        detectors_for(category, key), metric, values, timestamps, start=values.size - 1
+    ):
+        _log_anomaly(category, series, finding, timestamp)
+
+
+def _history_tail(series: str, lookback: Optional[int]) -> SeriesFrame:
+    """Return enough buffered rows of ``series`` to score one more reading."""
+    count = _STORE.capacity if lookback is None else lookback
+    return _STORE.buffer(series).tail(count)
+
+
+def _log_anomaly(
+    event_type: str,
+    series: str,
+    finding: Finding,
+    observed_at: datetime,
+    timestamp: Optional[datetime] = None,
+) -> None:
+    entry = AnomalyLog(
+        event_type=event_type,
+        message=finding.message[:255],
+        detector=finding.detector,
+        series=series,
+        score=finding.score,
+        observed_at=observed_at,
     )
+    if timestamp is not None:
+        entry.timestamp = timestamp
+    db.session.add(entry)
 
-    btc_values = [float(row.bitcoin_price) for row in rows]
-    eth_values = [float(row.ethereum_price) for row in rows]
-    btc_stats = _rolling_stats(btc_values)
-    eth_stats = _rolling_stats(eth_values)
 
-    metrics: Dict[str, Any] = {
-        "bitcoin_change_pct": None,
-        "ethereum_change_pct": None,
-        "bitcoin_mean": btc_stats["mean"],
-        "bitcoin_std": btc_stats["std"],
-        "ethereum_mean": eth_stats["mean"],
-        "ethereum_std": eth_stats["std"],
-        "sample_size": len(rows),
-    }
+def _pending_anomalies() -> List[AnomalyLog]:
+    return [obj for obj in db.session.new if isinstance(obj, AnomalyLog)]
+
+
+def _publish_anomalies(entries: Sequence[AnomalyLog], topic: str | None = None) -> None:
+    """Push newly committed anomalies to live dashboard subscribers."""
+    for entry in entries:
+        hub.publish("anomaly", _anomaly_dict(entry), topic=topic)
 
-    if len(rows) < 2:
-        return metrics
 
-    first = rows[0]
-    last = rows[-1]
+@timed(HISTORY_LATENCY)
+def save_crypto_data(prices: Mapping[str, float | None]) -> None:
+    """Persist one price row per asset, sharing a single snapshot timestamp.
 
-    def _percent_change(start: float | None, end: float | None) -> float | None:
-        if start is None or end is None:
-            return None
-        if start == 0:
-            return None
-        return ((end - start) / start) * 100.0
+    Assets without a numeric price are skipped; nothing is written when no
+    asset has one.
+    """
+    snapshot = {
+        asset: float(price)
+        for asset, price in prices.items()
+        if isinstance(price, (int, float)) and np.isfinite(price)
+    }
+    if not snapshot:
+        return
 
-    metrics["bitcoin_change_pct"] = _percent_change(
-        float(first.bitcoin_price), float(last.bitcoin_price)
+    # Read the history before adding rows so a store sync cannot pick them up.
+    lookback = required_lookback(
+        [d for asset in snapshot for d in detectors_for("crypto", asset)]
     )
-    metrics["ethereum_change_pct"] = _percent_change(
-        float(first.ethereum_price), float(last.ethereum_price)
+    history = _history_tail("crypto", lookback)
+
+    timestamp = datetime.now(timezone.utc)
+    entries = [
+        CryptoPrice(asset=asset, timestamp=timestamp, price=price)
+        for asset, price in snapshot.items()
+    ]
+    db.session.add_all(entries)
+    record_rollups(CryptoRollup, timestamp, snapshot)
+
+    for asset, price in snapshot.items():
+        if asset in history.columns:
+            _score_latest(
+                "crypto",
+                asset,
+                _crypto_metric(asset),
+                f"crypto:{asset}",
+                history,
+                asset,
+                timestamp,
+                price,
+            )
+    anomalies = _pending_anomalies()
+
+    db.session.commit()
+    invalidate_analytics()
+    _publish_anomalies(anomalies)
+    _STORE.append(
+        "crypto",
+        max(entry.id for entry in entries),
+        timestamp,
+        [snapshot.get(asset, float("nan")) for asset in TRACKED_ASSETS],
     )
-    metrics["forecast"] = forecast_crypto_prices()
-    return metrics
 
 
-def calculate_weather_average(days: int = 7) -> Dict[str, Any]:
-    """Calculate the mean temperature captured during the supplied window."""
-    window_start = datetime.now(timezone.utc) - timedelta(days=days)
-    rows: List[WeatherHistory] = (
-        WeatherHistory.query.filter(WeatherHistory.timestamp >= window_start)
-        .order_by(WeatherHistory.timestamp.asc(), WeatherHistory.id.asc())
-        .all()
+@timed(HISTORY_LATENCY)
+def save_weather_data(
+    temperature: float | None, condition: str | None, city: str | None = None
+) -> None:
+    """Persist a weather snapshot for ``city`` when the core fields are available."""
+    if temperature is None or not condition:
+        return
+
+    city = normalize_city(city)
+    series = _weather_series(city)
+    history = _history_tail(series, required_lookback(detectors_for("weather", city)))
+    timestamp = datetime.now(timezone.utc)
+    entry = WeatherHistory(
+        city=city,
+        timestamp=timestamp,
+        temperature=float(temperature),
+        condition=condition,
+    )
+    db.session.add(entry)
+    record_rollups(WeatherRollup, entry.timestamp, {city: entry.temperature})
+
+    _score_latest(
+        "weather",
+        city,
+        _weather_metric(city),
+        series,
+        history,
+        "temperature",
+        timestamp,
+        float(temperature),
     )
+    anomalies = _pending_anomalies()
 
-    temps = [float(row.temperature) for row in rows]
-    stats = _rolling_stats(temps)
+    db.session.commit()
+    invalidate_analytics()
+    _publish_anomalies(anomalies, topic=city)
+    _STORE.append(series, entry.id, timestamp, (float(temperature),), condition)
 
-    metrics: Dict[str, Any] = {
-        "average_temperature": stats["mean"],
-        "temperature_std": stats["std"],
-        "sample_size": len(rows),
-    }
-    if not rows:
-        return metrics
 
-    total = sum(float(row.temperature) for row in rows)
-    metrics["average_temperature"] = total / len(rows)
-    metrics["forecast"] = forecast_weather_temperature()
-    return metrics
+def _resolve_assets(assets: Optional[Sequence[str]]) -> Tuple[str, ...]:
+    if assets is None:
+        return TRACKED_ASSETS
+    requested = {asset.strip().lower() for asset in assets}
+    return tuple(asset for asset in TRACKED_ASSETS if asset in requested)
 
 
-def forecast_crypto_prices() -> Dict[str, float | str | None]:
-    """Return linear regression forecasts for the next crypto prices."""
-    rows: List[CryptoHistory] = (
-        CryptoHistory.query.order_by(
-            CryptoHistory.timestamp.desc(), CryptoHistory.id.desc()
-        )
-        .limit(_FORECAST_MAX_POINTS)
-        .all()
-    )
-    if len(rows) < _FORECAST_MIN_POINTS:
-        return {"bitcoin_price": None, "ethereum_price": None, "next_timestamp": None}
+@dataclass
+class HistoryPage:
+    """A run of history entries plus the cursor for requesting newer ones.
 
-    ordered = list(reversed(rows))
-    timestamps = [row.timestamp for row in ordered]
-    btc_values = [float(row.bitcoin_price) for row in ordered]
-    eth_values = [float(row.ethereum_price) for row in ordered]
+    ``reset`` tells the client to replace what it holds (first page, an
+    unknown cursor, or more new points than ``limit``) rather than append.
+    ``data`` is a list of row dicts, or a dict of parallel arrays when the
+    page was requested in columnar form.
+    """
 
-    forecast_btc = _linear_regression_forecast(btc_values)
-    forecast_eth = _linear_regression_forecast(eth_values)
-    # Re-use the spacing between historic points to project a timestamp.
-    next_time = _estimate_next_timestamp(timestamps)
+    data: Any
+    count: int
+    cursor: Optional[str]
+    reset: bool
 
-    return {
-        "bitcoin_price": forecast_btc,
-        "ethereum_price": forecast_eth,
-        "next_timestamp": next_time.isoformat() if next_time else None,
-    }
+
+def encode_cursor(timestamp_us: int, row_id: int, oldest_us: Optional[int] = None) -> str:
+    if oldest_us is None:
+        return f"{timestamp_us}-{row_id}"
+    return f"{timestamp_us}-{row_id}-{oldest_us}"
 
 
-def forecast_weather_temperature() -> Dict[str, float | str | None]:
-    """Return the projected average temperature for the next interval."""
-    rows: List[WeatherHistory] = (
-        WeatherHistory.query.order_by(
-            WeatherHistory.timestamp.desc(), WeatherHistory.id.desc()
+def decode_cursor(raw: str | None) -> Optional[Tuple[int, int, Optional[int]]]:
+    """Parse ``timestamp-id[-oldest]``; ``oldest`` is the buffer start it was issued at."""
+    parts = (raw or "").split("-")
+    if len(parts) not in (2, 3):
+        return None
+    try:
+        numbers = [int(part) for part in parts]
+    except ValueError:
+        return None
+    return numbers[0], numbers[1], numbers[2] if len(numbers) == 3 else None
+
+
+def _history_page(
+    buffer: SeriesBuffer,
+    limit: int,
+    since: str | None,
+    render: Callable[[SeriesFrame], Any],
+) -> HistoryPage:
+    cursor = decode_cursor(since)
+    newest = buffer.newest()
+    oldest = buffer.oldest_timestamp()
+    frame: Optional[SeriesFrame] = None
+    reset = True
+    # A cursor outside the buffered range (evicted, or from another store)
+    # cannot be continued, so the client gets a fresh window instead.
+    if cursor is not None and newest is not None and oldest <= cursor[0] and cursor[:2] <= newest:
+        frame = buffer.after(cursor[0], cursor[1])
+        # Retention trimmed rows the client may still hold when the buffer
+        # start moved and fewer than ``limit`` rows remain up to the cursor.
+        trimmed = (
+            cursor[2] is not None
+            and oldest > cursor[2]
+            and len(buffer) - len(frame) < limit
         )
-        .limit(_FORECAST_MAX_POINTS)
-        .all()
+        reset = trimmed or len(frame) > limit
+    if frame is None or reset:
+        frame = buffer.tail(limit)
+
+    if len(frame):
+        next_cursor = encode_cursor(
+            int(frame.timestamps[-1]), int(frame.ids[-1]), buffer.oldest_timestamp()
+        )
+    else:
+        next_cursor = since if not reset else None
+    return HistoryPage(
+        data=render(frame), count=len(frame), cursor=next_cursor, reset=reset
     )
-    if len(rows) < _FORECAST_MIN_POINTS:
-        return {"average_temperature": None, "next_timestamp": None}
 
-    ordered = list(reversed(rows))
-    timestamps = [row.timestamp for row in ordered]
-    temps = [float(row.temperature) for row in ordered]
 
-    forecast_temp = _linear_regression_forecast(temps)
-    next_time = _estimate_next_timestamp(timestamps)
+def _nullable(values: np.ndarray) -> List[Any]:
+    return np.where(np.isfinite(values), values, None).tolist()
 
-    return {
-        "average_temperature": forecast_temp,
-        "next_timestamp": next_time.isoformat() if next_time else None,
-    }
 
+def _epoch_ms(frame: SeriesFrame) -> List[int]:
+    return (frame.timestamps // 1000).tolist()
 
-def _detect_crypto_anomalies(
-    new_btc: float, new_eth: float, btc_history: Sequence[float], eth_history: Sequence[float]
-) -> None:
-    if len(btc_history) >= _MIN_SAMPLE:
-        _flag_if_anomalous(
-            category="crypto",
-            metric="Bitcoin",
-            value=new_btc,
-            stats=_rolling_stats(btc_history),
-        )
 
-    if len(eth_history) >= _MIN_SAMPLE:
-        _flag_if_anomalous(
-            category="crypto",
-            metric="Ethereum",
-            value=new_eth,
-            stats=_rolling_stats(eth_history),
+def _render_crypto(
+    names: Tuple[str, ...], columnar: bool
+) -> Callable[[SeriesFrame], Any]:
+    keys = [f"{asset}_price" for asset in names]
+
+    def render(frame: SeriesFrame) -> Any:
+        columns = [frame.columns.index(asset) for asset in names]
+        selected = frame.values[:, columns]
+        if columnar:
+            data: Dict[str, Any] = {"timestamp_ms": _epoch_ms(frame)}
+            for key, column in zip(keys, selected.T):
+                data[key] = _nullable(column)
+            return data
+        cells = _nullable(selected)
+        return [
+            {"timestamp": _isoformat(timestamp), **dict(zip(keys, row))}
+            for timestamp, row in zip(frame.timestamps.tolist(), cells)
+        ]
+
+    return render
+
+
+# Rendered for cities without history so both formats keep their shape.
+_EMPTY_WEATHER = SeriesFrame(
+    columns=("temperature",),
+    ids=np.empty(0, dtype=np.int64),
+    timestamps=np.empty(0, dtype=np.int64),
+    values=np.empty((0, 1)),
+    labels=np.empty(0, dtype=object),
+)
+
+
+def _render_weather(columnar: bool) -> Callable[[SeriesFrame], Any]:
+    def render(frame: SeriesFrame) -> Any:
+        labels = frame.labels if frame.labels is not None else np.array([], dtype=object)
+        if columnar:
+            # Conditions repeat heavily, so ship each distinct string once.
+            dictionary, codes = np.unique(labels.astype(str), return_inverse=True)
+            return {
+                "timestamp_ms": _epoch_ms(frame),
+                "temperature": frame.column("temperature").tolist(),
+                "condition": {"dictionary": dictionary.tolist(), "codes": codes.tolist()},
+            }
+        temps = frame.column("temperature").tolist()
+        conditions = labels.tolist()
+        return [
+            {
+                "timestamp": _isoformat(timestamp),
+                "temperature": temps[idx],
+                "condition": conditions[idx],
+            }
+            for idx, timestamp in enumerate(frame.timestamps.tolist())
+        ]
+
+    return render
+
+
+@timed(HISTORY_LATENCY)
+def crypto_history_page(
+    limit: int = 50,
+    since: str | None = None,
+    assets: Optional[Sequence[str]] = None,
+    columnar: bool = False,
+) -> HistoryPage:
+    """Return crypto snapshots after the ``since`` cursor (or the newest ``limit``).
+
+    Each entry carries ``<asset>_price`` for every requested asset (all
+    tracked assets by default), ``None`` where a snapshot lacks the asset.
+    With ``columnar`` the page holds ``timestamp_ms`` (epoch milliseconds)
+    and one array per ``<asset>_price`` instead of row dicts.
+    """
+    buffer = _STORE.buffer("crypto")
+    render = _render_crypto(_resolve_assets(assets), columnar)
+    return _history_page(buffer, limit, since, render)
+
+
+@timed(HISTORY_LATENCY)
+def weather_history_page(
+    limit: int = 50,
+    since: str | None = None,
+    city: str | None = None,
+    columnar: bool = False,
+) -> HistoryPage:
+    """Return ``city``'s weather readings after the ``since`` cursor.
+
+    With ``columnar`` the page holds ``timestamp_ms`` and ``temperature``
+    arrays, and ``condition`` as a ``dictionary`` of distinct strings plus
+    one index into it per reading.
+    """
+    render = _render_weather(columnar)
+    series = _stored_weather_series(normalize_city(city))
+    if series is None:
+        return HistoryPage(data=render(_EMPTY_WEATHER), count=0, cursor=None, reset=True)
+    return _history_page(_STORE.buffer(series), limit, since, render)
+
+
+@timed(HISTORY_LATENCY)
+def get_crypto_history(
+    limit: int = 50, assets: Optional[Sequence[str]] = None
+) -> List[Dict[str, Any]]:
+    """Return the newest crypto snapshots ordered oldest to newest."""
+    return crypto_history_page(limit, assets=assets).data
+
+
+@timed(HISTORY_LATENCY)
+def get_weather_history(limit: int = 50, city: str | None = None) -> List[Dict[str, Any]]:
+    """Return the newest weather history entries for ``city``, oldest first."""
+    return weather_history_page(limit, city=city).data
+
+
+def _percent_change(start: float | None, end: float | None) -> float | None:
+    if start is None or end is None:
+        return None
+    if start == 0:
+        return None
+    return ((end - start) / start) * 100.0
+
+
+@timed(HISTORY_LATENCY)
+@_memoize_on_latest("crypto")
+def calculate_crypto_change(
+    hours: int = 24, assets: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Compute percent change for crypto prices within a rolling window.
+
+    Every requested asset (all tracked assets by default) is summarised
+    together: windows held entirely by the in-memory store are reduced from
+    its arrays in one pass; longer ones fall back to the hourly/daily
+    rollups. Per-asset results are returned under ``assets`` and flattened as
+    ``<asset>_change_pct`` / ``_mean`` / ``_std``.
+    """
+    names = _resolve_assets(assets)
+    window_start = datetime.now(timezone.utc) - timedelta(hours=hours)
+    frame = _window_frame("crypto", window_start)
+    if frame is not None:
+        summaries = _summarize_frame(frame)
+    else:
+        summaries = window_summary(CryptoRollup, window_start, names)
+
+    metrics: Dict[str, Any] = {"assets": {}}
+    sample_size = 0
+    for asset in names:
+        summary = summaries[asset]
+        change = (
+            _percent_change(summary.first, summary.last) if summary.count >= 2 else None
         )
+        metrics["assets"][asset] = {
+            "change_pct": change,
+            "mean": summary.mean,
+            "std": summary.std,
+            "sample_size": summary.count,
+        }
+        metrics[f"{asset}_change_pct"] = change
+        metrics[f"{asset}_mean"] = summary.mean
+        metrics[f"{asset}_std"] = summary.std
+        sample_size = max(sample_size, summary.count)
+    metrics["sample_size"] = sample_size
 
+    if sample_size < 2:
+        return metrics
 
-def _detect_weather_anomaly(temperature: float, values: Sequence[float]) -> None:
-    if len(values) < _MIN_SAMPLE:
-        return
-    _flag_if_anomalous(
-        category="weather",
-        metric="Average temperature",
-        value=temperature,
-        stats=_rolling_stats(values),
-    )
+    metrics["forecast"] = forecast_crypto_prices(assets=names)
+    return metrics
 
 
-def _flag_if_anomalous(
-    category: str, metric: str, value: float, stats: Dict[str, Optional[float]]
-) -> None:
-    mean = stats.get("mean")
-    std = stats.get("std")
-    if mean is None or std is None or std == 0 or stats.get("count", 0) < _MIN_SAMPLE:
-        return
+@timed(HISTORY_LATENCY)
+def calculate_weather_average(days: int = 7, city: str | None = None) -> Dict[str, Any]:
+    """Calculate the mean temperature recorded for ``city`` during the window."""
+    city = normalize_city(city)
+    if _stored_weather_series(city) is None:
+        return {"average_temperature": None, "temperature_std": None, "sample_size": 0}
+    return _weather_average(days, city)
 
-    deviation = abs(value - mean)
-    if deviation <= _SIGMA_THRESHOLD * std:
-        return
 
-    message = (
-        f"{metric} value {value:.2f} deviated more than {_SIGMA_THRESHOLD:.0f}σ "
-        f"from mean {mean:.2f} (σ={std:.2f})."
+@_memoize_on_latest(lambda days, city: _weather_series(city))
+def _weather_average(days: int, city: str) -> Dict[str, Any]:
+    window_start = datetime.now(timezone.utc) - timedelta(days=days)
+    frame = _window_frame(_weather_series(city), window_start)
+    if frame is not None:
+        summary = _summarize_frame(frame)["temperature"]
+    else:
+        summary = window_summary(WeatherRollup, window_start, (city,))[city]
+
+    metrics: Dict[str, Any] = {
+        "average_temperature": summary.mean,
+        "temperature_std": summary.std,
+        "sample_size": summary.count,
+    }
+    if not summary.count:
+        return metrics
+
+    metrics["forecast"] = forecast_weather_temperature(city)
+    return metrics
+
+
+@timed(HISTORY_LATENCY)
+@_memoize_on_latest("crypto")
+def forecast_crypto_prices(
+    assets: Optional[Sequence[str]] = None, horizon: Optional[int] = None
+) -> Dict[str, Any]:
+    """Forecast each asset's price ``horizon`` steps ahead with a 95% interval.
+
+    Each asset uses whichever of the linear, Holt and damped-trend models
+    has the lowest recent backtest error (reported under ``models``).
+    ``<asset>_price`` and ``next_timestamp`` describe the first step;
+    ``horizon`` lists every step.
+    """
+    names = _resolve_assets(assets)
+    steps = _FORECAST_HORIZON if horizon is None else max(int(horizon), 1)
+    forecast: Dict[str, Any] = {f"{asset}_price": None for asset in names}
+    forecast.update(
+        next_timestamp=None, models={}, horizon=[], interval=_FORECAST_INTERVAL
     )
-    _log_anomaly(category, message)
+    frame = _STORE.buffer("crypto").tail(_FORECAST_MAX_POINTS)
+    if len(frame) < _FORECAST_MIN_POINTS or not names:
+        return forecast
+
+    batch = _forecast_series("crypto", steps)
+    timestamps = _horizon_timestamps(frame.timestamps, steps)
+    forecast["horizon"] = [{"timestamp": timestamp} for timestamp in timestamps]
+    for asset in names:
+        column = frame.columns.index(asset)
+        forecast["models"][asset] = batch.models[column]
+        forecast[f"{asset}_price"] = _optional(batch.mean[column, 0])
+        for step, point in enumerate(forecast["horizon"]):
+            point[f"{asset}_price"] = _optional(batch.mean[column, step])
+            point[f"{asset}_lower"] = _optional(batch.lower[column, step])
+            point[f"{asset}_upper"] = _optional(batch.upper[column, step])
+    forecast["next_timestamp"] = timestamps[0] if timestamps else None
+    return forecast
+
+
+@timed(HISTORY_LATENCY)
+def forecast_weather_temperature(
+    city: str | None = None, horizon: Optional[int] = None
+) -> Dict[str, Any]:
+    """Forecast the temperature in ``city`` ``horizon`` steps ahead with a 95% interval."""
+    city = normalize_city(city)
+    steps = _FORECAST_HORIZON if horizon is None else max(int(horizon), 1)
+    if _stored_weather_series(city) is None:
+        return _empty_weather_forecast()
+    return _weather_forecast(city, steps)
+
+
+def _empty_weather_forecast() -> Dict[str, Any]:
+    return {
+        "average_temperature": None,
+        "next_timestamp": None,
+        "model": None,
+        "horizon": [],
+        "interval": _FORECAST_INTERVAL,
+    }
+
 
+@_memoize_on_latest(lambda city, steps: _weather_series(city))
+def _weather_forecast(city: str, steps: int) -> Dict[str, Any]:
+    series = _weather_series(city)
+    frame = _STORE.buffer(series).tail(_FORECAST_MAX_POINTS)
+    if len(frame) < _FORECAST_MIN_POINTS:
+        return _empty_weather_forecast()
 
+    batch = _forecast_series(series, steps)
+    timestamps = _horizon_timestamps(frame.timestamps, steps)
+    return {
+        "average_temperature": _optional(batch.mean[0, 0]),
+        "next_timestamp": timestamps[0] if timestamps else None,
+        "model": batch.models[0],
+        "horizon": [
+            {
+                "timestamp": timestamp,
+                "temperature": _optional(batch.mean[0, step]),
+                "lower": _optional(batch.lower[0, step]),
+                "upper": _optional(batch.upper[0, step]),
+            }
+            for step, timestamp in enumerate(timestamps)
+        ],
+        "interval": _FORECAST_INTERVAL,
+    }
+
+
+@timed(HISTORY_LATENCY)
 def has_recent_anomalies(hours: int = 24) -> bool:
     window_start = datetime.now(timezone.utc) - timedelta(hours=hours)
     return (
@@ -393,19 +907,138 @@ def has_recent_anomalies(hours: int = 24) -> bool:
     )
 
 
+@timed(HISTORY_LATENCY)
 def recent_anomalies(limit: int = 10) -> List[Dict[str, Any]]:
     rows: List[AnomalyLog] = (
         AnomalyLog.query.order_by(AnomalyLog.timestamp.desc(), AnomalyLog.id.desc())
         .limit(limit)
         .all()
     )
-    return [
-        {
-            "timestamp": row.timestamp.isoformat(),
-            "type": row.event_type,
-            "message": row.message,
-        }
-        for row in rows
-    ]
+    return [_anomaly_dict(row) for row in rows]
+
+
+def _anomaly_dict(row: AnomalyLog) -> Dict[str, Any]:
+    return {
+        "timestamp": row.timestamp.isoformat(),
+        "type": row.event_type,
+        "message": row.message,
+        "detector": row.detector,
+        "series": row.series,
+        "score": row.score,
+    }
+
+
+def _grouped_history(
+    key: Any, timestamp: Any, value: Any, row_id: Any
+) -> Iterator[Tuple[str, List[datetime], np.ndarray, np.ndarray]]:
+    """Yield ``(key, datetimes, epoch_us, values)`` per series, oldest first."""
+    rows = (
+        db.session.query(key, timestamp, value)
+        .order_by(key.asc(), timestamp.asc(), row_id.asc())
+        .all()
+    )
+    start = 0
+    for end in range(1, len(rows) + 1):
+        if end < len(rows) and rows[end][0] == rows[start][0]:
+            continue
+        group = rows[start:end]
+        datetimes = [row[1] for row in group]
+        yield (
+            group[0][0],
+            datetimes,
+            np.fromiter(map(to_epoch_us, datetimes), dtype=np.int64, count=len(group)),
+            np.fromiter((row[2] for row in group), dtype=float, count=len(group)),
+        )
+        start = end
+
+
+# ``app_metadata`` key set once the detector backfill has run.
+_ANOMALY_BACKFILL_KEY = "anomaly_backfill"
+
+
+@timed(HISTORY_LATENCY)
+def backfill_anomalies(
+    max_rows: Optional[int] = None, max_age: Optional[timedelta] = None
+) -> int:
+    """Scan the raw history with the configured detectors, once per database.
+
+    Completion is recorded in ``app_metadata``, so later starts skip the scan
+    even when it found nothing or retention has since removed its rows. A
+    database whose log already has detector rows is marked without scanning.
+    Only findings the ``anomaly_log`` retention policy would keep are
+    written: none older than ``max_age`` and at most the newest ``max_rows``.
+    Findings already logged for the same series, detector and reading are
+    skipped. Backfilled rows are stamped with the reading's time and are not
+    pushed to live subscribers. Returns how many rows were written.
+    """
+    if db.session.get(AppMetadata, _ANOMALY_BACKFILL_KEY) is not None:
+        return 0
+
+    written = 0
+    if AnomalyLog.query.filter(AnomalyLog.detector.isnot(None)).first() is None:
+        for category, series, finding, observed_at in _backfill_findings(max_rows, max_age):
+            _log_anomaly(category, series, finding, observed_at, timestamp=observed_at)
+            written += 1
+    db.session.add(
+        AppMetadata(
+            key=_ANOMALY_BACKFILL_KEY,
+            value=f"{written} rows at {datetime.now(timezone.utc).isoformat()}",
+        )
+    )
+    db.session.commit()
+    return written
+
+
+def _backfill_findings(
+    max_rows: Optional[int], max_age: Optional[timedelta]
+) -> List[Tuple[str, str, Finding, datetime]]:
+    """Return ``(category, series, finding, observed_at)`` for new findings, oldest first."""
+    seen = {
+        (series, detector, to_epoch_us(observed_at))
+        for series, detector, observed_at in db.session.query(
+            AnomalyLog.series, AnomalyLog.detector, AnomalyLog.observed_at
+        ).filter(AnomalyLog.observed_at.isnot(None))
+    }
+    cutoff_us = (
+        to_epoch_us(datetime.now(timezone.utc) - max_age) if max_age is not None else None
+    )
+    sources = (
+        (
+            "crypto",
+            lambda asset: (f"crypto:{asset}", _crypto_metric(asset)),
+            (CryptoPrice.asset, CryptoPrice.timestamp, CryptoPrice.price, CryptoPrice.id),
+        ),
+        (
+            "weather",
+            lambda city: (f"weather:{city}", _weather_metric(city)),
+            (
+                WeatherHistory.city,
+                WeatherHistory.timestamp,
+                WeatherHistory.temperature,
+                WeatherHistory.id,
+            ),
+        ),
+    )
+    found: List[Tuple[int, str, str, Finding, datetime]] = []
+    for category, naming, columns in sources:
+        for key, datetimes, timestamps, values in _grouped_history(*columns):
+            # Older readings still warm the detectors up; only their findings are dropped.
+            start = 0 if cutoff_us is None else int(np.searchsorted(timestamps, cutoff_us))
+            if start >= len(timestamps):
+                continue
+            series, metric = naming(key)
+            for finding in scan(detectors_for(category, key), metric, values, timestamps, start):
+                observed_us = int(timestamps[finding.index])
+                marker = (series, finding.detector, observed_us)
+                if marker in seen:
+                    continue
+                seen.add(marker)
+                found.append(
+                    (observed_us, category, series, finding, datetimes[finding.index])
+                )
+    found.sort(key=lambda item: item[0])
+    if max_rows is not None:
+        found = found[-max_rows:]
+    return [item[1:] for item in found]
 
 
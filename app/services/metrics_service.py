@@ -0,0 +1,328 @@
+"""In-process counters and latency histograms exported in Prometheus text format.
+
+Metrics are created once at import time on the module-level :data:`registry`
+and updated from any thread. Each metric keeps its own lock and stores one
+small list per label combination, so recording a sample is a dict lookup, a
+bisect over the bucket bounds and two additions. Cumulative buckets are only
+built when ``/metrics`` is scraped.
+
+Figures that other services already count (cache hit ratios, upstream
+retries) are not recorded twice; :meth:`MetricsRegistry.register_collector`
+turns their existing ``stats()`` snapshots into samples at scrape time.
+"""
+
+from __future__ import annotations
+
+import functools
+import math
+import threading
+import time
+from bisect import bisect_left
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, TypeVar
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+# Seconds; spans a cache hit (sub-millisecond) to a slow upstream call.
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+def _format_value(value: float) -> str:
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if math.isnan(value):
+        return "NaN"
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(labels: Sequence[Tuple[str, str]]) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels) + "}"
+
+
+@dataclass
+class MetricFamily:
+    """A scrape-time group of samples, as returned by collectors."""
+
+    name: str
+    kind: str
+    documentation: str
+    samples: List[Tuple[Dict[str, Any], float]] = field(default_factory=list)
+
+    def add(self, value: Optional[float], **labels: Any) -> None:
+        if value is not None:
+            self.samples.append((labels, float(value)))
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} {self.kind}"]
+        for labels, value in self.samples:
+            pairs = [(key, str(item)) for key, item in labels.items()]
+            lines.append(f"{self.name}{_format_labels(pairs)} {_format_value(value)}")
+        return lines
+
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+
+    def _key(self, labels: Dict[str, Any]) -> Tuple[str, ...]:
+        try:
+            key = tuple(str(labels[name]) for name in self.labelnames)
+        except KeyError as exc:
+            raise ValueError(f"{self.name} requires label {exc.args[0]!r}") from None
+        if len(labels) != len(self.labelnames):
+            unknown = sorted(set(labels) - set(self.labelnames))
+            raise ValueError(f"{self.name} has no label(s) {', '.join(unknown)}")
+        return key
+
+    def _pairs(self, key: Tuple[str, ...]) -> List[Tuple[str, str]]:
+        return list(zip(self.labelnames, key))
+
+    def render(self) -> List[str]:
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """Monotonically increasing count per label combination."""
+
+    kind = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> None:
+        super().__init__(name, documentation, labelnames)
+        self._values: Dict[Tuple[str, ...], float] = {}
+
+    def inc(self, amount: float = 1.0, **labels: Any) -> None:
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def value(self, **labels: Any) -> float:
+        with self._lock:
+            return self._values.get(self._key(labels), 0.0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} counter"]
+        for key, value in values:
+            lines.append(f"{self.name}{_format_labels(self._pairs(key))} {_format_value(value)}")
+        return lines
+
+
+class _Timer:
+    __slots__ = ("_histogram", "_labels", "_started")
+
+    def __init__(self, histogram: "Histogram", labels: Dict[str, Any]) -> None:
+        self._histogram = histogram
+        self._labels = labels
+
+    def __enter__(self) -> "_Timer":
+        self._started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self._histogram.observe(time.perf_counter() - self._started, **self._labels)
+
+
+class Histogram(_Metric):
+    """Bucketed distribution (plus sum and count) per label combination."""
+
+    kind = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> None:
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(float(bound) for bound in buckets if not math.isinf(bound)))
+        # Per key: one count per bucket (the last is +Inf), then the sum.
+        self._values: Dict[Tuple[str, ...], List[float]] = {}
+
+    def observe(self, value: float, **labels: Any) -> None:
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            slots = self._values.get(key)
+            if slots is None:
+                slots = self._values[key] = [0.0] * (len(self.buckets) + 2)
+            slots[index] += 1
+            slots[-1] += value
+
+    def time(self, **labels: Any) -> _Timer:
+        """Context manager observing the duration of its block."""
+        return _Timer(self, labels)
+
+    def count(self, **labels: Any) -> int:
+        with self._lock:
+            slots = self._values.get(self._key(labels))
+            return int(sum(slots[:-1])) if slots else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted((key, list(slots)) for key, slots in self._values.items())
+        lines = [f"# HELP {self.name} {self.documentation}", f"# TYPE {self.name} histogram"]
+        bounds = [_format_value(bound) for bound in self.buckets] + ["+Inf"]
+        for key, slots in values:
+            pairs = self._pairs(key)
+            cumulative = 0.0
+            for bound, count in zip(bounds, slots[:-1]):
+                cumulative += count
+                labels = _format_labels(pairs + [("le", bound)])
+                lines.append(f"{self.name}_bucket{labels} {_format_value(cumulative)}")
+            labels = _format_labels(pairs)
+            lines.append(f"{self.name}_sum{labels} {_format_value(slots[-1])}")
+            lines.append(f"{self.name}_count{labels} {_format_value(cumulative)}")
+        return lines
+
+
+Collector = Callable[[], Iterable[MetricFamily]]
+
+
+class MetricsRegistry:
+    """Owns the process's metrics and renders them for a scrape."""
+
+    def __init__(self) -> None:
+        self._metrics: Dict[str, _Metric] = {}
+        self._collectors: List[Collector] = []
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> Any:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} is already registered differently.")
+                return existing
+            self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def register_collector(self, collector: Collector) -> Collector:
+        """Add a callable producing :class:`MetricFamily` objects at scrape time."""
+        with self._lock:
+            self._collectors.append(collector)
+        return collector
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+            collectors = list(self._collectors)
+        lines: List[str] = []
+        for metric in metrics:
+            lines.extend(metric.render())
+        for collector in collectors:
+            for family in collector():
+                lines.extend(family.render())
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+HTTP_REQUESTS = registry.counter(
+    "dashboard_http_requests_total",
+    "HTTP responses by endpoint, method and status code.",
+    ("endpoint", "method", "status"),
+)
+HTTP_LATENCY = registry.histogram(
+    "dashboard_http_request_duration_seconds",
+    "Time to produce a response, by endpoint and method.",
+    ("endpoint", "method"),
+)
+UPSTREAM_LATENCY = registry.histogram(
+    "dashboard_upstream_request_duration_seconds",
+    "Duration of each upstream HTTP attempt (retries count separately).",
+    ("host", "method", "status"),
+)
+FALLBACKS = registry.counter(
+    "dashboard_fallback_served_total",
+    "Times canned fallback data was served instead of upstream data.",
+    ("source",),
+)
+JOB_RUNS = registry.counter(
+    "dashboard_scheduler_job_runs_total",
+    "Scheduler job runs by job and outcome.",
+    ("job", "outcome"),
+)
+JOB_LATENCY = registry.histogram(
+    "dashboard_scheduler_job_duration_seconds",
+    "Scheduler job run time.",
+    ("job",),
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0),
+)
+HISTORY_LATENCY = registry.histogram(
+    "dashboard_history_call_duration_seconds",
+    "History service call time by function.",
+    ("function",),
+)
+
+
+def timed(histogram: Histogram, **labels: Any) -> Callable[[F], F]:
+    """Decorator observing every call's duration on ``histogram``.
+
+    ``function`` defaults to the wrapped function's name when the histogram
+    has such a label and it is not given explicitly.
+    """
+
+    def decorate(func: F) -> F:
+        bound = dict(labels)
+        if "function" in histogram.labelnames:
+            bound.setdefault("function", func.__name__)
+        histogram._key(bound)  # Fail at import time on a label mismatch.
+
+        @functools.wraps(func)
+        def wrapper(*args: Any, **kwargs: Any) -> Any:
+            started = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                histogram.observe(time.perf_counter() - started, **bound)
+
+        return wrapper  # type: ignore[return-value]
+
+    return decorate
+
+
+def render_metrics() -> str:
+    """Return every metric in the Prometheus text exposition format."""
+    return registry.render()
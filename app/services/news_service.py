@@ -1,12 +1,16 @@
 from __future__ import annotations
 
 import os
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Tuple
 
-import requests
 from requests import HTTPError, RequestException
 
-NEWS_API_URL = "https://newsapi.org/v2/top-headlines"
+from app.services.cache_service import TTLCache, env_float, upstream_flight
+from app.services.metrics_service import FALLBACKS
+from app.services.upstream_client import upstream
+
+NEWS_API_BASE_URL = os.environ.get("NEWS_API_BASE_URL", "https://newsapi.org/v2").rstrip("/")
+NEWS_API_URL = f"{NEWS_API_BASE_URL}/top-headlines"
 DEFAULT_COUNTRY = "us"
 MAX_HEADLINES = 5
 
@@ -31,16 +35,29 @@ _NEWS_FALLBACK: List[Dict[str, str]] = [
     },
 ]
 
+_NEWS_KEY = (DEFAULT_COUNTRY, MAX_HEADLINES)
+_NEWS_CACHE = TTLCache(
+    "news",
+    ttl=env_float("NEWS_CACHE_TTL", 600.0),
+    max_entries=8,
+    stale_ttl=env_float("NEWS_CACHE_STALE_TTL", 3600.0),
+)
 
-def get_headlines() -> List[Dict[str, str]]:
-    """Fetch top headlines from NewsAPI or return canned examples."""
+
+def _serve_fallback() -> List[Dict[str, str]]:
+    FALLBACKS.inc(source="news")
+    return list(_NEWS_FALLBACK)
+
+
+def _fetch_headlines() -> Optional[List[Dict[str, str]]]:
+    """Call NewsAPI once, returning ``None`` when no headlines are available."""
     api_key = os.environ.get("NEWS_API_KEY")
     params = {"country": DEFAULT_COUNTRY, "pageSize": MAX_HEADLINES}
 
     if api_key:
         try:
             params["apiKey"] = api_key
-            response = requests.get(NEWS_API_URL, params=params, timeout=10)
+            response = upstream.get(NEWS_API_URL, params=params)
             response.raise_for_status()
             payload = response.json()
             articles = payload.get("articles", [])
@@ -66,4 +83,43 @@ def get_headlines() -> List[Dict[str, str]]:
             # Fallback keeps the UI populated even when the API call fails.
             pass
 
-    return list(_NEWS_FALLBACK)
+    return None
+
+
+def _load_headlines() -> Optional[List[Dict[str, str]]]:
+    return upstream_flight.do(("news", *_NEWS_KEY), _fetch_headlines)
+
+
+def get_headlines() -> List[Dict[str, str]]:
+    """Fetch top headlines from NewsAPI or return canned examples.
+
+    Headlines are cached for ``NEWS_CACHE_TTL`` seconds and concurrent misses
+    share one upstream call.
+    """
+    headlines = _NEWS_CACHE.get_or_load(_NEWS_KEY, _load_headlines)
+    if headlines:
+        return headlines
+    return _serve_fallback()
+
+
+def refresh_headlines() -> Optional[List[Dict[str, str]]]:
+    """Fetch fresh headlines for ingestion, updating the cache on success.
+
+    Returns ``None`` when NewsAPI produced no headlines.
+    """
+    return _NEWS_CACHE.refresh(_NEWS_KEY, _load_headlines) or None
+
+
+def news_payload(headlines: List[Dict[str, str]], last_updated: str) -> Dict[str, Any]:
+    """Shape headlines the way ``/news`` and the live event stream send them."""
+    return {"headlines": headlines[:5], "last_updated": last_updated}
+
+
+def headlines_version() -> Optional[Tuple[int, float]]:
+    """Return the cache generation and store time of the current headlines."""
+    return _NEWS_CACHE.version(_NEWS_KEY)
+
+
+def peek_headlines() -> List[Dict[str, str]]:
+    """Return the last cached headlines (or the fallback) without calling upstream."""
+    return _NEWS_CACHE.peek(_NEWS_KEY) or _serve_fallback()
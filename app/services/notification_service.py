@@ -3,12 +3,13 @@ from __future__ import annotations
 import os
 from typing import Dict, List
 
-import requests
 from flask import current_app
 from requests import RequestException, Response
 
 from app.services.history_service import calculate_crypto_change, calculate_weather_average
 from app.services.news_service import get_headlines
+from app.services.upstream_client import upstream
+from app.services.weather_service import DEFAULT_CITY
 
 _HEADLINE_LIMIT = 3
 _DEFAULT_WEBHOOK_ENV = "DAILY_SUMMARY_WEBHOOK_URL"
@@ -53,7 +54,8 @@ def _build_headline_lines(headlines: List[Dict[str, str]]) -> List[str]:
 def compose_daily_summary() -> str:
     """Build the textual summary that will be delivered to external channels."""
     crypto_metrics = calculate_crypto_change(hours=24)
-    weather_metrics = calculate_weather_average(days=1)
+    city = current_app.config.get("WEATHER_INGEST_CITY")
+    weather_metrics = calculate_weather_average(days=1, city=city)
     headlines = get_headlines()
 
     lines = ["**Daily Dashboard Summary**"]
@@ -64,7 +66,8 @@ def compose_daily_summary() -> str:
         f"• Ethereum 24h change: {_format_percent(crypto_metrics.get('ethereum_change_pct'))}"
     )
     lines.append(
-        f"• Average temperature (24h): {_format_temperature(weather_metrics.get('average_temperature'))}"
+        f"• Average temperature in {city or DEFAULT_CITY} (24h): "
+        f"{_format_temperature(weather_metrics.get('average_temperature'))}"
     )
 
     lines.extend([""] + _build_headline_lines(headlines))
@@ -98,9 +101,7 @@ def send_daily_summary() -> None:
     logger.info("Dispatching daily summary (%d characters).", len(payload))
 
     try:
-        response: Response = requests.post(
-            webhook_url, json={"content": payload}, timeout=10
-        )
+        response: Response = upstream.post(webhook_url, json={"content": payload})
         if response.status_code >= 400:
             logger.error(
                 "Daily summary webhook failed with status %s: %s",
@@ -0,0 +1,178 @@
+"""Set-based retention for the history and anomaly tables.
+
+Each table is trimmed with a single ``DELETE`` statement, so the cost of a
+prune no longer depends on how many stale rows have to be loaded into Python.
+Pruning runs as a scheduled job alongside ingestion rather than inside every
+save.
+"""
+
+from __future__ import annotations
+
+import os
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Mapping
+
+from flask import current_app
+from sqlalchemy import delete, func, or_, select
+
+from app.extensions import db
+from app.models import (
+    AnomalyLog,
+    CryptoPrice,
+    CryptoRollup,
+    WeatherHistory,
+    WeatherRollup,
+)
+from app.services.history_service import invalidate_analytics, trim_timeseries
+
+_TABLES: Dict[str, type[db.Model]] = {
+    "crypto_price": CryptoPrice,
+    "weather_history": WeatherHistory,
+    "anomaly_log": AnomalyLog,
+    "crypto_rollup": CryptoRollup,
+    "weather_rollup": WeatherRollup,
+}
+
+_DEFAULT_MAX_ROWS: Dict[str, int] = {
+    "crypto_price": 50,
+    "weather_history": 50,
+    "anomaly_log": 200,
+    "crypto_rollup": 0,
+    "weather_rollup": 0,
+}
+
+
+@dataclass(frozen=True)
+class RetentionPolicy:
+    """Keep at most ``max_rows`` rows and/or nothing older than ``max_age``."""
+
+    max_rows: int | None = None
+    max_age: timedelta | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_rows is not None or self.max_age is not None
+
+
+def _optional_number(name: str) -> float | None:
+    raw = (os.environ.get(name) or "").strip()
+    if not raw:
+        return None
+    try:
+        value = float(raw)
+    except ValueError:
+        return None
+    return value if value >= 0 else None
+
+
+def policies_from_env() -> Dict[str, RetentionPolicy]:
+    """Build per-table policies from ``<TABLE>_MAX_ROWS`` / ``<TABLE>_MAX_AGE_HOURS``.
+
+    Row limits default to the historical caps (50 history rows, 200 anomalies)
+    and are off for the rollup tables; setting a row limit to ``0`` disables
+    it so only the age limit applies. For ``crypto_price`` and
+    ``weather_history`` the row limit applies per asset and per city.
+    """
+    policies: Dict[str, RetentionPolicy] = {}
+    for table in _TABLES:
+        prefix = table.upper()
+        max_rows = _optional_number(f"{prefix}_MAX_ROWS")
+        if max_rows is None:
+            max_rows = _DEFAULT_MAX_ROWS[table]
+        max_age_hours = _optional_number(f"{prefix}_MAX_AGE_HOURS")
+        policies[table] = RetentionPolicy(
+            max_rows=int(max_rows) or None,
+            max_age=timedelta(hours=max_age_hours) if max_age_hours else None,
+        )
+    return policies
+
+
+# History tables mirrored by the in-memory store, and the series they feed.
+_BUFFERED = {
+    "crypto_price": "crypto",
+    "weather_history": "weather",
+}
+
+# Tables holding several series, whose row limits apply to each series.
+_PARTITIONS = {
+    CryptoPrice: CryptoPrice.asset,
+    WeatherHistory: WeatherHistory.city,
+}
+
+
+def _rows_beyond(model: type[db.Model], max_rows: int):
+    """Select ids past the newest ``max_rows`` (per series where partitioned)."""
+    partition = _PARTITIONS.get(model)
+    if partition is not None:
+        ranked = select(
+            model.id,
+            func.row_number()
+            .over(
+                partition_by=partition,
+                order_by=(model.timestamp.desc(), model.id.desc()),
+            )
+            .label("rank"),
+        ).subquery()
+        return select(ranked.c.id).where(ranked.c.rank > max_rows)
+    # Newest first, so everything past ``max_rows`` is safe to delete.
+    return (
+        select(model.id)
+        .order_by(model.timestamp.desc(), model.id.desc())
+        .offset(max_rows)
+    )
+
+
+def _cutoff(policy: RetentionPolicy, now: datetime | None = None) -> datetime | None:
+    if policy.max_age is None:
+        return None
+    return (now or datetime.now(timezone.utc)) - policy.max_age
+
+
+def prune_table(
+    model: type[db.Model], policy: RetentionPolicy, now: datetime | None = None
+) -> int:
+    """Delete rows outside ``policy`` with one statement; return the row count."""
+    conditions = []
+    if policy.max_rows is not None:
+        conditions.append(model.id.in_(_rows_beyond(model, policy.max_rows)))
+    cutoff = _cutoff(policy, now)
+    if cutoff is not None:
+        conditions.append(model.timestamp < cutoff)
+    if not conditions:
+        return 0
+
+    result = db.session.execute(
+        delete(model).where(or_(*conditions)),
+        execution_options={"synchronize_session": False},
+    )
+    return max(result.rowcount or 0, 0)
+
+
+def prune_all(policies: Mapping[str, RetentionPolicy] | None = None) -> Dict[str, int]:
+    """Apply every configured policy and commit; return deleted rows per table.
+
+    The in-memory history buffers are trimmed with the same policies even
+    when this process deleted nothing, since another process may have
+    pruned the shared database first.
+    """
+    if policies is None:
+        policies = current_app.config.get("RETENTION_POLICIES") or policies_from_env()
+
+    now = datetime.now(timezone.utc)
+    deleted: Dict[str, int] = {}
+    for table, model in _TABLES.items():
+        policy = policies.get(table)
+        if policy is None or not policy.enabled:
+            continue
+        deleted[table] = prune_table(model, policy, now)
+    db.session.commit()
+
+    trimmed = 0
+    for table, category in _BUFFERED.items():
+        policy = policies.get(table)
+        if policy is not None and policy.enabled:
+            trimmed += trim_timeseries(category, policy.max_rows, _cutoff(policy, now))
+    if trimmed or any(deleted.values()):
+        invalidate_analytics()
+    return deleted
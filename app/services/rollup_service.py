@@ -0,0 +1,305 @@
+"""Hourly and daily rollups that keep long-window analytics cheap.
+
+Every ingested reading is folded into its hour and day bucket as it is saved.
+Window queries then combine at most a partial hour of raw rows with a bounded
+number of hourly and daily buckets, instead of scanning every raw row.
+"""
+
+from __future__ import annotations
+
+import math
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Callable, Dict, Iterable, Mapping, Optional, Sequence, Tuple
+
+from sqlalchemy import and_, or_
+
+from app.extensions import db
+from app.models import CryptoPrice, CryptoRollup, WeatherHistory, WeatherRollup
+
+HOUR = "hour"
+DAY = "day"
+
+_STEPS = {HOUR: timedelta(hours=1), DAY: timedelta(days=1)}
+
+Reading = Tuple[str, datetime, float]
+# ``reader(series, start, end)`` yields ``(series, timestamp, value)`` raw
+# readings in chronological order; ``series=None`` means every series and
+# ``None`` bounds are open.
+RawReader = Callable[
+    [Optional[Sequence[str]], Optional[datetime], Optional[datetime]],
+    Iterable[Reading],
+]
+
+
+def _read_crypto(
+    series: Optional[Sequence[str]],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> Iterable[Reading]:
+    query = db.session.query(CryptoPrice.asset, CryptoPrice.timestamp, CryptoPrice.price)
+    if series is not None:
+        query = query.filter(CryptoPrice.asset.in_(list(series)))
+    if start is not None:
+        query = query.filter(CryptoPrice.timestamp >= start)
+    if end is not None:
+        query = query.filter(CryptoPrice.timestamp < end)
+    return query.order_by(CryptoPrice.timestamp.asc(), CryptoPrice.id.asc()).all()
+
+
+def _read_weather(
+    series: Optional[Sequence[str]],
+    start: Optional[datetime],
+    end: Optional[datetime],
+) -> Iterable[Reading]:
+    query = db.session.query(
+        WeatherHistory.city, WeatherHistory.timestamp, WeatherHistory.temperature
+    )
+    if series is not None:
+        query = query.filter(WeatherHistory.city.in_(list(series)))
+    if start is not None:
+        query = query.filter(WeatherHistory.timestamp >= start)
+    if end is not None:
+        query = query.filter(WeatherHistory.timestamp < end)
+    return query.order_by(WeatherHistory.timestamp.asc(), WeatherHistory.id.asc()).all()
+
+
+_RAW_READERS: Dict[type[db.Model], RawReader] = {
+    CryptoRollup: _read_crypto,
+    WeatherRollup: _read_weather,
+}
+
+
+def _as_utc(value: datetime) -> datetime:
+    # SQLite hands back naive datetimes even for timezone-aware columns.
+    if value.tzinfo is None:
+        return value.replace(tzinfo=timezone.utc)
+    return value.astimezone(timezone.utc)
+
+
+def _floor(value: datetime, granularity: str) -> datetime:
+    floored = value.replace(minute=0, second=0, microsecond=0)
+    if granularity == DAY:
+        floored = floored.replace(hour=0)
+    return floored
+
+
+def _ceil(value: datetime, granularity: str) -> datetime:
+    floored = _floor(value, granularity)
+    return floored if floored == value else floored + _STEPS[granularity]
+
+
+@dataclass
+class WindowSummary:
+    """Mergeable aggregate over any mix of raw readings and rollup buckets."""
+
+    count: int = 0
+    total: float = 0.0
+    total_sq: float = 0.0
+    min: Optional[float] = None
+    max: Optional[float] = None
+    first: Optional[float] = None
+    last: Optional[float] = None
+    first_timestamp: Optional[datetime] = None
+    last_timestamp: Optional[datetime] = None
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.total / self.count if self.count else None
+
+    @property
+    def std(self) -> Optional[float]:
+        """Population standard deviation, matching ``statistics.pstdev``."""
+        if not self.count:
+            return None
+        if self.count < 2:
+            return 0.0
+        mean = self.total / self.count
+        return math.sqrt(max(self.total_sq / self.count - mean * mean, 0.0))
+
+    def add_value(self, timestamp: datetime, value: float) -> None:
+        self._merge(1, value, value * value, value, value, value, value, timestamp, timestamp)
+
+    def add_bucket(self, bucket: db.Model) -> None:
+        self._merge(
+            bucket.count,
+            bucket.total,
+            bucket.total_sq,
+            bucket.min_value,
+            bucket.max_value,
+            bucket.first_value,
+            bucket.last_value,
+            bucket.first_timestamp,
+            bucket.last_timestamp,
+        )
+
+    def _merge(
+        self,
+        count: int,
+        total: float,
+        total_sq: float,
+        low: float,
+        high: float,
+        first: float,
+        last: float,
+        first_timestamp: datetime,
+        last_timestamp: datetime,
+    ) -> None:
+        # Segments are merged in chronological order, so only ``last`` moves.
+        if not count:
+            return
+        if not self.count:
+            self.first = first
+            self.first_timestamp = _as_utc(first_timestamp)
+        self.count += count
+        self.total += total
+        self.total_sq += total_sq
+        self.min = low if self.min is None else min(self.min, low)
+        self.max = high if self.max is None else max(self.max, high)
+        self.last = last
+        self.last_timestamp = _as_utc(last_timestamp)
+
+
+def record_rollups(
+    model: type[db.Model], timestamp: datetime, values: Mapping[str, float]
+) -> None:
+    """Fold one reading per series into its hour and day buckets (no commit)."""
+    if not values:
+        return
+    timestamp = _as_utc(timestamp)
+    buckets = [(HOUR, _floor(timestamp, HOUR)), (DAY, _floor(timestamp, DAY))]
+
+    existing = model.query.filter(
+        model.series.in_(list(values)),
+        or_(
+            *(
+                and_(model.granularity == granularity, model.bucket_start == start)
+                for granularity, start in buckets
+            )
+        ),
+    ).all()
+    index = {
+        (row.series, row.granularity, _as_utc(row.bucket_start)): row
+        for row in existing
+    }
+
+    for series, raw_value in values.items():
+        value = float(raw_value)
+        for granularity, start in buckets:
+            row = index.get((series, granularity, start))
+            if row is None:
+                db.session.add(
+                    model(
+                        series=series,
+                        granularity=granularity,
+                        bucket_start=start,
+                        count=1,
+                        total=value,
+                        total_sq=value * value,
+                        min_value=value,
+                        max_value=value,
+                        first_value=value,
+                        last_value=value,
+                        first_timestamp=timestamp,
+                        last_timestamp=timestamp,
+                    )
+                )
+                continue
+
+            row.count += 1
+            row.total += value
+            row.total_sq += value * value
+            row.min_value = min(row.min_value, value)
+            row.max_value = max(row.max_value, value)
+            if timestamp >= _as_utc(row.last_timestamp):
+                row.last_value = value
+                row.last_timestamp = timestamp
+            if timestamp < _as_utc(row.first_timestamp):
+                row.first_value = value
+                row.first_timestamp = timestamp
+
+
+def window_summary(
+    model: type[db.Model], start: datetime, series: Sequence[str]
+) -> Dict[str, WindowSummary]:
+    """Summarise each of ``series`` in ``model`` from ``start`` until now.
+
+    The partial hour after ``start`` is read from the raw table; whole hours
+    and days come from the rollups, so the work is bounded by the number of
+    buckets in the window rather than the number of readings.
+    """
+    summaries = {name: WindowSummary() for name in series}
+    if not summaries:
+        return summaries
+
+    start = _as_utc(start)
+    now = datetime.now(timezone.utc)
+    hour_edge = _ceil(start, HOUR)
+
+    if hour_edge > start:
+        for name, timestamp, value in _RAW_READERS[model](series, start, hour_edge):
+            if name in summaries:
+                summaries[name].add_value(timestamp, float(value))
+
+    day_edge = _ceil(hour_edge, DAY)
+    day_end = _floor(now, DAY)
+    if day_edge < day_end:
+        conditions = [
+            and_(
+                model.granularity == HOUR,
+                model.bucket_start >= hour_edge,
+                model.bucket_start < day_edge,
+            ),
+            and_(
+                model.granularity == DAY,
+                model.bucket_start >= day_edge,
+                model.bucket_start < day_end,
+            ),
+            and_(model.granularity == HOUR, model.bucket_start >= day_end),
+        ]
+    else:
+        conditions = [and_(model.granularity == HOUR, model.bucket_start >= hour_edge)]
+
+    buckets = (
+        model.query.filter(model.series.in_(list(series)), or_(*conditions))
+        .order_by(model.bucket_start.asc())
+        .all()
+    )
+    for bucket in buckets:
+        summaries[bucket.series].add_bucket(bucket)
+    return summaries
+
+
+def backfill_rollups() -> None:
+    """Build rollups from raw history for any rollup table that is still empty."""
+    for model, reader in _RAW_READERS.items():
+        if model.query.first() is not None:
+            continue
+
+        buckets: Dict[Tuple[str, str, datetime], WindowSummary] = {}
+        for name, raw_timestamp, value in reader(None, None, None):
+            timestamp = _as_utc(raw_timestamp)
+            for granularity in (HOUR, DAY):
+                key = (name, granularity, _floor(timestamp, granularity))
+                buckets.setdefault(key, WindowSummary()).add_value(
+                    timestamp, float(value)
+                )
+
+        db.session.add_all(
+            model(
+                series=name,
+                granularity=granularity,
+                bucket_start=bucket_start,
+                count=summary.count,
+                total=summary.total,
+                total_sq=summary.total_sq,
+                min_value=summary.min,
+                max_value=summary.max,
+                first_value=summary.first,
+                last_value=summary.last,
+                first_timestamp=summary.first_timestamp,
+                last_timestamp=summary.last_timestamp,
+            )
+            for (name, granularity, bucket_start), summary in buckets.items()
+        )
+    db.session.commit()
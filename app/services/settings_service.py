@@ -1,10 +1,62 @@
 from __future__ import annotations
 
+from typing import Dict, List, Optional
+
 from flask import g
 from flask_login import current_user
+from sqlalchemy.orm import joinedload
 
 from app.extensions import db
-from app.models import UserSettings
+from app.models import User, UserSettings
+from app.services.cache_service import TTLCache, env_float, env_int
+from app.services.weather_service import normalize_city
+
+# Detached User (with settings attached) snapshots keyed by user id. Each
+# request merges a copy into its own session without a SELECT, so the
+# cached instances themselves are never bound to a session or mutated.
+_IDENTITY_CACHE = TTLCache(
+    "identities",
+    ttl=env_float("IDENTITY_CACHE_TTL", 30.0),
+    max_entries=env_int("IDENTITY_CACHE_SIZE", 1024),
+)
+
+
+def _fetch_user(user_id: int) -> Optional[User]:
+    return (
+        db.session.query(User)
+        .options(joinedload(User.settings))
+        .filter(User.id == user_id)
+        .one_or_none()
+    )
+
+
+def _load_identity(user_id: int) -> Optional[User]:
+    user = _fetch_user(user_id)
+    if user is None:
+        return None
+    if user.settings is None:
+        UserSettings.ensure_for_user(user)
+        # The commit expired ``user``; reload it with its new settings.
+        user = _fetch_user(user_id)
+    db.session.expunge(user)
+    return user
+
+
+def load_user_with_settings(user_id: int) -> Optional[User]:
+    """Return ``user_id``'s User with settings loaded, bound to this request's session.
+
+    User and settings come from one joined query, cached process-wide for
+    ``IDENTITY_CACHE_TTL`` seconds; a cache hit issues no SQL at all.
+    """
+    cached = _IDENTITY_CACHE.get_or_load(user_id, lambda: _load_identity(user_id))
+    if cached is None:
+        return None
+    return db.session.merge(cached, load=False)
+
+
+def invalidate_user(user_id: int) -> None:
+    """Drop the cached identity after ``user_id``'s user or settings change."""
+    _IDENTITY_CACHE.invalidate(user_id)
 
 
 def get_user_settings() -> UserSettings:
@@ -21,6 +73,21 @@ def get_user_settings() -> UserSettings:
         settings = UserSettings(user=current_user)
         db.session.add(settings)
         db.session.commit()
+        invalidate_user(current_user.id)
 
     g._user_settings = settings
     return settings
+
+
+def weather_cities(*extra: str | None) -> List[str]:
+    """Return each distinct city across all users' settings (plus ``extra``) once.
+
+    Cities are de-duplicated by their normalized key, so a thousand users in
+    ten cities yield ten entries; each keeps one user-facing spelling.
+    """
+    rows = db.session.query(UserSettings.default_city).distinct()
+    cities: Dict[str, str] = {}
+    for city in [*extra, *(city for (city,) in rows)]:
+        if city and city.strip():
+            cities.setdefault(normalize_city(city), " ".join(city.split()))
+    return [cities[key] for key in sorted(cities)]
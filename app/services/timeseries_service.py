@@ -0,0 +1,300 @@
+"""Columnar in-memory time-series store backed by preallocated NumPy arrays.
+
+Each buffer is a fixed-capacity ring of row ids, int64 epoch-microsecond
+timestamps and a float64 value matrix (one column per metric), plus an
+optional label column. Buffers are loaded from the database at startup and
+appended to by ingestion, so analytics read array slices instead of ORM
+objects.
+
+Periodic syncs only fetch rows with an id above the newest buffered one, so
+the store assumes rows are committed in id order. That holds when a single
+process writes history: readers in other processes pick its rows up on the
+next sync. With several writers, a row committed after a higher id was
+already synced is never loaded, so run ingestion in one process only.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+_MICROSECOND = timedelta(microseconds=1)
+
+# ``loader(after_id, limit)`` returns up to ``limit`` of the newest rows with an
+# id above ``after_id``, oldest first, as ``(id, timestamp, *values[, label])``.
+RowLoader = Callable[[int, int], Sequence[Sequence[Any]]]
+
+
+def to_epoch_us(value: datetime) -> int:
+    """Convert a datetime (naive values are treated as UTC) to epoch microseconds."""
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    return (value - _EPOCH) // _MICROSECOND
+
+
+def from_epoch_us(value: int) -> datetime:
+    return _EPOCH + timedelta(microseconds=int(value))
+
+
+@dataclass
+class SeriesFrame:
+    """Contiguous, oldest-first copy of part of a :class:`SeriesBuffer`."""
+
+    columns: Tuple[str, ...]
+    ids: np.ndarray
+    timestamps: np.ndarray
+    values: np.ndarray
+    labels: Optional[np.ndarray] = None
+
+    def __len__(self) -> int:
+        return int(self.ids.size)
+
+    def column(self, name: str) -> np.ndarray:
+        return self.values[:, self.columns.index(name)]
+
+
+class SeriesBuffer:
+    """Fixed-capacity ring buffer holding one row per ingested snapshot."""
+
+    def __init__(
+        self, columns: Sequence[str], capacity: int, with_labels: bool = False
+    ) -> None:
+        self.columns = tuple(columns)
+        self.capacity = max(int(capacity), 1)
+        self._ids = np.zeros(self.capacity, dtype=np.int64)
+        self._timestamps = np.zeros(self.capacity, dtype=np.int64)
+        self._values = np.zeros((self.capacity, len(self.columns)), dtype=np.float64)
+        self._labels = np.empty(self.capacity, dtype=object) if with_labels else None
+        self._head = 0
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    def append(
+        self,
+        row_id: int,
+        timestamp_us: int,
+        values: Sequence[float],
+        label: Any = None,
+    ) -> None:
+        with self._lock:
+            if self._size and row_id <= self._ids[(self._head - 1) % self.capacity]:
+                return  # Already recorded (e.g. by a concurrent sync).
+            slot = self._head
+            self._ids[slot] = row_id
+            self._timestamps[slot] = timestamp_us
+            self._values[slot] = values
+            if self._labels is not None:
+                self._labels[slot] = label
+            self._head = (slot + 1) % self.capacity
+            self._size = min(self._size + 1, self.capacity)
+
+    def newest(self) -> Optional[Tuple[int, int]]:
+        """Return ``(timestamp_us, id)`` of the newest row, if any."""
+        with self._lock:
+            if not self._size:
+                return None
+            slot = (self._head - 1) % self.capacity
+            return int(self._timestamps[slot]), int(self._ids[slot])
+
+    def oldest_timestamp(self) -> Optional[int]:
+        with self._lock:
+            if not self._size:
+                return None
+            return int(self._timestamps[(self._head - self._size) % self.capacity])
+
+    def tail(self, count: int) -> SeriesFrame:
+        """Return the newest ``count`` rows, oldest first."""
+        with self._lock:
+            count = max(min(int(count), self._size), 0)
+            return self._frame(self._size - count)
+
+    def since(self, timestamp_us: int) -> SeriesFrame:
+        """Return every row at or after ``timestamp_us``, oldest first."""
+        with self._lock:
+            order = self._order(0)
+            offset = int(np.searchsorted(self._timestamps[order], timestamp_us))
+            return self._frame(offset)
+
+    def after(self, timestamp_us: int, row_id: int) -> SeriesFrame:
+        """Return rows ordered after the ``(timestamp_us, row_id)`` cursor, oldest first."""
+        with self._lock:
+            order = self._order(0)
+            timestamps = self._timestamps[order]
+            newer = (timestamps > timestamp_us) | (
+                (timestamps == timestamp_us) & (self._ids[order] > row_id)
+            )
+            return self._frame_for(order[newer])
+
+    def trim(self, max_rows: Optional[int] = None, cutoff_us: Optional[int] = None) -> int:
+        """Apply a retention policy the way the database prune does.
+
+        Per column only the newest ``max_rows`` finite values are kept, and no
+        value older than ``cutoff_us``; other values become ``NaN`` and rows
+        left without any value are dropped. Returns how many rows changed.
+        """
+        with self._lock:
+            if not self._size:
+                return 0
+            order = self._order(0)
+            values = self._values[order]
+            present = np.isfinite(values)
+            keep = present.copy()
+            if cutoff_us is not None:
+                keep &= (self._timestamps[order] >= cutoff_us)[:, None]
+            if max_rows is not None:
+                # Finite values at or after each row, per column.
+                newer = np.cumsum(present[::-1], axis=0)[::-1]
+                keep &= newer <= max_rows
+            changed = (present & ~keep).any(axis=1)
+            if not changed.any():
+                return 0
+
+            rows = keep.any(axis=1)
+            kept = int(rows.sum())
+            ids = self._ids[order][rows]
+            timestamps = self._timestamps[order][rows]
+            labels = self._labels[order][rows] if self._labels is not None else None
+            self._values[:kept] = np.where(keep, values, np.nan)[rows]
+            self._ids[:kept] = ids
+            self._timestamps[:kept] = timestamps
+            if labels is not None:
+                self._labels[:kept] = labels
+                self._labels[kept:] = None
+            self._head = kept % self.capacity
+            self._size = kept
+            return int(changed.sum())
+
+    def _order(self, offset: int) -> np.ndarray:
+        first = self._head - self._size
+        return (np.arange(first + offset, self._head) % self.capacity).astype(np.intp)
+
+    def _frame(self, offset: int) -> SeriesFrame:
+        return self._frame_for(self._order(offset))
+
+    def _frame_for(self, order: np.ndarray) -> SeriesFrame:
+        return SeriesFrame(
+            columns=self.columns,
+            ids=self._ids[order],
+            timestamps=self._timestamps[order],
+            values=self._values[order],
+            labels=self._labels[order] if self._labels is not None else None,
+        )
+
+
+@dataclass
+class _Registration:
+    buffer: SeriesBuffer
+    loader: RowLoader
+    synced_at: float = 0.0
+
+
+class TimeSeriesStore:
+    """Named :class:`SeriesBuffer` instances kept in step with the database."""
+
+    def __init__(self, capacity: int, sync_interval: float) -> None:
+        self.capacity = max(int(capacity), 1)
+        self.sync_interval = sync_interval
+        self._registrations: Dict[str, _Registration] = {}
+        self._lock = threading.Lock()
+
+    def register(
+        self,
+        name: str,
+        columns: Sequence[str],
+        loader: RowLoader,
+        with_labels: bool = False,
+    ) -> None:
+        with self._lock:
+            self._registrations[name] = _Registration(
+                buffer=SeriesBuffer(columns, self.capacity, with_labels=with_labels),
+                loader=loader,
+            )
+
+    def ensure(
+        self,
+        name: str,
+        columns: Sequence[str],
+        loader: RowLoader,
+        with_labels: bool = False,
+    ) -> None:
+        """Register ``name`` unless it already exists (for lazily added series)."""
+        with self._lock:
+            if name in self._registrations:
+                return
+            self._registrations[name] = _Registration(
+                buffer=SeriesBuffer(columns, self.capacity, with_labels=with_labels),
+                loader=loader,
+            )
+
+    def names(self) -> List[str]:
+        with self._lock:
+            return list(self._registrations)
+
+    def buffer(self, name: str) -> SeriesBuffer:
+        """Return the buffer for ``name``, pulling newer rows when a sync is due."""
+        registration = self._registrations[name]
+        if time.monotonic() - registration.synced_at >= self.sync_interval:
+            self.sync(name)
+        return registration.buffer
+
+    def sync(self, name: str) -> int:
+        """Append rows with ids above the newest buffered one; return how many.
+
+        Rows committed later with a lower id are not picked up (see the
+        module docstring).
+        """
+        registration = self._registrations[name]
+        buffer = registration.buffer
+        newest = buffer.newest()
+        rows = registration.loader(newest[1] if newest else 0, buffer.capacity)
+        width = len(buffer.columns)
+        for row in rows:
+            label = row[2 + width] if len(row) > 2 + width else None
+            buffer.append(
+                int(row[0]),
+                to_epoch_us(row[1]),
+                [float(value) for value in row[2 : 2 + width]],
+                label,
+            )
+        registration.synced_at = time.monotonic()
+        return len(rows)
+
+    def sync_all(self) -> None:
+        for name in self.names():
+            self.sync(name)
+
+    def append(
+        self,
+        name: str,
+        row_id: int,
+        timestamp: datetime,
+        values: Sequence[float],
+        label: Any = None,
+    ) -> None:
+        self._registrations[name].buffer.append(
+            row_id, to_epoch_us(timestamp), values, label
+        )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        snapshot: Dict[str, Dict[str, Any]] = {}
+        with self._lock:
+            registrations = dict(self._registrations)
+        for name, registration in registrations.items():
+            buffer = registration.buffer
+            nbytes = buffer._ids.nbytes + buffer._timestamps.nbytes + buffer._values.nbytes
+            snapshot[name] = {
+                "columns": list(buffer.columns),
+                "size": len(buffer),
+                "capacity": buffer.capacity,
+                "bytes": int(nbytes),
+            }
+        return snapshot
@@ -0,0 +1,221 @@
+"""Shared HTTP client for every upstream API the dashboard talks to.
+
+One keep-alive :class:`requests.Session` is kept per host so repeated calls
+reuse pooled TCP/TLS connections instead of paying for DNS, connect and
+handshake each time. Transient failures are retried a bounded number of times
+with full-jitter exponential backoff.
+"""
+
+from __future__ import annotations
+
+import logging
+import random
+import threading
+import time
+from typing import Any, Dict, List, Tuple
+from urllib.parse import urlsplit
+
+import requests
+from requests import RequestException, Response
+from requests.adapters import HTTPAdapter
+
+from app.services.cache_service import env_float, env_int
+from app.services.metrics_service import UPSTREAM_LATENCY, MetricFamily, registry
+
+logger = logging.getLogger(__name__)
+
+_RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+_IDEMPOTENT_METHODS = frozenset({"GET", "HEAD", "OPTIONS"})
+
+
+class UpstreamClient:
+    """Per-host pooled sessions with split timeouts and jittered retries."""
+
+    def __init__(
+        self,
+        pool_size: int = 10,
+        connect_timeout: float = 3.05,
+        read_timeout: float = 10.0,
+        max_retries: int = 2,
+        backoff_base: float = 0.5,
+        backoff_max: float = 4.0,
+    ) -> None:
+        self.pool_size = max(pool_size, 1)
+        self.timeout: Tuple[float, float] = (connect_timeout, read_timeout)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self._sessions: Dict[str, requests.Session] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_env(cls) -> "UpstreamClient":
+        return cls(
+            pool_size=env_int("UPSTREAM_POOL_SIZE", 10),
+            connect_timeout=env_float("UPSTREAM_CONNECT_TIMEOUT", 3.05),
+            read_timeout=env_float("UPSTREAM_READ_TIMEOUT", 10.0),
+            max_retries=env_int("UPSTREAM_MAX_RETRIES", 2),
+            backoff_base=env_float("UPSTREAM_BACKOFF", 0.5),
+            backoff_max=env_float("UPSTREAM_BACKOFF_MAX", 4.0),
+        )
+
+    def get(self, url: str, **kwargs: Any) -> Response:
+        return self.request("GET", url, **kwargs)
+
+    def post(self, url: str, **kwargs: Any) -> Response:
+        return self.request("POST", url, **kwargs)
+
+    def request(self, method: str, url: str, **kwargs: Any) -> Response:
+        """Send a request through the host's pooled session.
+
+        Idempotent methods are retried on connection errors, timeouts and
+        retryable status codes. Other methods are only retried when the
+        connection could not be established or the server answered 429, so a
+        webhook is never delivered twice. The last response (or exception) is
+        returned to the caller unchanged.
+        """
+        method = method.upper()
+        host = self._host_key(url)
+        session = self._session_for(host)
+        kwargs.setdefault("timeout", self.timeout)
+        idempotent = method in _IDEMPOTENT_METHODS
+
+        attempt = 0
+        while True:
+            self._count(host, "requests")
+            started = time.perf_counter()
+            try:
+                response = session.request(method, url, **kwargs)
+            except RequestException as exc:
+                UPSTREAM_LATENCY.observe(
+                    time.perf_counter() - started,
+                    host=host,
+                    method=method,
+                    status=type(exc).__name__,
+                )
+                retryable = idempotent or isinstance(
+                    exc, (requests.ConnectTimeout, requests.exceptions.SSLError)
+                )
+                if not retryable or attempt >= self.max_retries:
+                    self._count(host, "failures")
+                    raise
+                logger.debug("Retrying %s %s after %s", method, host, exc)
+            else:
+                UPSTREAM_LATENCY.observe(
+                    time.perf_counter() - started,
+                    host=host,
+                    method=method,
+                    status=str(response.status_code),
+                )
+                retryable = response.status_code == 429 or (
+                    idempotent and response.status_code in _RETRY_STATUSES
+                )
+                if not retryable or attempt >= self.max_retries:
+                    if response.status_code >= 400:
+                        self._count(host, "failures")
+                    return response
+                logger.debug(
+                    "Retrying %s %s after HTTP %s", method, host, response.status_code
+                )
+                response.close()
+
+            self._count(host, "retries")
+            time.sleep(self._backoff(attempt))
+            attempt += 1
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Return per-host request counters plus connection reuse figures."""
+        with self._lock:
+            sessions = dict(self._sessions)
+            counters = {host: dict(values) for host, values in self._counters.items()}
+
+        snapshot: Dict[str, Dict[str, Any]] = {}
+        for host, session in sessions.items():
+            connections = 0
+            pooled_requests = 0
+            adapter = session.get_adapter(host)
+            pools = getattr(getattr(adapter, "poolmanager", None), "pools", None)
+            if pools is not None:
+                for pool_key in list(pools.keys()):
+                    pool = pools.get(pool_key)
+                    if pool is None:
+                        continue
+                    connections += getattr(pool, "num_connections", 0)
+                    pooled_requests += getattr(pool, "num_requests", 0)
+
+            entry: Dict[str, Any] = counters.get(host, {})
+            entry["connections_opened"] = connections
+            entry["pooled_requests"] = pooled_requests
+            entry["connection_reuse_ratio"] = (
+                1 - connections / pooled_requests if pooled_requests else None
+            )
+            snapshot[host] = entry
+        return snapshot
+
+    def close(self) -> None:
+        with self._lock:
+            sessions = list(self._sessions.values())
+            self._sessions.clear()
+        for session in sessions:
+            session.close()
+
+    def _backoff(self, attempt: int) -> float:
+        # Full jitter keeps retries from many workers from re-synchronising.
+        ceiling = min(self.backoff_max, self.backoff_base * (2**attempt))
+        return random.uniform(0, ceiling)
+
+    def _count(self, host: str, name: str) -> None:
+        with self._lock:
+            counters = self._counters.setdefault(
+                host, {"requests": 0, "retries": 0, "failures": 0}
+            )
+            counters[name] += 1
+
+    @staticmethod
+    def _host_key(url: str) -> str:
+        parts = urlsplit(url)
+        return f"{parts.scheme}://{parts.netloc}"
+
+    def _session_for(self, host: str) -> requests.Session:
+        session = self._sessions.get(host)
+        if session is not None:
+            return session
+
+        with self._lock:
+            session = self._sessions.get(host)
+            if session is None:
+                session = requests.Session()
+                adapter = HTTPAdapter(
+                    pool_connections=1,
+                    pool_maxsize=self.pool_size,
+                    max_retries=0,
+                )
+                session.mount(host, adapter)
+                self._sessions[host] = session
+        return session
+
+
+upstream = UpstreamClient.from_env()
+
+
+def upstream_stats() -> Dict[str, Dict[str, Any]]:
+    """Return connection and retry counters for every upstream host."""
+    return upstream.stats()
+
+
+@registry.register_collector
+def _collect_upstream_metrics() -> List[MetricFamily]:
+    families = {
+        name: MetricFamily(f"dashboard_upstream_{name}_total", "counter", documentation)
+        for name, documentation in (
+            ("requests", "Upstream HTTP attempts by host, including retries."),
+            ("retries", "Upstream attempts that were retried."),
+            ("failures", "Upstream calls that finally failed."),
+            ("connections_opened", "TCP connections opened by each host's pool."),
+        )
+    }
+    for host, entry in upstream.stats().items():
+        for name, family in families.items():
+            family.add(entry.get(name, 0), host=host)
+    return list(families.values())
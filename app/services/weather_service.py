@@ -1,15 +1,28 @@
 from __future__ import annotations
 
 import os
-from typing import Any, Dict
+from typing import Any, Dict, Optional
 
-import requests
 from requests import HTTPError, RequestException
 
-OPEN_WEATHER_URL = "https://api.openweathermap.org/data/2.5/weather"
+from app.services.cache_service import TTLCache, env_float, env_int, upstream_flight
+from app.services.metrics_service import FALLBACKS
+from app.services.upstream_client import upstream
+
+OPEN_WEATHER_BASE_URL = os.environ.get(
+    "OPENWEATHER_BASE_URL", "https://api.openweathermap.org/data/2.5"
+).rstrip("/")
+OPEN_WEATHER_URL = f"{OPEN_WEATHER_BASE_URL}/weather"
 DEFAULT_CITY = "Chicago"
 DEFAULT_UNITS = "imperial"
 
+_WEATHER_CACHE = TTLCache(
+    "weather",
+    ttl=env_float("WEATHER_CACHE_TTL", 300.0),
+    max_entries=env_int("WEATHER_CACHE_SIZE", 256),
+    stale_ttl=env_float("WEATHER_CACHE_STALE_TTL", 3600.0),
+)
+
 
 def _build_fallback(city: str) -> Dict[str, Any]:
     return {
@@ -25,22 +38,97 @@ def _build_fallback(city: str) -> Dict[str, Any]:
     }
 
 
+def _serve_fallback(city: str) -> Dict[str, Any]:
+    FALLBACKS.inc(source="weather")
+    return _build_fallback(city)
+
+
+def _fetch_weather(city: str) -> Optional[Dict[str, Any]]:
+    """Call OpenWeatherMap once, returning ``None`` when no data is available."""
+    api_key = os.environ.get("OPENWEATHER_API_KEY")
+    if not api_key:
+        return None
+
+    params = {"q": city, "units": DEFAULT_UNITS, "appid": api_key}
+    try:
+        response = upstream.get(OPEN_WEATHER_URL, params=params)
+        response.raise_for_status()
+        payload = response.json()
+        if isinstance(payload, dict) and payload.get("name"):
+            return payload
+    except (HTTPError, RequestException, ValueError):
+        # Swallow API errors to ensure the dashboard remains functional.
+        pass
+
+    return None
+
+
+def normalize_city(city: str | None) -> str:
+    """Return the key a city is cached and stored under (case/space-insensitive)."""
+    return " ".join((city or "").split()).casefold() or DEFAULT_CITY.casefold()
+
+
+def _cache_key(city: str) -> tuple[str, str]:
+    return (normalize_city(city), DEFAULT_UNITS)
+
+
+def _load_weather(city: str) -> Optional[Dict[str, Any]]:
+    return upstream_flight.do(
+        ("weather", *_cache_key(city)), lambda: _fetch_weather(city)
+    )
+
+
 def get_weather_forecast(city: str | None = None) -> Dict[str, Any]:
-    """Fetch weather data from OpenWeatherMap or return fallback values."""
+    """Fetch weather data from OpenWeatherMap or return fallback values.
+
+    Readings are cached per city for ``WEATHER_CACHE_TTL`` seconds and
+    concurrent requests for the same city share one upstream call.
+    """
     target_city = (city or DEFAULT_CITY).strip() or DEFAULT_CITY
-    api_key = os.environ.get("OPENWEATHER_API_KEY")
-    params = {"q": target_city, "units": DEFAULT_UNITS}
-
-    if api_key:
-        params["appid"] = api_key
-        try:
-            response = requests.get(OPEN_WEATHER_URL, params=params, timeout=10)
-            response.raise_for_status()
-            payload = response.json()
-            if isinstance(payload, dict) and payload.get("name"):
-                return payload
-        except (HTTPError, RequestException, ValueError):
-            # Swallow API errors to ensure the dashboard remains functional.
-            pass
-
-    return _build_fallback(target_city)
+    payload = _WEATHER_CACHE.get_or_load(
+        _cache_key(target_city), lambda: _load_weather(target_city)
+    )
+    if payload:
+        return payload
+    return _serve_fallback(target_city)
+
+
+def refresh_weather_forecast(city: str | None = None) -> Optional[Dict[str, Any]]:
+    """Fetch a fresh reading for ingestion, updating the cache on success.
+
+    Returns ``None`` when OpenWeatherMap produced no reading (no API key or a
+    failed call), so callers never record the canned fallback as history.
+    """
+    target_city = (city or DEFAULT_CITY).strip() or DEFAULT_CITY
+    payload = _WEATHER_CACHE.refresh(
+        _cache_key(target_city), lambda: _load_weather(target_city)
+    )
+    return payload or None
+
+
+def weather_payload(data: Dict[str, Any], last_updated: str) -> Dict[str, Any]:
+    """Shape a reading the way ``/weather`` and the live event stream send it."""
+    main = data.get("main", {})
+    wind = data.get("wind", {})
+    weather_list = data.get("weather") or []
+    primary = weather_list[0] if weather_list else {}
+    return {
+        "city": data.get("name"),
+        "temperature": main.get("temp"),
+        "condition": primary.get("description") or primary.get("main", ""),
+        "humidity": main.get("humidity"),
+        "wind_speed": wind.get("speed"),
+        "last_updated": last_updated,
+    }
+
+
+def weather_forecast_version(city: str | None = None) -> Optional[tuple[int, float]]:
+    """Return the cache generation and store time of ``city``'s reading."""
+    target_city = (city or DEFAULT_CITY).strip() or DEFAULT_CITY
+    return _WEATHER_CACHE.version(_cache_key(target_city))
+
+
+def peek_weather_forecast(city: str | None = None) -> Dict[str, Any]:
+    """Return the last cached reading (or the fallback) without calling upstream."""
+    target_city = (city or DEFAULT_CITY).strip() or DEFAULT_CITY
+    return _WEATHER_CACHE.peek(_cache_key(target_city)) or _serve_fallback(target_city)
@@ -0,0 +1,5 @@
+"""Offline benchmarks for the dashboard's history and analytics paths.
+
+Run ``python -m benchmarks.history_bench`` from the repository root; see the
+README for options and for comparing runs with ``python -m benchmarks.compare``.
+"""
@@ -0,0 +1,120 @@
+"""Compare two benchmark result files and fail on regressions.
+
+A benchmark regresses when its median time in the current run exceeds the
+baseline median by more than ``--threshold`` (a ratio, default ``1.25``)
+and by more than ``--noise-ms`` (default ``0.5``), so sub-millisecond jitter
+on fast paths is not reported. Benchmarks present in only one file are
+counted but never fail the check.
+
+Usage::
+
+    python -m benchmarks.compare baseline.json current.json --threshold 1.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from typing import Any, Dict, List, Optional, Tuple
+
+DEFAULT_THRESHOLD = 1.25
+DEFAULT_NOISE_MS = 0.5
+
+Key = Tuple[str, int]
+
+
+def load_results(path: str) -> Dict[Key, Dict[str, Any]]:
+    with open(path, encoding="utf-8") as handle:
+        report = json.load(handle)
+    return {(row["name"], int(row["size"])): row for row in report.get("results", [])}
+
+
+def find_regressions(
+    baseline: Dict[Key, Dict[str, Any]],
+    current: Dict[Key, Dict[str, Any]],
+    threshold: float = DEFAULT_THRESHOLD,
+    noise_ms: float = DEFAULT_NOISE_MS,
+) -> List[Dict[str, Any]]:
+    """Return one row per benchmark in both runs, flagging those that regressed."""
+    rows = []
+    for key in sorted(set(baseline) & set(current), key=lambda item: (item[1], item[0])):
+        before = float(baseline[key]["median_ms"])
+        after = float(current[key]["median_ms"])
+        ratio = after / before if before > 0 else float("inf")
+        rows.append(
+            {
+                "name": key[0],
+                "size": key[1],
+                "baseline_ms": before,
+                "current_ms": after,
+                "ratio": ratio,
+                "regressed": ratio > threshold and after - before > noise_ms,
+                "queries": (baseline[key].get("queries"), current[key].get("queries")),
+            }
+        )
+    return rows
+
+
+def compare_files(
+    baseline_path: str,
+    current_path: str,
+    threshold: float = DEFAULT_THRESHOLD,
+    noise_ms: float = DEFAULT_NOISE_MS,
+) -> int:
+    """Print a comparison table; return ``1`` if anything regressed, else ``0``."""
+    baseline = load_results(baseline_path)
+    current = load_results(current_path)
+    rows = find_regressions(baseline, current, threshold, noise_ms)
+
+    for row in rows:
+        before_queries, after_queries = row["queries"]
+        queries = "" if before_queries == after_queries else (
+            f"  queries {before_queries} -> {after_queries}"
+        )
+        marker = "REGRESSED" if row["regressed"] else "ok"
+        print(
+            f"{row['name']:<34} {row['size']:>9,} {row['baseline_ms']:>11.3f} ms"
+            f" -> {row['current_ms']:>11.3f} ms  x{row['ratio']:.2f}  {marker}{queries}"
+        )
+    only_baseline = len(set(baseline) - set(current))
+    only_current = len(set(current) - set(baseline))
+    if only_baseline or only_current:
+        print(
+            f"Not compared: {only_baseline} benchmark(s) only in the baseline, "
+            f"{only_current} only in the current run."
+        )
+
+    regressed = [row for row in rows if row["regressed"]]
+    if regressed:
+        print(
+            f"{len(regressed)} benchmark(s) slower than x{threshold:.2f} "
+            f"(and by more than {noise_ms:g} ms).",
+            file=sys.stderr,
+        )
+        return 1
+    return 0
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("baseline", help="result file to compare against")
+    parser.add_argument("current", help="result file of the run being checked")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help=f"allowed median slowdown ratio (default {DEFAULT_THRESHOLD})",
+    )
+    parser.add_argument(
+        "--noise-ms",
+        type=float,
+        default=DEFAULT_NOISE_MS,
+        help=f"ignore slowdowns smaller than this many ms (default {DEFAULT_NOISE_MS})",
+    )
+    args = parser.parse_args(argv)
+    return compare_files(args.baseline, args.current, args.threshold, args.noise_ms)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
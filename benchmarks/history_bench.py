@@ -0,0 +1,388 @@
+"""Time the history service against SQLite databases of increasing size.
+
+For every requested size a fresh worker process creates a temporary SQLite
+database, seeds ``size`` crypto price rows (spread over the tracked assets,
+one snapshot a minute) and ``size`` weather rows (one city, every five
+minutes), rebuilds the startup state and then times each benchmark. Each
+result records wall time over ``--repeat`` runs, the SQL statements issued
+by one call and that call's peak traced memory. Nothing touches the network.
+
+Usage::
+
+    python -m benchmarks.history_bench --sizes 1000,10000 --repeat 5 \\
+        --output benchmarks/results/local.json --baseline benchmarks/results/main.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime, timedelta, timezone
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+RESULTS_DIR = os.path.join(ROOT, "benchmarks", "results")
+SCHEMA_VERSION = 1
+
+_CRYPTO_STEP = timedelta(minutes=1)
+_WEATHER_STEP = timedelta(minutes=5)
+_SEED_CHUNK = 20_000
+_CITY = "chicago"
+
+Benchmark = Tuple[str, Callable[[], Any], Optional[Callable[[], None]]]
+
+
+def _configure_environment(database_path: str) -> None:
+    """Point the app at ``database_path`` with every background job disabled."""
+    os.environ["DATABASE_URL"] = f"sqlite:///{database_path}"
+    os.environ["ENABLE_INGESTION"] = "false"
+    os.environ["ENABLE_DAILY_SUMMARY"] = "false"
+    os.environ.setdefault("WEATHER_INGEST_CITY", _CITY)
+
+
+def _seed(db: Any, size: int) -> None:
+    from app.models import CryptoPrice, WeatherHistory
+    from app.services.crypto_service import TRACKED_ASSETS
+
+    now = datetime.now(timezone.utc)
+    snapshots = -(-size // len(TRACKED_ASSETS))
+    crypto_start = now - _CRYPTO_STEP * snapshots
+    rows: List[Dict[str, Any]] = []
+    for index in range(size):
+        snapshot, column = divmod(index, len(TRACKED_ASSETS))
+        rows.append(
+            {
+                "asset": TRACKED_ASSETS[column],
+                "timestamp": crypto_start + _CRYPTO_STEP * snapshot,
+                "price": 100.0 * (column + 1) + (snapshot % 97) * 0.5,
+            }
+        )
+        if len(rows) == _SEED_CHUNK:
+            db.session.execute(CryptoPrice.__table__.insert(), rows)
+            rows = []
+    if rows:
+        db.session.execute(CryptoPrice.__table__.insert(), rows)
+
+    weather_start = now - _WEATHER_STEP * size
+    for chunk_start in range(0, size, _SEED_CHUNK):
+        db.session.execute(
+            WeatherHistory.__table__.insert(),
+            [
+                {
+                    "city": _CITY,
+                    "timestamp": weather_start + _WEATHER_STEP * index,
+                    "temperature": 60.0 + (index % 288) / 24.0,
+                    "condition": "Clear",
+                }
+                for index in range(chunk_start, min(chunk_start + _SEED_CHUNK, size))
+            ],
+        )
+    db.session.commit()
+
+
+def _benchmarks() -> List[Benchmark]:
+    """Return ``(name, call, setup)`` triples; ``setup`` runs untimed before each call."""
+    from app.models import CryptoPrice
+    from app.services import history_service
+    from app.services.crypto_service import TRACKED_ASSETS
+    from app.services.retention_service import RetentionPolicy, prune_all
+
+    prices = iter(range(10**9))
+
+    def save_crypto() -> None:
+        tick = next(prices)
+        history_service.save_crypto_data(
+            {asset: 100.0 + (tick % 13) for asset in TRACKED_ASSETS}
+        )
+
+    def prune() -> None:
+        # Trim about 1% of each asset's rows per call so every run deletes.
+        per_asset = CryptoPrice.query.filter(
+            CryptoPrice.asset == TRACKED_ASSETS[0]
+        ).count()
+        keep = max(per_asset - max(per_asset // 100, 1), 1)
+        prune_all({"crypto_price": RetentionPolicy(max_rows=keep)})
+
+    cold = history_service.invalidate_analytics
+    return [
+        ("save_crypto_data", save_crypto, None),
+        ("calculate_crypto_change[24h]", history_service.calculate_crypto_change, cold),
+        (
+            "calculate_crypto_change[30d]",
+            lambda: history_service.calculate_crypto_change(hours=24 * 30),
+            cold,
+        ),
+        (
+            "calculate_crypto_change[cached]",
+            history_service.calculate_crypto_change,
+            history_service.calculate_crypto_change,
+        ),
+        ("get_crypto_history", history_service.get_crypto_history, None),
+        (
+            "get_crypto_history[columnar]",
+            lambda: history_service.crypto_history_page(limit=1000, columnar=True),
+            None,
+        ),
+        ("forecast_crypto_prices", history_service.forecast_crypto_prices, cold),
+        (
+            "calculate_weather_average",
+            lambda: history_service.calculate_weather_average(city=_CITY),
+            cold,
+        ),
+        (
+            "forecast_weather_temperature",
+            lambda: history_service.forecast_weather_temperature(_CITY),
+            cold,
+        ),
+        # Destructive, so it runs last.
+        ("prune_all[crypto_price]", prune, None),
+    ]
+
+
+@contextmanager
+def _counting_queries(engine: Any) -> Iterator[List[int]]:
+    """Count SQL statements ``engine`` executes inside the block (in ``[0]``)."""
+    from sqlalchemy import event
+
+    counter = [0]
+
+    def _count(*_: Any) -> None:
+        counter[0] += 1
+
+    event.listen(engine, "before_cursor_execute", _count)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", _count)
+
+
+def _traced_call(func: Callable[[], Any], engine: Any) -> Tuple[float, int, float]:
+    """Call ``func`` once; return its wall time (ms), statements and peak KiB."""
+    with _counting_queries(engine) as queries:
+        tracemalloc.start()
+        try:
+            started = time.perf_counter()
+            func()
+            elapsed = (time.perf_counter() - started) * 1000.0
+            _, peak = tracemalloc.get_traced_memory()
+        finally:
+            tracemalloc.stop()
+    return elapsed, queries[0], peak / 1024.0
+
+
+def _result(
+    name: str,
+    size: int,
+    timings: List[float],
+    queries: int,
+    peak: float,
+    traced: bool = False,
+) -> Dict[str, Any]:
+    return {
+        "name": name,
+        "size": size,
+        "runs": len(timings),
+        "traced": traced,
+        "median_ms": round(statistics.median(timings), 4),
+        "min_ms": round(min(timings), 4),
+        "max_ms": round(max(timings), 4),
+        "queries": queries,
+        "peak_kib": round(peak, 1),
+    }
+
+
+def _measure(
+    name: str,
+    size: int,
+    func: Callable[[], Any],
+    setup: Optional[Callable[[], None]],
+    repeat: int,
+    engine: Any,
+) -> Dict[str, Any]:
+    # Statements and peak memory come from a traced call of their own, so
+    # tracing never inflates the timings.
+    if setup is not None:
+        setup()
+    _, queries, peak = _traced_call(func, engine)
+    timings: List[float] = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        started = time.perf_counter()
+        func()
+        timings.append((time.perf_counter() - started) * 1000.0)
+    return _result(name, size, timings, queries, peak)
+
+
+def _measure_once(
+    name: str, size: int, func: Callable[[], Any], engine: Any
+) -> Dict[str, Any]:
+    """Startup steps change state, so their one call is timed while traced.
+
+    Their times include tracemalloc overhead (``"traced": true``); they are
+    comparable between runs but not with untraced benchmarks.
+    """
+    elapsed, queries, peak = _traced_call(func, engine)
+    return _result(name, size, [elapsed], queries, peak, traced=True)
+
+
+def run_size(size: int, repeat: int) -> List[Dict[str, Any]]:
+    """Seed a temporary database with ``size`` rows per table and benchmark it."""
+    with tempfile.TemporaryDirectory(prefix="history-bench-") as workdir:
+        _configure_environment(os.path.join(workdir, "bench.db"))
+        sys.path.insert(0, ROOT)
+        from app import create_app
+        from app.extensions import db
+        from app.services.history_service import backfill_anomalies, load_timeseries
+        from app.services.rollup_service import backfill_rollups
+
+        app = create_app()
+        with app.app_context():
+            _seed(db, size)
+            engine = db.engine
+            # Rebuild what create_app derives from existing history.
+            startup = (
+                ("startup.backfill_rollups", backfill_rollups),
+                ("startup.load_timeseries", load_timeseries),
+                ("startup.backfill_anomalies", backfill_anomalies),
+            )
+            results = [
+                _measure_once(name, size, func, engine) for name, func in startup
+            ]
+            for name, func, setup in _benchmarks():
+                results.append(_measure(name, size, func, setup, repeat, engine))
+            db.session.remove()
+            db.engine.dispose()
+        return results
+
+
+def _run_worker(size: int, repeat: int) -> List[Dict[str, Any]]:
+    """Benchmark one size in a fresh interpreter so module state starts empty."""
+    completed = subprocess.run(
+        [
+            sys.executable,
+            "-m",
+            "benchmarks.history_bench",
+            "--worker",
+            "--sizes",
+            str(size),
+            "--repeat",
+            str(repeat),
+        ],
+        cwd=ROOT,
+        check=True,
+        stdout=subprocess.PIPE,
+    )
+    return json.loads(completed.stdout)
+
+
+def _environment() -> Dict[str, Any]:
+    import numpy
+    import sqlalchemy
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=ROOT,
+            check=True,
+            capture_output=True,
+            text=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "numpy": numpy.__version__,
+        "sqlalchemy": sqlalchemy.__version__,
+        "commit": commit,
+    }
+
+
+def _parse_sizes(raw: str) -> List[int]:
+    sizes = []
+    for part in raw.split(","):
+        part = part.strip()
+        if part:
+            sizes.append(int(float(part)))
+    if not sizes or min(sizes) < 1:
+        raise argparse.ArgumentTypeError("sizes must be positive integers")
+    return sizes
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--sizes",
+        type=_parse_sizes,
+        default=list(DEFAULT_SIZES),
+        help="comma separated row counts per table (default: 1e3,1e4,1e5,1e6)",
+    )
+    parser.add_argument("--repeat", type=int, default=5, help="timed runs per benchmark")
+    parser.add_argument(
+        "--output", help="result file (default: benchmarks/results/history-<UTC time>.json)"
+    )
+    parser.add_argument("--baseline", help="compare against this result file afterwards")
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=None,
+        help="allowed slowdown ratio for --baseline (see benchmarks.compare)",
+    )
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+    repeat = max(args.repeat, 1)
+
+    if args.worker:
+        results = [row for size in args.sizes for row in run_size(size, repeat)]
+        json.dump(results, sys.stdout)
+        return 0
+
+    results: List[Dict[str, Any]] = []
+    for size in args.sizes:
+        print(f"Benchmarking {size:,} rows per table...", file=sys.stderr)
+        rows = _run_worker(size, repeat)
+        for row in rows:
+            print(
+                f"  {row['name']:<34} {row['median_ms']:>11.3f} ms"
+                f" {row['queries']:>6} queries {row['peak_kib']:>11.1f} KiB",
+                file=sys.stderr,
+            )
+        results.extend(rows)
+
+    report = {
+        "schema": SCHEMA_VERSION,
+        "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "repeat": repeat,
+        "environment": _environment(),
+        "results": results,
+    }
+    output = args.output or os.path.join(
+        RESULTS_DIR, datetime.now(timezone.utc).strftime("history-%Y%m%dT%H%M%SZ.json")
+    )
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as handle:
+        json.dump(report, handle, indent=2)
+        handle.write("\n")
+    print(f"Wrote {output}", file=sys.stderr)
+
+    if args.baseline:
+        from benchmarks.compare import compare_files
+
+        options = {} if args.threshold is None else {"threshold": args.threshold}
+        return compare_files(args.baseline, output, **options)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
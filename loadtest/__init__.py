@@ -0,0 +1,6 @@
+"""End-to-end load testing against local stand-ins for the upstream APIs.
+
+``python -m loadtest`` starts the stubs, serves the app against them from a
+temporary database and drives it with concurrent logged-in sessions; see the
+README for options.
+"""
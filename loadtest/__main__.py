@@ -0,0 +1,5 @@
+import sys
+
+from loadtest.driver import main
+
+sys.exit(main())
@@ -0,0 +1,38 @@
+"""Serve the dashboard with Werkzeug's threaded server for load tests.
+
+Configuration comes from the environment (the harness points the upstream
+base URLs at the stubs and ``DATABASE_URL`` at a temporary database).
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+
+from werkzeug.serving import run_simple
+
+from app import create_app
+from app.services.notification_service import send_daily_summary
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5001)
+    parser.add_argument(
+        "--send-summary",
+        action="store_true",
+        help="post one daily summary at startup (exercises the webhook stub)",
+    )
+    args = parser.parse_args()
+
+    app = create_app()
+    app.secret_key = os.getenv("FLASK_SECRET_KEY", "loadtest-secret")
+    if args.send_summary:
+        with app.app_context():
+            send_daily_summary()
+    run_simple(args.host, args.port, app, threaded=True, use_reloader=False)
+
+
+if __name__ == "__main__":
+    main()
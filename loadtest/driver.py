@@ -0,0 +1,373 @@
+"""Drive the dashboard with concurrent logged-in sessions and report latency.
+
+Each virtual user registers its own account, logs in and then requests
+routes picked at random (by weight) until the run ends. A request counts as
+an error when it raises, or answers with anything other than 200 or 304
+(a redirect means the session was lost). The report lists, per route,
+request count, throughput, error rate and p50/p95/p99 latency.
+
+By default the harness starts the upstream stubs and an app server against a
+temporary database; pass ``--target`` to drive an already running app
+instead (start it against ``python -m loadtest.stubs`` to keep upstream
+traffic local).
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import uuid
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+import requests
+
+from loadtest.stubs import (
+    StubServer,
+    add_stub_arguments,
+    configs_from_args,
+    start_stubs,
+    stub_environment,
+)
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+DEFAULT_ROUTES: Tuple[Tuple[str, float], ...] = (
+    ("/", 1.0),
+    ("/crypto", 2.0),
+    ("/weather", 2.0),
+    ("/news", 1.0),
+    ("/insights", 1.0),
+    ("/api/crypto_history", 2.0),
+    ("/api/weather_history", 2.0),
+)
+_OK_STATUSES = frozenset({200, 304})
+
+
+@dataclass
+class RouteSamples:
+    latencies_ms: List[float] = field(default_factory=list)
+    errors: int = 0
+    statuses: Counter = field(default_factory=Counter)
+
+    def merge(self, other: "RouteSamples") -> None:
+        self.latencies_ms.extend(other.latencies_ms)
+        self.errors += other.errors
+        self.statuses.update(other.statuses)
+
+
+class VirtualUser(threading.Thread):
+    """One logged-in browser session issuing requests until ``deadline``."""
+
+    def __init__(
+        self,
+        base_url: str,
+        routes: Sequence[Tuple[str, float]],
+        start_at: float,
+        deadline: float,
+        think_ms: float,
+        conditional: bool,
+        seed: int,
+    ) -> None:
+        super().__init__(daemon=True)
+        self.base_url = base_url.rstrip("/")
+        self.paths = [path for path, _ in routes]
+        self.weights = [weight for _, weight in routes]
+        self.start_at = start_at
+        self.deadline = deadline
+        self.think = think_ms / 1000.0
+        self.conditional = conditional
+        self.rng = random.Random(seed)
+        self.samples: Dict[str, RouteSamples] = {}
+        self.login_error: Optional[str] = None
+        self._etags: Dict[str, str] = {}
+
+    def _login(self, session: requests.Session) -> bool:
+        email = f"load-{uuid.uuid4().hex[:12]}@example.com"
+        password = uuid.uuid4().hex
+        session.post(
+            f"{self.base_url}/register",
+            data={"email": email, "password": password, "confirm_password": password},
+            allow_redirects=False,
+            timeout=30,
+        )
+        response = session.post(
+            f"{self.base_url}/login",
+            data={"email": email, "password": password},
+            allow_redirects=False,
+            timeout=30,
+        )
+        # A successful login redirects away from the login page.
+        if response.status_code != 302 or "/login" in response.headers.get("Location", ""):
+            self.login_error = f"login answered {response.status_code}"
+            return False
+        return True
+
+    def _request(self, session: requests.Session, path: str) -> None:
+        samples = self.samples.setdefault(path, RouteSamples())
+        headers = {}
+        if self.conditional and path in self._etags:
+            headers["If-None-Match"] = self._etags[path]
+        started = time.perf_counter()
+        try:
+            response = session.get(
+                f"{self.base_url}{path}", headers=headers, allow_redirects=False, timeout=60
+            )
+            response.content  # Include the body transfer in the latency.
+            status = response.status_code
+        except requests.RequestException as exc:
+            samples.latencies_ms.append((time.perf_counter() - started) * 1000.0)
+            samples.errors += 1
+            samples.statuses[type(exc).__name__] += 1
+            return
+        samples.latencies_ms.append((time.perf_counter() - started) * 1000.0)
+        samples.statuses[str(status)] += 1
+        if status not in _OK_STATUSES:
+            samples.errors += 1
+        elif response.headers.get("ETag"):
+            self._etags[path] = response.headers["ETag"]
+
+    def run(self) -> None:
+        delay = self.start_at - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
+        with requests.Session() as session:
+            if not self._login(session):
+                return
+            while time.monotonic() < self.deadline:
+                path = self.rng.choices(self.paths, weights=self.weights)[0]
+                self._request(session, path)
+                if self.think:
+                    time.sleep(self.think)
+
+
+def _percentile(values: np.ndarray, q: float) -> Optional[float]:
+    return round(float(np.percentile(values, q)), 2) if values.size else None
+
+
+def summarize(samples: Dict[str, RouteSamples], elapsed: float) -> Dict[str, Any]:
+    """Per-route and overall latency percentiles, throughput and error rate."""
+
+    def describe(route: RouteSamples) -> Dict[str, Any]:
+        latencies = np.asarray(route.latencies_ms)
+        count = int(latencies.size)
+        return {
+            "requests": count,
+            "errors": route.errors,
+            "error_rate": round(route.errors / count, 4) if count else 0.0,
+            "throughput_rps": round(count / elapsed, 2) if elapsed > 0 else 0.0,
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "p99_ms": _percentile(latencies, 99),
+            "max_ms": round(float(latencies.max()), 2) if count else None,
+            "statuses": dict(route.statuses),
+        }
+
+    total = RouteSamples()
+    for route in samples.values():
+        total.merge(route)
+    return {
+        "duration_s": round(elapsed, 2),
+        "routes": {path: describe(route) for path, route in sorted(samples.items())},
+        "total": describe(total),
+    }
+
+
+def print_report(report: Dict[str, Any]) -> None:
+    header = (
+        f"{'route':<24} {'requests':>9} {'req/s':>8} {'err %':>8} "
+        f"{'p50 ms':>9} {'p95 ms':>9} {'p99 ms':>9}"
+    )
+    print(header)
+    print("-" * len(header))
+    rows = list(report["routes"].items()) + [("TOTAL", report["total"])]
+    for path, row in rows:
+        print(
+            f"{path:<24} {row['requests']:>9} {row['throughput_rps']:>8.1f} "
+            f"{row['error_rate']:>7.1%} {row['p50_ms'] or 0:>9.1f} "
+            f"{row['p95_ms'] or 0:>9.1f} {row['p99_ms'] or 0:>9.1f}"
+        )
+
+
+def _free_port() -> int:
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        return probe.getsockname()[1]
+
+
+def _wait_until_ready(base_url: str, process: subprocess.Popen, timeout: float) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"App server exited with status {process.returncode}.")
+        try:
+            if requests.get(f"{base_url}/login", timeout=2).status_code == 200:
+                return
+        except requests.RequestException:
+            pass
+        time.sleep(0.2)
+    raise RuntimeError(f"App server did not answer within {timeout:.0f}s.")
+
+
+def _start_app(
+    env_overrides: Dict[str, str], workdir: str, send_summary: bool
+) -> Tuple[str, subprocess.Popen, Any]:
+    port = _free_port()
+    env = dict(os.environ)
+    env.update(env_overrides)
+    env.setdefault("DATABASE_URL", f"sqlite:///{os.path.join(workdir, 'loadtest.db')}")
+    # The daily summary is sent on demand below rather than on its cron.
+    env.setdefault("ENABLE_DAILY_SUMMARY", "false")
+    command = [sys.executable, "-m", "loadtest.app_server", "--port", str(port)]
+    if send_summary:
+        command.append("--send-summary")
+    log = open(os.path.join(workdir, "app.log"), "w", encoding="utf-8")
+    process = subprocess.Popen(command, cwd=ROOT, env=env, stdout=log, stderr=log)
+    return f"http://127.0.0.1:{port}", process, log
+
+
+def _parse_routes(raw: Optional[str]) -> List[Tuple[str, float]]:
+    if not raw:
+        return list(DEFAULT_ROUTES)
+    routes = []
+    for item in raw.split(","):
+        path, _, weight = item.strip().partition(":")
+        if path:
+            routes.append((path, float(weight or 1.0)))
+    return routes
+
+
+def run_load(
+    base_url: str,
+    routes: Sequence[Tuple[str, float]],
+    sessions: int,
+    duration: float,
+    ramp_up: float,
+    think_ms: float,
+    conditional: bool,
+    seed: int,
+) -> Tuple[Dict[str, Any], List[str]]:
+    now = time.monotonic()
+    starts = [now + ramp_up * index / max(sessions, 1) for index in range(sessions)]
+    users = [
+        VirtualUser(
+            base_url,
+            routes,
+            start_at=start,
+            deadline=now + ramp_up + duration,
+            think_ms=think_ms,
+            conditional=conditional,
+            seed=seed + index,
+        )
+        for index, start in enumerate(starts)
+    ]
+    for user in users:
+        user.start()
+    for user in users:
+        user.join()
+    elapsed = time.monotonic() - now
+
+    samples: Dict[str, RouteSamples] = {}
+    for user in users:
+        for path, route in user.samples.items():
+            samples.setdefault(path, RouteSamples()).merge(route)
+    failures = [user.login_error for user in users if user.login_error]
+    return summarize(samples, elapsed), failures
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--target", help="base URL of a running app (skips stubs and server)")
+    parser.add_argument("--sessions", type=int, default=20, help="concurrent logged-in users")
+    parser.add_argument("--duration", type=float, default=30.0, help="seconds of load")
+    parser.add_argument("--ramp-up", type=float, default=2.0, help="seconds to stagger starts")
+    parser.add_argument("--think-ms", type=float, default=0.0, help="pause between requests")
+    parser.add_argument(
+        "--routes", help='weighted routes, e.g. "/:1,/crypto:2" (default: dashboard mix)'
+    )
+    parser.add_argument(
+        "--conditional",
+        action="store_true",
+        help="revalidate with If-None-Match like the dashboard's polling does",
+    )
+    parser.add_argument("--output", help="also write the report as JSON")
+    parser.add_argument(
+        "--no-summary",
+        action="store_true",
+        help="do not post a daily summary to the webhook stub at startup",
+    )
+    add_stub_arguments(parser)
+    args = parser.parse_args(argv)
+    routes = _parse_routes(args.routes)
+    seed = args.seed if args.seed is not None else random.randrange(1 << 30)
+
+    servers: Dict[str, StubServer] = {}
+    process: Optional[subprocess.Popen] = None
+    log = None
+    with tempfile.TemporaryDirectory(prefix="loadtest-") as workdir:
+        try:
+            if args.target:
+                base_url = args.target.rstrip("/")
+            else:
+                servers = start_stubs(configs_from_args(args), seed=seed)
+                base_url, process, log = _start_app(
+                    stub_environment(servers), workdir, send_summary=not args.no_summary
+                )
+                _wait_until_ready(base_url, process, timeout=60.0)
+            print(
+                f"Driving {base_url} with {args.sessions} sessions for {args.duration:g}s...",
+                file=sys.stderr,
+            )
+            report, failures = run_load(
+                base_url,
+                routes,
+                sessions=max(args.sessions, 1),
+                duration=max(args.duration, 0.0),
+                ramp_up=max(args.ramp_up, 0.0),
+                think_ms=max(args.think_ms, 0.0),
+                conditional=args.conditional,
+                seed=seed,
+            )
+        finally:
+            if process is not None:
+                process.terminate()
+                try:
+                    process.wait(timeout=10)
+                except subprocess.TimeoutExpired:
+                    process.kill()
+            if log is not None:
+                log.close()
+            for server in servers.values():
+                server.stop()
+
+    report["sessions"] = args.sessions
+    report["login_failures"] = len(failures)
+    report["upstream"] = {name: server.stats.snapshot() for name, server in servers.items()}
+    print_report(report)
+    if failures:
+        print(f"{len(failures)} session(s) could not log in: {failures[0]}", file=sys.stderr)
+    if report["upstream"]:
+        calls = ", ".join(
+            f"{name} {stats['requests']} ({stats['errors']} failed)"
+            for name, stats in report["upstream"].items()
+        )
+        print(f"Upstream stub calls: {calls}")
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as handle:
+            json.dump(report, handle, indent=2)
+            handle.write("\n")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
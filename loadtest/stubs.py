@@ -0,0 +1,297 @@
+"""Local stand-ins for CoinGecko, OpenWeather, NewsAPI and a Discord webhook.
+
+Each stub is a small threaded HTTP server on ``127.0.0.1`` that answers the
+one endpoint the dashboard calls, after a configurable delay, failing a
+configurable share of requests. Payloads are generated (prices follow a
+random walk) unless a fixed ``payload`` is configured.
+
+Run ``python -m loadtest.stubs`` to start them on their own; it prints the
+environment variables that point the app at them.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import dataclass, field, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Mapping, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+STUB_NAMES = ("coingecko", "openweather", "newsapi", "discord")
+
+
+@dataclass(frozen=True)
+class StubConfig:
+    """How a stub responds: delay, failure share and an optional fixed body."""
+
+    latency_ms: float = 50.0
+    jitter_ms: float = 20.0
+    error_rate: float = 0.0
+    error_status: int = 500
+    payload: Any = None
+
+    def delay(self, rng: random.Random) -> float:
+        jitter = rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0.0
+        return max(self.latency_ms + jitter, 0.0) / 1000.0
+
+
+@dataclass
+class StubStats:
+    requests: int = 0
+    errors: int = 0
+    lock: threading.Lock = field(default_factory=threading.Lock, repr=False)
+
+    def record(self, failed: bool) -> None:
+        with self.lock:
+            self.requests += 1
+            self.errors += int(failed)
+
+    def snapshot(self) -> Dict[str, int]:
+        with self.lock:
+            return {"requests": self.requests, "errors": self.errors}
+
+
+# A route maps ``(query, body)`` to ``(status, json body or None)``.
+Route = Callable[[Dict[str, str], bytes], Tuple[int, Any]]
+
+
+class _PriceWalk:
+    """Per-asset random-walk prices, so ingested history is not flat."""
+
+    def __init__(self, rng: random.Random) -> None:
+        self._rng = rng
+        self._prices: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def price(self, asset: str) -> float:
+        with self._lock:
+            current = self._prices.get(asset, 100.0 + 900.0 * self._rng.random())
+            current *= 1.0 + self._rng.gauss(0.0, 0.002)
+            self._prices[asset] = current
+            return round(current, 2)
+
+
+def _coingecko_routes(rng: random.Random) -> Dict[Tuple[str, str], Route]:
+    walk = _PriceWalk(rng)
+
+    def simple_price(query: Dict[str, str], _: bytes) -> Tuple[int, Any]:
+        currency = query.get("vs_currencies", "usd")
+        assets = [asset for asset in query.get("ids", "").split(",") if asset]
+        return 200, {asset: {currency: walk.price(asset)} for asset in assets}
+
+    return {("GET", "/api/v3/simple/price"): simple_price}
+
+
+def _openweather_routes(rng: random.Random) -> Dict[Tuple[str, str], Route]:
+    def weather(query: Dict[str, str], _: bytes) -> Tuple[int, Any]:
+        city = query.get("q") or "Chicago"
+        return 200, {
+            "name": city,
+            "main": {
+                "temp": round(60.0 + rng.gauss(0.0, 8.0), 1),
+                "humidity": rng.randint(30, 90),
+            },
+            "weather": [{"main": "Clear", "description": "clear sky"}],
+            "wind": {"speed": round(rng.uniform(0.0, 15.0), 1)},
+        }
+
+    return {("GET", "/data/2.5/weather"): weather}
+
+
+def _newsapi_routes(rng: random.Random) -> Dict[Tuple[str, str], Route]:
+    def headlines(query: Dict[str, str], _: bytes) -> Tuple[int, Any]:
+        size = int(query.get("pageSize") or 5)
+        return 200, {
+            "status": "ok",
+            "totalResults": size,
+            "articles": [
+                {
+                    "title": f"Load test headline {index + 1}",
+                    "description": "Served by the local NewsAPI stub.",
+                    "url": f"https://example.com/loadtest/{index + 1}",
+                    "source": {"name": "Stub News"},
+                }
+                for index in range(size)
+            ],
+        }
+
+    return {("GET", "/v2/top-headlines"): headlines}
+
+
+def _discord_routes(rng: random.Random) -> Dict[Tuple[str, str], Route]:
+    def webhook(query: Dict[str, str], body: bytes) -> Tuple[int, Any]:
+        return 204, None
+
+    return {("POST", "/api/webhooks/loadtest"): webhook}
+
+
+_ROUTES: Dict[str, Callable[[random.Random], Dict[Tuple[str, str], Route]]] = {
+    "coingecko": _coingecko_routes,
+    "openweather": _openweather_routes,
+    "newsapi": _newsapi_routes,
+    "discord": _discord_routes,
+}
+
+
+class StubServer:
+    """One stub API served from a background thread."""
+
+    def __init__(self, name: str, config: StubConfig, seed: Optional[int] = None) -> None:
+        self.name = name
+        self.config = config
+        self.stats = StubStats()
+        rng = random.Random(seed)
+        self._rng = rng
+        self._rng_lock = threading.Lock()
+        self._routes = _ROUTES[name](rng)
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler_class())
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(
+            target=self._server.serve_forever, name=f"stub-{name}", daemon=True
+        )
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "StubServer":
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def _respond(self, method: str, raw_path: str, body: bytes) -> Tuple[int, Any]:
+        parts = urlsplit(raw_path)
+        route = self._routes.get((method, parts.path.rstrip("/")))
+        if route is None:
+            return 404, {"error": "unknown stub endpoint"}
+        with self._rng_lock:
+            delay = self.config.delay(self._rng)
+            failed = self._rng.random() < self.config.error_rate
+        time.sleep(delay)
+        self.stats.record(failed)
+        if failed:
+            return self.config.error_status, {"error": "stubbed failure"}
+        if self.config.payload is not None and method == "GET":
+            return 200, self.config.payload
+        query = {key: values[-1] for key, values in parse_qs(parts.query).items()}
+        with self._rng_lock:
+            return route(query, body)
+
+    def _handler_class(self) -> type[BaseHTTPRequestHandler]:
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _handle(self, method: str) -> None:
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                status, payload = stub._respond(method, self.path, body)
+                encoded = b"" if payload is None else json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(encoded)))
+                self.end_headers()
+                self.wfile.write(encoded)
+
+            def do_GET(self) -> None:
+                self._handle("GET")
+
+            def do_POST(self) -> None:
+                self._handle("POST")
+
+            def log_message(self, format: str, *args: Any) -> None:
+                pass
+
+        return Handler
+
+
+def load_configs(
+    path: Optional[str] = None, defaults: StubConfig = StubConfig()
+) -> Dict[str, StubConfig]:
+    """Per-stub settings: ``defaults`` overlaid with a JSON file keyed by stub name.
+
+    The file may look like ``{"coingecko": {"latency_ms": 250, "error_rate": 0.1},
+    "newsapi": {"payload": {...}}}``.
+    """
+    overrides: Mapping[str, Mapping[str, Any]] = {}
+    if path:
+        with open(path, encoding="utf-8") as handle:
+            overrides = json.load(handle)
+    unknown = set(overrides) - set(STUB_NAMES)
+    if unknown:
+        raise ValueError(f"Unknown stub(s) in {path}: {', '.join(sorted(unknown))}")
+    return {name: replace(defaults, **overrides.get(name, {})) for name in STUB_NAMES}
+
+
+def start_stubs(
+    configs: Mapping[str, StubConfig], seed: Optional[int] = None
+) -> Dict[str, StubServer]:
+    return {
+        name: StubServer(name, config, seed=None if seed is None else seed + index).start()
+        for index, (name, config) in enumerate(configs.items())
+    }
+
+
+def stub_environment(servers: Mapping[str, StubServer]) -> Dict[str, str]:
+    """Environment variables that route the app's upstream calls to ``servers``."""
+    return {
+        "COINGECKO_BASE_URL": f"{servers['coingecko'].base_url}/api/v3",
+        "OPENWEATHER_BASE_URL": f"{servers['openweather'].base_url}/data/2.5",
+        "OPENWEATHER_API_KEY": "loadtest",
+        "NEWS_API_BASE_URL": f"{servers['newsapi'].base_url}/v2",
+        "NEWS_API_KEY": "loadtest",
+        "DAILY_SUMMARY_WEBHOOK_URL": f"{servers['discord'].base_url}/api/webhooks/loadtest",
+    }
+
+
+def add_stub_arguments(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("upstream stubs")
+    group.add_argument("--latency-ms", type=float, default=50.0, help="mean stub delay")
+    group.add_argument("--jitter-ms", type=float, default=20.0, help="uniform +/- jitter")
+    group.add_argument(
+        "--error-rate", type=float, default=0.0, help="share of stub calls that fail (0-1)"
+    )
+    group.add_argument(
+        "--error-status", type=int, default=500, help="HTTP status of failed stub calls"
+    )
+    group.add_argument("--stub-config", help="JSON file with per-stub overrides")
+    group.add_argument("--seed", type=int, default=None, help="seed stub randomness")
+
+
+def configs_from_args(args: argparse.Namespace) -> Dict[str, StubConfig]:
+    defaults = StubConfig(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        error_rate=min(max(args.error_rate, 0.0), 1.0),
+        error_status=args.error_status,
+    )
+    return load_configs(args.stub_config, defaults)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Serve local upstream API stubs.")
+    add_stub_arguments(parser)
+    args = parser.parse_args()
+    servers = start_stubs(configs_from_args(args), seed=args.seed)
+    for key, value in stub_environment(servers).items():
+        print(f"export {key}={value}")
+    print("# Press Ctrl+C to stop.", flush=True)
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        for server in servers.values():
+            server.stop()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""Move crypto history into long-format crypto_price rows
+
+Revision ID: 3b7d9e2f4a10
+Revises: c2a9d5e7f813
+Create Date: 2026-10-17 09:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b7d9e2f4a10'
+down_revision = 'c2a9d5e7f813'
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    tables = _tables()
+    # The app factory may already have created crypto_price via create_all.
+    if 'crypto_price' not in tables:
+        op.create_table(
+            'crypto_price',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('asset', sa.String(length=64), nullable=False),
+            sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('price', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_crypto_price_timestamp', 'crypto_price', ['timestamp'])
+        op.create_index(
+            'ix_crypto_price_asset_timestamp', 'crypto_price', ['asset', 'timestamp']
+        )
+
+    if 'crypto_history' in tables:
+        for asset, column in (('bitcoin', 'bitcoin_price'), ('ethereum', 'ethereum_price')):
+            op.execute(
+                "INSERT INTO crypto_price (asset, timestamp, price) "
+                f"SELECT '{asset}', timestamp, {column} FROM crypto_history "
+                "ORDER BY timestamp, id"
+            )
+        op.drop_table('crypto_history')
+
+
+def downgrade():
+    tables = _tables()
+    if 'crypto_history' not in tables:
+        op.create_table(
+            'crypto_history',
+            sa.Column('id', sa.Integer(), nullable=False),
+            sa.Column('timestamp', sa.DateTime(timezone=True), nullable=False),
+            sa.Column('bitcoin_price', sa.Float(), nullable=False),
+            sa.Column('ethereum_price', sa.Float(), nullable=False),
+            sa.PrimaryKeyConstraint('id'),
+        )
+        op.create_index('ix_crypto_history_timestamp', 'crypto_history', ['timestamp'])
+
+    if 'crypto_price' in tables:
+        # Only snapshots that recorded both legacy assets fit the wide schema.
+        op.execute(
+            "INSERT INTO crypto_history (timestamp, bitcoin_price, ethereum_price) "
+            "SELECT btc.timestamp, btc.price, eth.price "
+            "FROM crypto_price AS btc JOIN crypto_price AS eth "
+            "ON eth.timestamp = btc.timestamp AND eth.asset = 'ethereum' "
+            "WHERE btc.asset = 'bitcoin' ORDER BY btc.timestamp"
+        )
+        op.drop_table('crypto_price')
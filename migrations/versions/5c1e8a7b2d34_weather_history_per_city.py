@@ -0,0 +1,71 @@
+"""Key weather history by city
+
+Revision ID: 5c1e8a7b2d34
+Revises: 3b7d9e2f4a10
+Create Date: 2026-10-17 10:00:00.000000
+
+"""
+import os
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5c1e8a7b2d34'
+down_revision = '3b7d9e2f4a10'
+branch_labels = None
+depends_on = None
+
+
+def _legacy_city():
+    # Readings recorded before this revision came from the ingestion city.
+    raw = os.environ.get('WEATHER_INGEST_CITY') or 'Chicago'
+    return ' '.join(raw.split()).casefold() or 'chicago'
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def upgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'weather_history' in tables and 'city' not in _columns('weather_history'):
+        with op.batch_alter_table('weather_history', schema=None) as batch_op:
+            batch_op.add_column(
+                sa.Column(
+                    'city',
+                    sa.String(length=128),
+                    nullable=False,
+                    server_default=_legacy_city(),
+                )
+            )
+            batch_op.create_index('ix_weather_history_city', ['city'])
+            batch_op.create_index(
+                'ix_weather_history_city_timestamp', ['city', 'timestamp']
+            )
+
+    if 'weather_rollup' in tables:
+        # Rollups were one mixed "temperature" series; the app rebuilds them
+        # per city from raw history on its next start.
+        op.execute('DELETE FROM weather_rollup')
+        with op.batch_alter_table('weather_rollup', schema=None) as batch_op:
+            batch_op.alter_column(
+                'series', existing_type=sa.String(length=64), type_=sa.String(length=128)
+            )
+    if 'crypto_rollup' in tables:
+        with op.batch_alter_table('crypto_rollup', schema=None) as batch_op:
+            batch_op.alter_column(
+                'series', existing_type=sa.String(length=64), type_=sa.String(length=128)
+            )
+
+
+def downgrade():
+    tables = set(sa.inspect(op.get_bind()).get_table_names())
+    if 'weather_rollup' in tables:
+        op.execute('DELETE FROM weather_rollup')
+    if 'weather_history' in tables and 'city' in _columns('weather_history'):
+        with op.batch_alter_table('weather_history', schema=None) as batch_op:
+            batch_op.drop_index('ix_weather_history_city_timestamp')
+            batch_op.drop_index('ix_weather_history_city')
+            batch_op.drop_column('city')
@@ -0,0 +1,59 @@
+"""Record detector, series and score on anomaly log rows
+
+Revision ID: 9d4f2b6c8e17
+Revises: 5c1e8a7b2d34
+Create Date: 2026-10-17 12:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9d4f2b6c8e17'
+down_revision = '5c1e8a7b2d34'
+branch_labels = None
+depends_on = None
+
+_INDEX = 'ix_anomaly_log_series_detector_observed'
+
+
+def _columns(table):
+    return {column['name'] for column in sa.inspect(op.get_bind()).get_columns(table)}
+
+
+def _indexes(table):
+    return {index['name'] for index in sa.inspect(op.get_bind()).get_indexes(table)}
+
+
+def upgrade():
+    if 'anomaly_log' not in set(sa.inspect(op.get_bind()).get_table_names()):
+        return
+    existing = _columns('anomaly_log')
+    indexes = _indexes('anomaly_log')
+    with op.batch_alter_table('anomaly_log', schema=None) as batch_op:
+        if 'detector' not in existing:
+            batch_op.add_column(sa.Column('detector', sa.String(length=32), nullable=True))
+        if 'series' not in existing:
+            batch_op.add_column(sa.Column('series', sa.String(length=128), nullable=True))
+        if 'score' not in existing:
+            batch_op.add_column(sa.Column('score', sa.Float(), nullable=True))
+        if 'observed_at' not in existing:
+            batch_op.add_column(
+                sa.Column('observed_at', sa.DateTime(timezone=True), nullable=True)
+            )
+        if _INDEX not in indexes:
+            batch_op.create_index(_INDEX, ['series', 'detector', 'observed_at'])
+
+
+def downgrade():
+    if 'anomaly_log' not in set(sa.inspect(op.get_bind()).get_table_names()):
+        return
+    existing = _columns('anomaly_log')
+    indexes = _indexes('anomaly_log')
+    with op.batch_alter_table('anomaly_log', schema=None) as batch_op:
+        if _INDEX in indexes:
+            batch_op.drop_index(_INDEX)
+        for column in ('observed_at', 'score', 'series', 'detector'):
+            if column in existing:
+                batch_op.drop_column(column)
@@ -0,0 +1,37 @@
+"""Add app_metadata for one-off job markers
+
+Revision ID: b4e81f3a6d52
+Revises: 9d4f2b6c8e17
+Create Date: 2026-10-17 14:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b4e81f3a6d52'
+down_revision = '9d4f2b6c8e17'
+branch_labels = None
+depends_on = None
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def upgrade():
+    if 'app_metadata' in _tables():
+        return
+    op.create_table(
+        'app_metadata',
+        sa.Column('key', sa.String(length=64), nullable=False),
+        sa.Column('value', sa.String(length=255), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('key'),
+    )
+
+
+def downgrade():
+    if 'app_metadata' in _tables():
+        op.drop_table('app_metadata')
@@ -0,0 +1,60 @@
+"""Create hourly and daily rollup tables
+
+Revision ID: c2a9d5e7f813
+Revises: 867c54885cc9
+Create Date: 2026-10-17 08:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'c2a9d5e7f813'
+down_revision = '867c54885cc9'
+branch_labels = None
+depends_on = None
+
+_ROLLUPS = ('crypto_rollup', 'weather_rollup')
+
+
+def _tables():
+    return set(sa.inspect(op.get_bind()).get_table_names())
+
+
+def _create_rollup(table):
+    op.create_table(
+        table,
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('series', sa.String(length=64), nullable=False),
+        sa.Column('granularity', sa.String(length=8), nullable=False),
+        sa.Column('bucket_start', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('count', sa.Integer(), nullable=False),
+        sa.Column('total', sa.Float(), nullable=False),
+        sa.Column('total_sq', sa.Float(), nullable=False),
+        sa.Column('min_value', sa.Float(), nullable=False),
+        sa.Column('max_value', sa.Float(), nullable=False),
+        sa.Column('first_value', sa.Float(), nullable=False),
+        sa.Column('last_value', sa.Float(), nullable=False),
+        sa.Column('first_timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('last_timestamp', sa.DateTime(timezone=True), nullable=False),
+        sa.PrimaryKeyConstraint('id'),
+        sa.UniqueConstraint(
+            'series', 'granularity', 'bucket_start', name=f'uq_{table}_bucket'
+        ),
+    )
+
+
+def upgrade():
+    # The app fills empty rollup tables from raw history on its next start.
+    existing = _tables()
+    for table in _ROLLUPS:
+        if table not in existing:
+            _create_rollup(table)
+
+
+def downgrade():
+    existing = _tables()
+    for table in _ROLLUPS:
+        if table in existing:
+            op.drop_table(table)